@@ -0,0 +1,313 @@
+"""
+Benchmarks of the public entry points the tests use: the config getters and parsing, utils.get_data() and the BDD
+feature loading, on synthetic inputs of growing size.
+
+    python -m benchmarks.bench                         # compare with benchmarks/baseline.json, when it exists
+    python -m benchmarks.bench --scales 10,1000,1000000 --case get_data
+    python -m benchmarks.bench --save-baseline         # store the results of this machine as its baseline
+
+The scale is the number of calls for the config getters, the number of keys in the .ini file for config_parse, the
+number of rows for the csv cases and the number of scenarios for the BDD ones. Every case runs --repeat times per scale and reports the median and the percentiles the
+number of runs supports (p90 from 10 runs, p99 from 100), the throughput and the peak memory of one more run under
+tracemalloc.
+
+Two checks set the exit code to 1, both relative so that they hold on any machine:
+
+- scaling: the time per item at a scale must not be more than --max-growth times the time per item at the scale below
+  (e.g. a lookup that turned linear in the number of calls).
+- baseline: the fastest run of a case must not be more than --tolerance slower than in the baseline. The baseline
+  belongs to the machine that wrote it, so benchmarks/.gitignore keeps it out of the repository: save one on the
+  machine before comparing with it (a CI runner saves it on the target branch and keeps it in its cache).
+"""
+import argparse
+import gc
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks import generate
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASELINE_FILE = BENCH_DIR.joinpath('baseline.json')
+DEFAULT_SCALES = (10, 1000, 10000) # 100000 and 1000000 take minutes, pass them with --scales
+DEFAULT_REPEAT = 20
+DEFAULT_TOLERANCE = 1.0 # twice as slow as the baseline fails, shared CI machines vary a lot
+DEFAULT_MAX_GROWTH = 3.0 # the time per item may triple from one scale to the next
+NOISE_FLOOR = 0.005 # seconds, slowdowns below this are noise (timer, file system)
+PERCENTILES = ((90, 10), (99, 100)) # (percentile, runs needed to report it)
+
+CASES = {}
+
+
+def case(name, inputs):
+    """
+    Register a benchmark. The function gets the input (a generated file or directory, or the scale for 'calls') and
+    returns the callable to time, it is called again before every run so it can reset caches (untimed).
+    """
+    def decorator(func):
+        CASES[name] = (inputs, func)
+        return func
+    return decorator
+
+
+@case('config_getters', 'calls')
+def bench_config_getters(calls):
+    # The module level getters of myconfigparser, config/qa.ini parsed once before the runs.
+    from pytest_topics.utils import myconfigparser
+    getters = (myconfigparser.getGmailUrl, myconfigparser.getGmailUsr, myconfigparser.getGmailPass,
+               myconfigparser.getOutlookUrl, myconfigparser.getOutlookUsr, myconfigparser.getOutlookPass)
+    getters[0]()
+    calls = [getters[i % len(getters)] for i in range(calls)]
+
+    def run():
+        for getter in calls:
+            getter()
+    return run
+
+
+@case('config_parser_getters', 'calls')
+def bench_config_parser_getters(calls):
+    # The same through a ConfigParser of configParserOOP, like the conftest fixtures use it.
+    from pytest_topics.utils.configParserOOP import ConfigParser
+    parser = ConfigParser()
+    getters = (parser.getGmailUrl, parser.getGmailUsr, parser.getGmailPass,
+               parser.getOutlookUrl, parser.getOutlookUsr, parser.getOutlookPass)
+    getters[0]()
+    calls = [getters[i % len(getters)] for i in range(calls)]
+
+    def run():
+        for getter in calls:
+            getter()
+    return run
+
+
+@case('config_first_call', 'calls')
+def bench_config_first_call(calls):
+    # A getter on an empty registry parses config/qa.ini: once, then `calls` lookups.
+    from pytest_topics.utils import configRegistry, myconfigparser
+    configRegistry.clear()
+
+    def run():
+        for _ in range(calls):
+            myconfigparser.getGmailUrl()
+    return run
+
+
+@case('config_parse', 'ini')
+def bench_config_parse(ini_file):
+    # What a get_config() miss or a ConfigWatcher reload costs: parsing the whole .ini file into a snapshot.
+    from pytest_topics.utils.configRegistry import load_snapshot
+    return lambda: load_snapshot(ini_file)
+
+
+@case('get_data', 'csv')
+def bench_get_data(csv_file):
+    # utils.get_data() on the generated file, its columnar cache already built.
+    from pytest_topics.utils import utils
+    utils.DATA_FILE = csv_file
+    utils.get_data()
+    return utils.get_data
+
+
+@case('get_data_cold', 'csv')
+def bench_get_data_cold(csv_file):
+    # The first get_data() after the csv file changed: the columnar cache is built again.
+    from pytest_topics.utils import utils
+    from pytest_topics.utils.datacache import cache_path
+    utils.DATA_FILE = csv_file
+    cache_path(csv_file).unlink(missing_ok=True)
+    os.utime(csv_file, ns=(time.time_ns(), time.time_ns()))
+    return utils.get_data
+
+
+@case('csv_iter', 'csv')
+def bench_csv_iter(csv_file):
+    from pytest_topics.utils.utils import iter_data
+    return lambda: sum(1 for _ in iter_data(csv_file))
+
+
+@case('bdd_parse', 'features')
+def bench_bdd_parse(feature_dir):
+    # Cold: load_features() with an empty cache parses every file.
+    from pytest_bdd import feature as bdd_feature
+    from pytest_topics.utils.featureCache import cache_path, load_features
+    bdd_feature.features.clear() # the features of the other scales would slow the garbage collector down
+    cache_path(feature_dir).unlink(missing_ok=True)
+    return lambda: load_features(feature_dir)
+
+
+@case('bdd_parse_cached', 'features')
+def bench_bdd_parse_cached(feature_dir):
+    from pytest_bdd import feature as bdd_feature
+    from pytest_topics.utils.featureCache import load_features
+    load_features(feature_dir)
+    bdd_feature.features.clear()
+    return lambda: load_features(feature_dir)
+
+
+@case('bdd_scenarios', 'features')
+def bench_bdd_scenarios(feature_dir):
+    # scenarios() as a test module calls it, the features already parsed.
+    from pytest_bdd import feature as bdd_feature
+    from pytest_topics.utils.featureCache import load_features
+    bdd_feature.features.clear()
+    load_features(feature_dir)
+    code = compile(f"from pytest_bdd import scenarios\nscenarios({str(feature_dir)!r}, "
+                   f"features_base_dir={str(feature_dir)!r})", 'bench_scenarios.py', 'exec')
+    return lambda: exec(code, {'__name__': 'bench_scenarios', '__file__': 'bench_scenarios.py'})
+
+
+class Inputs:
+    """Generates the synthetic inputs on first use, in a temporary directory removed by close()."""
+
+    def __init__(self):
+        self.root = Path(tempfile.mkdtemp(prefix='pytest-topics-bench-'))
+        self._made = {}
+
+    def get(self, kind, scale):
+        if kind == 'calls':
+            return scale
+        key = (kind, scale)
+        if key not in self._made:
+            path = self.root.joinpath(f"{kind}{scale}")
+            if kind == 'csv':
+                self._made[key] = generate.make_csv(path.with_suffix('.csv'), scale)
+            elif kind == 'ini':
+                self._made[key] = generate.make_ini(path.with_suffix('.ini'), scale)
+            else:
+                self._made[key] = generate.make_features(path, scale)
+        return self._made[key]
+
+    def close(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def percentiles(samples):
+    """{'p90': ..., 'p99': ...}, only the percentiles there are enough samples for."""
+    if len(samples) < 2:
+        return {}
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return {f"p{p}": cuts[p - 1] for p, needed in PERCENTILES if len(samples) >= needed}
+
+
+def measure(prepare, data, repeat):
+    samples = []
+    for _ in range(repeat):
+        run = prepare(data)
+        gc.collect() # the garbage of the previous run is not collected during this one
+        begin = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - begin)
+
+    run = prepare(data)
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        run()
+        peak = tracemalloc.get_traced_memory()[1] - start
+    finally:
+        tracemalloc.stop()
+    return samples, peak
+
+
+def run_benchmarks(names, scales, repeat, stream=sys.stdout):
+    """Return {case: {scale: result}}, scales are strings like in the json files."""
+    results = {}
+    inputs = Inputs()
+    try:
+        for name in names:
+            kind, prepare = CASES[name]
+            for scale in scales:
+                samples, peak = measure(prepare, inputs.get(kind, scale), repeat)
+                median = statistics.median(samples)
+                result = dict(items=scale, runs=repeat, min=min(samples), median=median, **percentiles(samples),
+                              throughput=scale / median if median else None, peak_kb=peak / 1024)
+                results.setdefault(name, {})[str(scale)] = result
+                spread = "".join(f"  {p} {result[p] * 1000:10.3f}ms" for p in ('p90', 'p99') if p in result)
+                print(f"{name:<22} {scale:>8}  median {median * 1000:10.3f}ms{spread}  "
+                      f"{result['throughput'] or 0:14.0f}/s  peak {result['peak_kb']:10.1f}KiB", file=stream)
+    finally:
+        inputs.close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return the list of regressions against the baseline, each as a message."""
+    regressions = []
+    for name, scales in results.items():
+        for scale, result in scales.items():
+            expected = baseline.get(name, {}).get(scale)
+            if expected is None:
+                continue # new case or scale, nothing to compare with
+            limit = expected['min'] * (1 + tolerance) + NOISE_FLOOR
+            if result['min'] > limit:
+                regressions.append(f"{name} at {scale}: fastest run {result['min'] * 1000:.3f}ms, "
+                                   f"baseline {expected['min'] * 1000:.3f}ms")
+    return regressions
+
+
+def check_scaling(results, max_growth):
+    """Return the cases whose time per item grows more than max_growth times from one scale to the next."""
+    regressions = []
+    for name, scales in results.items():
+        ordered = sorted(scales.values(), key=lambda result: result['items'])
+        for smaller, larger in zip(ordered, ordered[1:]):
+            if larger['min'] <= NOISE_FLOOR:
+                continue # too fast to tell anything
+            growth = (larger['min'] / larger['items']) / (smaller['min'] / smaller['items'])
+            if growth > max_growth:
+                regressions.append(f"{name}: {growth:.1f}x the time per item from {smaller['items']} to "
+                                   f"{larger['items']} items")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--case', action='append', choices=sorted(CASES), help="case to run (default: all)")
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help="comma separated input sizes, from 10 to 1000000")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="timed runs per case and scale")
+    parser.add_argument('--baseline', default=str(BASELINE_FILE), help="baseline json file")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown against the baseline, 0.5 = 50%%")
+    parser.add_argument('--max-growth', type=float, default=DEFAULT_MAX_GROWTH,
+                        help="allowed growth of the time per item from one scale to the next")
+    parser.add_argument('--save-baseline', action='store_true', help="write the results to the baseline file")
+    parser.add_argument('--output', default=None, help="also write the results to this json file")
+    args = parser.parse_args(argv)
+
+    scales = [int(scale) for scale in args.scales.split(',')]
+    results = run_benchmarks(args.case or list(CASES), scales, max(args.repeat, 1))
+    report = dict(python=sys.version.split()[0], results=results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=1))
+
+    regressions = check_scaling(results, args.max_growth)
+    baseline_file = Path(args.baseline)
+    if args.save_baseline:
+        if baseline_file.exists():
+            # Keep the cases and scales that were not run this time.
+            old = json.loads(baseline_file.read_text())['results']
+            for name, scales_run in results.items():
+                old.setdefault(name, {}).update(scales_run)
+            report['results'] = old
+        baseline_file.write_text(json.dumps(report, indent=1))
+        print(f"baseline written to {baseline_file}")
+    elif baseline_file.exists():
+        regressions += compare(results, json.loads(baseline_file.read_text())['results'], args.tolerance)
+    else:
+        print(f"no baseline at {baseline_file}, only the scaling is checked (--save-baseline creates one)")
+
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
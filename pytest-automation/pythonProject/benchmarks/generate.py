@@ -0,0 +1,51 @@
+"""
+Synthetic inputs for the benchmarks, shaped like the real ones in pytest_topics/config and bdd_test/feature_dir.
+
+Every generator is deterministic: the same scale gives the same file, so the runs compare.
+"""
+import os
+from pathlib import Path
+
+CITIES = ('banaglore', 'Gurgaon', 'Delhi', 'Singapore', 'Chicago', 'Almaty')
+KEYS_PER_SECTION = 100
+SCENARIOS_PER_FILE = 100
+FILES_PER_DIR = 100
+
+
+def make_ini(path, keys):
+    """An .ini file with `keys` keys, in sections of KEYS_PER_SECTION like [gmail] / [outlook]."""
+    path = Path(path)
+    with open(path, 'w') as f:
+        for key in range(keys):
+            if key % KEYS_PER_SECTION == 0:
+                f.write(f"\n[service{key // KEYS_PER_SECTION}]\n")
+            f.write(f"key{key} = value{key}.example.com\n")
+    return path
+
+
+def make_csv(path, rows):
+    """A csv file with `rows` rows and the header of config/data.csv."""
+    path = Path(path)
+    with open(path, 'w') as f:
+        f.write("age,name,salary(lpa),city\n")
+        for row in range(rows):
+            f.write(f"{20 + row % 40},name{row},{row % 50 + 0.5},{CITIES[row % len(CITIES)]}\n")
+    return path
+
+
+def make_features(directory, scenarios):
+    """A tree of .feature files holding `scenarios` scenarios, SCENARIOS_PER_FILE per file, FILES_PER_DIR per folder."""
+    directory = Path(directory)
+    files = -(-scenarios // SCENARIOS_PER_FILE)
+    for number in range(files):
+        folder = directory.joinpath(f"group{number // FILES_PER_DIR}")
+        os.makedirs(folder, exist_ok=True)
+        first = number * SCENARIOS_PER_FILE
+        with open(folder.joinpath(f"feature{number}.feature"), 'w') as f:
+            f.write(f"Feature: Fruits {number}\n")
+            for scenario in range(first, min(first + SCENARIOS_PER_FILE, scenarios)):
+                f.write(f"\n  Scenario: Eat fruits {scenario}\n"
+                        f"    Given We have {scenario % 20 + 5} fruits\n"
+                        f"    When I eat {scenario % 5} fruits\n"
+                        f"    Then I should have {scenario % 20 + 5 - scenario % 5} fruits\n")
+    return directory
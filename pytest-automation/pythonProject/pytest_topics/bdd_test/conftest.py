@@ -0,0 +1,39 @@
+import pytest
+from types import SimpleNamespace
+
+from pytest_bdd import parsers
+
+from pytest_topics.utils.featureCache import load_features
+from pytest_topics.utils.stepRegistry import given, when, then
+
+# The test modules of this directory call scenarios() at import time, conftest.py is imported before them.
+# Loading the parsed feature files from the cache here means scenarios() does not parse any Gherkin itself.
+load_features()
+
+
+class ScenarioContext(SimpleNamespace):
+    """Holds the data shared by the steps of one scenario, e.g. context.amount = 100 in a given step."""
+
+
+@pytest.fixture()
+def context():
+    # A new context for every scenario, so scenarios running in parallel (threads or xdist workers) never share state.
+    return ScenarioContext()
+
+
+# Steps used by both scenarioOutline.feature and test_paramaterzie.feature
+
+@given(parsers.parse("We have {count:d} fruits"),target_fixture="start_fruits")
+def exsistingFruits(count):
+    return dict(start=count,eat = 0)
+
+@when(parsers.parse("I eat {eat:d} fruits"))
+def eat3ruits(start_fruits,eat):
+    print(f"\nWe have eaten {eat} fruits.")
+    start_fruits["eat"] += eat
+
+@then(parsers.parse("I should have {left:d} fruits"))
+def shouldHaveFruits(start_fruits,left):
+    diff = start_fruits["start"] - start_fruits["eat"]
+    print(f"\nWe have {diff} fruits remaining.")
+    assert start_fruits["start"] - start_fruits["eat"] == left
@@ -1,7 +1,9 @@
-from pytest_bdd import scenario, scenarios, when, then, given
+from pytest_bdd import scenario, scenarios
 from pathlib import Path
 import pytest
 
+from pytest_topics.utils.stepRegistry import given, when, then
+
 featureFileDir = 'feature_dir'
 featureFile = 'test_fixture.feature'
 
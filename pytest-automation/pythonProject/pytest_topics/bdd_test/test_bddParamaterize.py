@@ -1,7 +1,8 @@
-from pytest_bdd import scenario, scenarios, when, then, given, parsers
+from pytest_bdd import scenario, scenarios, parsers
 from pathlib import Path
 import pytest
-from pytest_bdd.generation import print_missing_code
+
+from pytest_topics.utils.stepRegistry import given, when, then
 
 featureFileDir = 'feature_dir'
 featureFile = 'test_paramaterzie.feature'
@@ -40,18 +41,4 @@ def updated_count(fruits,count):
 
 
 # Scenario: Paramaterize Benefits
-
-@given(parsers.parse("We have {count:d} fruits"),target_fixture="start_fruits")
-def exsistingFruits(count):
-    return dict(start=count,eat = 0)
-
-@when(parsers.parse("I eat {eat:d} fruits"))
-def eat3ruits(start_fruits,eat):
-    print(f"\nWe have eaten {eat} fruits.")
-    start_fruits["eat"] += eat
-
-@then(parsers.parse("I should have {left:d} fruits"))
-def shouldHaveFruits(start_fruits,left):
-    diff = start_fruits["start"] - start_fruits["eat"]
-    print(f"\nWe have {diff} fruits remaining.")
-    assert start_fruits["start"] - start_fruits["eat"] == left
+# Its steps are shared with scenarioOutline.feature, they are defined once in bdd_test/conftest.py.
@@ -1,7 +1,9 @@
-from pytest_bdd import scenario, scenarios, given, when, then
+from pytest_bdd import scenario, scenarios
 from pathlib import Path
 import pytest
 
+from pytest_topics.utils.stepRegistry import given, when, then
+
 
 featureFileDir = 'feature_dir'
 featureFile = 'test_1.feature'
@@ -9,9 +11,6 @@ featureFile = 'test_1.feature'
 BASE_DIR = Path(__file__).resolve().parent
 FEATURE_FILE = BASE_DIR.joinpath(featureFileDir).joinpath(featureFile)
 
-def pytest_configure():
-    pytest.AMT = 0
-
 scenarios(FEATURE_FILE)
 
 # @scenario(FEATURE_FILE, 'Withdrawal of Money')
@@ -20,22 +19,25 @@ scenarios(FEATURE_FILE)
 #     pass
 
 
+# The balance is kept on the `context` fixture (see bdd_test/conftest.py) and not on a global like pytest.AMT,
+# every scenario gets its own context so scenarios can run in parallel.
+
 @given('The account balance is 100')
-def starting_balance():
-    pytest.AMT = 100
-    print(f"\nStarting account balance {pytest.AMT}")
+def starting_balance(context):
+    context.amount = 100
+    print(f"\nStarting account balance {context.amount}")
 
 
 @when('The account holder withdraws 30')
-def withdrawal_request():
-    pytest.AMT -= 30
+def withdrawal_request(context):
+    context.amount -= 30
     print("\nAmount deducted = 30")
 
 
 @then('The account balance remaining should be 70')
-def check_balance():
-    print(f"\nRemaining Amount = {pytest.AMT}")
-    assert pytest.AMT == 70
+def check_balance(context):
+    print(f"\nRemaining Amount = {context.amount}")
+    assert context.amount == 70
 
 # @scenario(FEATURE_FILE,"Removal of items from set")
 # def test_itemRemovalFromSet():
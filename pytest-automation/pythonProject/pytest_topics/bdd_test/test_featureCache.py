@@ -0,0 +1,53 @@
+import os
+
+import pytest
+from pytest_bdd import feature as bdd_feature
+from pytest_bdd.parser import FeatureParser
+
+from pytest_topics.utils import featureCache
+from pytest_topics.utils.featureCache import load_features
+
+FEATURE = """Feature: Cached
+    Scenario: Cached scenario
+        Given We have 5 fruits
+"""
+
+@pytest.fixture()
+def feature_dir(tmp_path, monkeypatch):
+    # The features loaded here must not end up in the feature cache of pytest-bdd used by the other tests
+    monkeypatch.setattr(bdd_feature, 'features', {})
+    directory = tmp_path.joinpath('feature_dir')
+    directory.mkdir()
+    directory.joinpath('cached.feature').write_text(FEATURE)
+    return directory
+
+class TestCases:
+
+    def test_sameFeatureAsPytestBdd(self, feature_dir):
+        path = os.path.abspath(feature_dir.joinpath('cached.feature'))
+        loaded = load_features(feature_dir)
+        expected = FeatureParser(str(feature_dir), 'cached.feature').parse()
+        assert list(loaded) == [path] and bdd_feature.features[path] is loaded[path]
+        assert loaded[path].rel_filename == expected.rel_filename == os.path.join('feature_dir', 'cached.feature')
+        assert [s.name for s in loaded[path].scenarios.values()] == ['Cached scenario']
+
+    def test_parsedOnlyWhenChanged(self, feature_dir, monkeypatch):
+        load_features(feature_dir)
+        parse = FeatureParser.parse
+        calls = []
+        monkeypatch.setattr(FeatureParser, 'parse', lambda self: calls.append(self.abs_filename) or parse(self))
+
+        os.utime(feature_dir.joinpath('cached.feature'), ns=(10 ** 18, 10 ** 18)) # touched, same content
+        (feature,) = load_features(feature_dir).values()
+        assert calls == [] and feature.name == 'Cached'
+
+        feature_dir.joinpath('cached.feature').write_text(FEATURE.replace('Cached', 'Changed', 1))
+        (feature,) = load_features(feature_dir).values()
+        assert len(calls) == 1 and feature.name == 'Changed'
+
+    @pytest.mark.skipif(not hasattr(os, 'symlink'), reason="needs symlinks")
+    def test_symlinkNotResolved(self, feature_dir, tmp_path):
+        link = tmp_path.joinpath('link')
+        link.symlink_to(feature_dir, target_is_directory=True)
+        # pytest-bdd looks the features up by os.path.abspath(), through the link
+        assert list(load_features(link)) == [os.path.join(str(link), 'cached.feature')]
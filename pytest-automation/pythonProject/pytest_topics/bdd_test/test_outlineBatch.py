@@ -0,0 +1,66 @@
+import os
+from pathlib import Path
+import pytest
+from pytest_bdd import feature as bdd_feature
+
+from pytest_topics.utils.featureCache import load_features
+from pytest_topics.utils.outlineBatch import BatchSteps, batch_scenario, load_template, run_outline
+
+featureFileDir = 'feature_dir'
+featureFile = 'scenarioOutline.feature'
+
+BASE_DIR = Path(__file__).resolve().parent
+FEATURE_FILE = BASE_DIR.joinpath(featureFileDir).joinpath(featureFile)
+
+# The steps of scenarioOutline.feature, written for whole Examples columns instead of one row at a time.
+steps = BatchSteps()
+
+@steps.given("We have {count:d} fruits")
+def exsistingFruits(state, count):
+    state["start"] = count
+    state["eat"] = count * 0
+
+@steps.when("I eat {eat:d} fruits")
+def eatFruits(state, eat):
+    state["eat"] = state["eat"] + eat
+
+@steps.then("I should have {left:d} fruits")
+def shouldHaveFruits(state, left):
+    return state["start"] - state["eat"] == left
+
+
+test_eating_multiple_fruits_in_sequence_batch = batch_scenario(FEATURE_FILE, "Eating multiple fruits in sequence", steps)
+
+
+def test_failingRowsReported(tmp_path):
+    feature_file = tmp_path.joinpath('outline.feature')
+    feature_file.write_text(FEATURE_FILE.read_text() + "\n        | 7       | 1    | 1    | 9         |")
+    result = run_outline(feature_file, "Eating multiple fruits in sequence", steps)
+    assert result.passed.tolist() == [True, True, True, False]
+    assert result.failures == [('7-1-1-9', 'Then I should have <remaining> fruits')]
+
+
+@pytest.mark.skipif(not hasattr(os, 'symlink'), reason="needs symlinks")
+def test_templateKeyedLikeFeatureCache(tmp_path, monkeypatch):
+    monkeypatch.setattr(bdd_feature, 'features', {})
+    link = tmp_path.joinpath('link')
+    link.symlink_to(FEATURE_FILE.parent, target_is_directory=True)
+    loaded = load_features(link)
+    # The file is looked up through the link, as load_features() stored it, instead of being parsed again
+    template = load_template(link.joinpath(featureFile), "Eating multiple fruits in sequence")
+    assert template is loaded[os.path.join(str(link), featureFile)].scenarios["Eating multiple fruits in sequence"]
+    assert list(bdd_feature.features) == list(loaded)
+
+
+def test_everyRowReported():
+    from contextlib import contextmanager
+    reported = []
+
+    class Subtests:
+        @contextmanager
+        def test(self, msg, **row):
+            reported.append(msg)
+            yield
+
+    run_outline(FEATURE_FILE, "Eating multiple fruits in sequence", steps).report(Subtests())
+    assert reported == ['5-3-2-0', '4-2-2-0', '10-4-3-3']
@@ -0,0 +1,50 @@
+import warnings
+
+import pytest
+from pytest_bdd import parsers
+
+from pytest_topics.utils.stepRegistry import AmbiguousStepWarning, StepRegistry
+
+class TestCases:
+
+    def test_match(self):
+        registry = StepRegistry(strict=True)
+        registry.add('given', parsers.parse("We have {count:d} fruits"), 'steps.fruits')
+        registry.add('given', "We have no fruits", 'steps.no_fruits')
+        registry.add('when', parsers.re(r"I eat (?P<eat>\d+) fruits"), 'steps.eat')
+
+        ((parser, arguments),) = registry.match("We have 5 fruits", 'given')
+        assert parser.name == "We have {count:d} fruits" and arguments == {'count': 5}
+        assert [p.name for p, _ in registry.match("We have no fruits", 'given')] == ["We have no fruits"]
+        assert registry.match("I eat 3 fruits", 'given') == [] # a when step
+        assert registry.match("We have five fruits") == []
+
+    def test_ambiguous(self):
+        registry = StepRegistry()
+        registry.add('given', parsers.parse("We have {count:d} fruits"), 'steps.fruits')
+        with pytest.warns(AmbiguousStepWarning, match="Ambiguous"):
+            registry.add('given', "We have 3 fruits", 'steps.three_fruits')
+        with pytest.warns(AmbiguousStepWarning, match="Ambiguous"):
+            registry.add('given', parsers.parse("We have {n} fruits"), 'steps.any_fruits') # same shape
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            registry.add('then', "We have 3 fruits", 'steps.then_three') # another step type
+
+    def test_duplicate(self):
+        registry = StepRegistry()
+        registry.add('when', "I eat an apple", 'steps.apple')
+        with pytest.warns(AmbiguousStepWarning, match="Duplicate when step 'I eat an apple'"):
+            registry.add('when', "I eat an apple", 'other_steps.apple')
+
+    def test_strict(self):
+        registry = StepRegistry(strict=True)
+        registry.add('then', "I should have 2 fruits", 'steps.two')
+        with pytest.raises(ValueError, match="Ambiguous then step"):
+            registry.add('then', parsers.parse("I should have {left:d} fruits"), 'steps.left')
+
+    def test_importedAgain(self):
+        # A module imported again registers the same steps, from the same functions: no warning, the same key
+        registry = StepRegistry(strict=True)
+        first = registry.add('given', parsers.parse("We have {count:d} fruits"), 'steps.fruits')
+        again = registry.add('given', parsers.parse("We have {count:d} fruits"), 'steps.fruits')
+        assert again.key == first.key and len(registry.match("We have 5 fruits")) == 1
@@ -1,29 +1,126 @@
+import asyncio
 import pytest
-import os
+from pathlib import Path
 
-def pytest_configure():
+from pytest_topics.utils.asyncSupport import AsyncFile, AsyncHttpClient, async_fixture
+from pytest_topics.utils.fileBackend import BACKENDS, get_backend
+from pytest_topics.utils.sharedFixture import shared_fixture
+
+BASE_DIR = Path(__file__).resolve().parent
+
+def pytest_configure(config):
     pytest.days_1 = ['mon', 'tue', 'wed']
     pytest.days_2 = ['fri', 'sat', 'sun']
 
+    if not config.pluginmanager.hasplugin("asyncio"):
+        # Runs `async def` tests, unless pytest-asyncio is installed and takes care of them.
+        from pytest_topics.utils import asyncSupport
+        config.pluginmanager.register(asyncSupport, "pytest_topics_async")
 
-@pytest.fixture()
+    if config.getoption("timing_report") or config.getoption("timing_slowest"):
+        # Timing of collection, fixtures and test calls (see utils/timingPlugin.py)
+        from pytest_topics.utils.timingPlugin import TimingPlugin
+        config.pluginmanager.register(TimingPlugin(config.getoption("timing_report"),
+                                                   config.getoption("timing_slowest"),
+                                                   config.getoption("timing_memory")), "pytest_topics_timing")
+
+    if config.getoption("stream_report"):
+        # Results written test by test, only the counts and failures stay in memory (see utils/streamReport.py)
+        from pytest_topics.utils.streamReport import StreamReport
+        config.pluginmanager.register(StreamReport(config.getoption("stream_report"),
+                                                   config.getoption("stream_output_limit")), "pytest_topics_stream")
+
+    if config.getoption("import_profile") is not None:
+        from pytest_topics.utils.importProfile import ImportProfile
+        config.pluginmanager.register(ImportProfile(config.getoption("import_profile") or None),
+                                      "pytest_topics_import_profile")
+
+    if config.getoption("impact") or config.getoption("impact_record"):
+        # Only run the tests whose input files or code changed (see utils/testImpact.py)
+        from pytest_topics.utils.testImpact import TestImpact
+        config.pluginmanager.register(TestImpact(config.rootpath, getattr(config, "cache", None),
+                                                 select=config.getoption("impact")),
+                                      "pytest_topics_impact")
+
+    if config.getoption("fixture_graph") is not None or config.getoption("fixture_reorder"):
+        # Fixture dependencies, setup costs, scope and order proposals (see utils/fixtureGraph.py)
+        from pytest_topics.utils.fixtureGraph import FixtureGraph
+        from pytest_topics.utils.sharding import cache_file
+        config.pluginmanager.register(FixtureGraph(config.rootpath, config.getoption("fixture_graph") or None,
+                                                   config.getoption("fixture_reorder"),
+                                                   cache_file(getattr(config, "cache", None), "fixturecosts.json")),
+                                      "pytest_topics_fixture_graph")
+
+    if config.getoption("outcome_cache") or config.getoption("outcome_cache_refresh"):
+        # Replays the passes of the tests whose code, fixtures, parameters and files are unchanged (see utils/outcomeCache.py)
+        from pytest_topics.utils.outcomeCache import OutcomeCache
+        config.pluginmanager.register(OutcomeCache(config.rootpath, getattr(config, "cache", None),
+                                                   refresh=config.getoption("outcome_cache_refresh")),
+                                      "pytest_topics_outcome_cache")
+
+    if config.getoption("shard"):
+        # Only the tests of this shard, balanced with the recorded durations (see utils/sharding.py)
+        from pytest_topics.utils.sharding import DURATIONS_FILE, ShardPlugin, cache_file, parse_shard
+        try:
+            index, count = parse_shard(config.getoption("shard"))
+        except ValueError as e:
+            raise pytest.UsageError(str(e))
+        durations_file = cache_file(getattr(config, "cache", None), DURATIONS_FILE)
+        config.pluginmanager.register(ShardPlugin(index, count, durations_file), "pytest_topics_shard")
+    if config.getoption("record_durations"):
+        from pytest_topics.utils.sharding import DURATIONS_FILE, DurationRecorder, cache_file
+        durations_file = cache_file(getattr(config, "cache", None), DURATIONS_FILE)
+        config.pluginmanager.register(DurationRecorder(durations_file), "pytest_topics_durations")
+
+    if config.getoption("envs"):
+        # Environment matrix: the target_env tests run once per environment (see utils/envMatrix.py)
+        from pytest_topics.utils.envMatrix import MatrixPlugin
+        envs = [env.strip() for env in config.getoption("envs").split(",") if env.strip()]
+        config.pluginmanager.register(MatrixPlugin(config, envs, config.getoption("matrix_workers")),
+                                      "pytest_topics_matrix")
+
+    if config.getoption("data_plane"):
+        # data.csv in shared memory, read by every worker process (see utils/dataPlane.py)
+        from pytest_topics.utils import dataPlane
+        dataPlane.publish_data_file()
+        config.data_plane = dataPlane
+
+    if config.getoption("watch_config"):
+        from pytest_topics.utils.configWatcher import ConfigWatcher
+        config.config_watcher = ConfigWatcher().start()
+
+
+def pytest_unconfigure(config):
+    watcher = getattr(config, "config_watcher", None)
+    if watcher is not None:
+        watcher.stop()
+    data_plane = getattr(config, "data_plane", None)
+    if data_plane is not None:
+        data_plane.close()
+
+
+# Built once per session, every test reads the same list (see utils/sharedFixture.py)
+@shared_fixture()
 def setup_city():
     print("Fixture under execution.")
     city = ['Singapore','Delhi','Chicago','Almaty']
     return city
 
+@pytest.fixture(scope="session")
+def file_backend(pytestconfig):
+    # Where file_write puts its files: memory, tmpfs or disk (see utils/fileBackend.py)
+    backend = get_backend(pytestconfig.getoption("file_backend"))
+    yield backend
+    backend.cleanup()
+
 @pytest.fixture()
-def file_write():
-    pytest.filename = "file1.txt"
-    f = open(pytest.filename, 'w')
+def file_write(file_backend):
+    f = file_backend.create("file1.txt", "Pytest is good.")
+    pytest.filename = f.name
     print("File Written with Data.")
-    f.write("Pytest is good.")
-    f.close()
-    f = open(pytest.filename, 'r+')
     yield f
     print("\n File Available for reading")
-    f.close()
-    os.remove(pytest.filename)
+    file_backend.release(f)
     print("\n File is deleted after, test execution.")
 
 
@@ -38,7 +135,7 @@ def function_detail(request):
     yield
     print(f"\nFinished test: {request.node.name}")
 
-@pytest.fixture()
+@shared_fixture()
 def return_tuple_or_list():
     def get_dt(name):
         if name == 'list':
@@ -62,10 +159,63 @@ prod_prop = 'prod.prop'
 
 def pytest_addoption(parser):
     parser.addoption("--cmdopt",default='qa')
+    parser.addoption("--watch-config", action="store_true", default=False,
+                     help="Reload config/*.ini files when they change during the session")
+    parser.addoption("--async-concurrency", type=int, default=0,
+                     help="Run tests marked async_concurrent together on the event loop, this many at the same time")
+    parser.addoption("--file-backend", default="disk", choices=sorted(BACKENDS),
+                     help="Where file fixtures like file_write keep their files")
+    parser.addoption("--httpbin", default=None,
+                     help="Base url of a real httpbin service, e.g. https://httpbin.org. A local stand-in is used by default")
+    parser.addoption("--timing-report", default=None,
+                     help="Write the time of every collection step, fixture and test call to this .json or .csv file")
+    parser.addoption("--timing-slowest", type=int, default=0,
+                     help="Print the N slowest steps and fixtures at the end of the run")
+    parser.addoption("--timing-memory", action="store_true", default=False,
+                     help="Measure the memory of the timed steps with tracemalloc (slower, but precise)")
+    parser.addoption("--fixture-graph", nargs="?", const="", default=None, metavar="JSON_FILE",
+                     help="Print the fixture graph with setup costs and proposals, and write it to JSON_FILE when given")
+    parser.addoption("--fixture-reorder", action="store_true", default=False,
+                     help="Reorder the tests so that expensive fixtures are set up the fewest times")
+    parser.addoption("--data-plane", action="store_true", default=False,
+                     help="Load data.csv once into shared memory, worker processes read it from there")
+    parser.addoption("--stream-report", default=None, metavar="NDJSON_FILE",
+                     help="Write every test result as a json line to this file as it finishes (.gz: compressed)")
+    parser.addoption("--stream-output-limit", type=int, default=4000,
+                     help="With --stream-report, keep this many characters of captured output, spill the rest to disk")
+    parser.addoption("--outcome-cache", action="store_true", default=False,
+                     help="Replay the passes of the tests whose code, fixtures, parameters and input files did not change")
+    parser.addoption("--outcome-cache-refresh", action="store_true", default=False,
+                     help="Run every test again and refresh the outcome cache")
+    parser.addoption("--shard", default=None, metavar="i/N",
+                     help="Run shard i of N (from 1), the shards are balanced with the durations of past runs")
+    parser.addoption("--record-durations", action="store_true", default=False,
+                     help="Record the duration of every test, for --shard and bddScheduler")
+    parser.addoption("--envs", default=None,
+                     help="Comma separated environments, e.g. qa,prod: the environment specific tests run for each")
+    parser.addoption("--matrix-workers", type=int, default=0,
+                     help="With --envs, run the tests in this many forked worker processes")
+    parser.addoption("--impact", action="store_true", default=False,
+                     help="Only run the tests whose data, config, feature or code inputs changed since their last run")
+    parser.addoption("--impact-record", action="store_true", default=False,
+                     help="Run the selected tests as usual, but record their inputs for later --impact runs")
+    parser.addoption("--import-profile", nargs="?", const="", default=None, metavar="JSON_FILE",
+                     help="Print the import time of every test module, and write it to JSON_FILE when given")
 
 @pytest.fixture()
-def cmdOpt(pytestconfig):
-    opt = pytestconfig.getoption("cmdopt")
+def target_env(pytestconfig):
+    # The environment under test. With --envs, the tests using it are parametrized over the environments instead.
+    return pytestconfig.getoption("cmdopt")
+
+@pytest.fixture()
+def env_config(target_env):
+    # The read only config snapshot of the environment, config/<env>.ini
+    from pytest_topics.utils.configRegistry import get_config
+    return get_config(target_env)
+
+@pytest.fixture()
+def cmdOpt(target_env):
+    opt = target_env
     if opt == 'qa':
         f = open("qa.prop",'r+')
     elif opt == 'prod':
@@ -73,3 +223,57 @@ def cmdOpt(pytestconfig):
     else:
         f = open("unknown.prop",'r+')
     yield f
+
+
+##################
+# HTTP FIXTURES #
+##################
+
+@pytest.fixture(scope="session")
+def httpbin_url(pytestconfig):
+    url = pytestconfig.getoption("httpbin")
+    if url:
+        yield url.rstrip('/')
+        return
+    from pytest_topics.utils.httpStub import HttpbinStub
+    with HttpbinStub() as server:
+        yield server.url
+
+@pytest.fixture(scope="session")
+def http_session():
+    # One pooled session for the whole run, connections are reused instead of opened for every request.
+    requests = pytest.importorskip("requests")
+    with requests.Session() as session:
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        yield session
+
+
+@async_fixture(scope="session")
+async def async_http(http_session):
+    # Awaitable client over the pooled http_session, independent tests can wait on the network at the same time.
+    return AsyncHttpClient(http_session)
+
+
+###################
+# ASYNC FIXTURES #
+###################
+
+@async_fixture()
+async def afile_write(file_backend):
+    # async version of file_write
+    f = await asyncio.to_thread(file_backend.create, "file1.txt", "Pytest is good.")
+    print("File Written with Data.")
+    yield AsyncFile(f)
+    await asyncio.to_thread(file_backend.release, f)
+    print("\n File is deleted after, test execution.")
+
+@async_fixture()
+async def acmdOpt(target_env):
+    # async version of cmdOpt, the .prop files are read from this directory whatever the current directory is.
+    opt = target_env
+    prop = {'qa': qa_prop, 'prod': prod_prop}.get(opt, 'unknown.prop')
+    f = AsyncFile(await asyncio.to_thread(open, BASE_DIR.joinpath(prop), 'r'))
+    yield f
+    await f.close()
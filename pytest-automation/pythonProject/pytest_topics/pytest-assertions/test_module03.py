@@ -1,7 +1,8 @@
 
 import pytest
 import re
-import requests
+
+from pytest_topics.utils.httpStub import HttpbinStub
 
 testset = [(1,2),(2,1)]
 
@@ -23,9 +24,9 @@ class TestCases:
         rhs = asq - bsq
         assert lhs == rhs
 
-    def test_404(self):
+    def test_404(self, http_session, httpbin_url):
         with pytest.raises(Exception):
-            assert requests.get("https://httpbin.org/status/404"), f"404 Response Code"
+            assert http_session.get(f"{httpbin_url}/status/404"), f"404 Response Code"
 
     def test_error_assert(self):
         with pytest.raises(Exception) as e:
@@ -39,7 +40,9 @@ class TestCases:
 
     def run_tests(self):
         self.test_zero_divisibility()
-        self.test_404()
+        import requests # only needed when the file is run as a script
+        with HttpbinStub() as server, requests.Session() as session:
+            self.test_404(session, server.url)
         self.test_tuple_cmpr()
 
 
@@ -1,7 +1,9 @@
 import sys
 
 import pytest
-import requests
+
+from pytest_topics.utils.batchParametrize import batch_parametrize
+from pytest_topics.utils.httpStub import HttpbinStub
 
 # Corrected testset (fixed last entry and added missing Celsius value)
 cent = [8, 42, 100, 23, 35]
@@ -23,6 +25,23 @@ class TestCases:
         # Use pytest.approx for floating point comparisons
         assert result == pytest.approx(expected, rel=1e-3)
 
+    # Same check as test_conversion, but a single test item converts every value at once.
+    @batch_parametrize("cent,expected", zip(cent, faren))
+    def test_conversion_batch(self, cent, expected, batch):
+        result = self.cent_to_faren(cent)
+        batch.assert_approx(result, expected, rel=1e-3)
+
+    @pytest.mark.xfail(reason="The last expected value is wrong, only that parameter set is reported")
+    @batch_parametrize("cent,expected", [(8, 46.4), (42, 107.6), (100, 213.0)])
+    def test_conversion_batch_fail(self, cent, expected, batch):
+        batch.assert_approx(self.cent_to_faren(cent), expected, rel=1e-3)
+
+    # Tolerances of batch.assert_approx are the ones of pytest.approx, values near zero included.
+    @batch_parametrize("actual,expected", [pytest.param(1e-13, 0.0, id='near_zero'), (100.05, 100.0)])
+    def test_approx_tolerance_batch(self, actual, expected, batch):
+        assert all(a == pytest.approx(e, rel=1e-3) for a, e in zip(actual, expected))
+        batch.assert_approx(actual, expected, rel=1e-3)
+
     def test_no_input(self):
         """Test default parameter value"""
         assert self.cent_to_faren() == 32
@@ -35,13 +54,13 @@ class TestCases:
         assert type(result) == float
 
     @pytest.mark.skipif(sys.version_info > (3,6),reason="Don't execute this for python version above 3.8")
-    def test_404(self):
+    def test_404(self, http_session, httpbin_url):
         with pytest.raises(Exception):
-            assert requests.get("https://httpbin.org/status/404"), f"404 Response Code"
+            assert http_session.get(f"{httpbin_url}/status/404"), f"404 Response Code"
 
     @pytest.mark.xfail(sys.version_info > (3,6),reason="Don't execute this for python version above 3.8")
-    def test_404_xfail(self):
-        assert requests.get("https://httpbin.org/status/404"), f"404 Response Code"
+    def test_404_xfail(self, http_session, httpbin_url):
+        assert http_session.get(f"{httpbin_url}/status/404"), f"404 Response Code"
 
     @pytest.mark.xfail(reason="Expected to fail")
     def test_no_input_xpass(self):
@@ -52,7 +71,9 @@ class TestCases:
 
         self.test_no_input()
         self.test_no_input_xpass()
-        self.test_404_xfail()
+        import requests # only needed when the file is run as a script
+        with HttpbinStub() as server, requests.Session() as session:
+            self.test_404_xfail(session, server.url)
         for a,b in testset:
             self.test_conversion(a,b)
 
@@ -0,0 +1,45 @@
+
+pytest_plugins = ['pytester']
+
+# test_waits only passes when test_fails runs while it is waiting, the group runs them together on the loop
+TESTS = """
+import asyncio
+import pytest
+
+@pytest.fixture(scope='class')
+def started():
+    return asyncio.Event()
+
+class TestGroup:
+
+    @pytest.mark.async_concurrent
+    async def test_waits(self, started):
+        await asyncio.wait_for(started.wait(), 1)
+
+    @pytest.mark.async_concurrent
+    async def test_fails(self, started):
+        started.set()
+        await asyncio.sleep(0)
+        assert False, 'failed next to test_waits'
+
+    async def test_after(self):
+        pass
+"""
+
+class TestCases:
+
+    def test_concurrentGroup(self, pytester):
+        pytester.makepyfile(TESTS)
+        result = pytester.runpytest('-p', 'pytest_topics.conftest', '-p', 'no:cacheprovider', '--async-concurrency', '2',
+                                    '-v')
+        result.assert_outcomes(passed=2, failed=1)
+        # Reported one by one, in the collected order, the failure with its own test
+        result.stdout.fnmatch_lines(['*::TestGroup::test_waits PASSED*', '*::TestGroup::test_fails FAILED*',
+                                     '*::TestGroup::test_after PASSED*', '*AssertionError: failed next to test_waits*'])
+        result.stdout.no_fnmatch_line('*test_waits*Timeout*')
+
+    def test_oneByOneWithoutConcurrency(self, pytester):
+        pytester.makepyfile(TESTS)
+        result = pytester.runpytest('-p', 'pytest_topics.conftest', '-p', 'no:cacheprovider')
+        # test_waits runs alone first, nobody sets the event
+        result.assert_outcomes(passed=1, failed=2)
@@ -0,0 +1,35 @@
+import asyncio
+import pytest
+
+
+class TestCases:
+
+    async def test_sleep(self):
+        await asyncio.sleep(0)
+        assert 1 == 1
+
+    @pytest.mark.async_concurrent
+    async def test_404(self, async_http, httpbin_url):
+        response = await async_http.get(f"{httpbin_url}/status/404")
+        assert response.status_code == 404
+
+    @pytest.mark.async_concurrent
+    async def test_200(self, async_http, httpbin_url):
+        response = await async_http.get(f"{httpbin_url}/status/200")
+        assert response.status_code == 200
+
+    @pytest.mark.async_concurrent
+    async def test_get(self, async_http, httpbin_url):
+        response = await async_http.get(f"{httpbin_url}/get", params={'city': 'Delhi'})
+        assert response.json()['args'] == {'city': 'Delhi'}
+
+    @pytest.mark.async_concurrent
+    @pytest.mark.xfail(reason="Expected to fail")
+    async def test_500(self, async_http, httpbin_url):
+        assert await async_http.get(f"{httpbin_url}/status/500"), f"500 Response Code"
+
+    async def test_fileData(self, afile_write):
+        assert await afile_write.readline() == "Pytest is good."
+
+    async def test_readCmdOpt(self, acmdOpt):
+        print(f"Reading the config file: {await acmdOpt.readline()}")
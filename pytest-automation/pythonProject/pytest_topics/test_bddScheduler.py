@@ -0,0 +1,34 @@
+import io
+
+import pytest
+from pytest_topics.utils.bddScheduler import overall_code, plan, run_shards
+
+MODULE = 'pytest_topics/test_module01.py'
+
+class TestCases:
+
+    @pytest.mark.parametrize("codes,expected", [
+        ([0, 0], 0),
+        ([0, 1], 1),
+        ([5, 1], 1), # a shard without tests does not hide the failures of another one
+        ([5, 0], 0),
+        ([5, 5], 5),
+        ([1, 2, 0], 2),
+        ([4, 1], 4),
+        ([1, -9], 3), # a worker killed by a signal
+    ])
+    def test_overallCode(self, codes, expected):
+        assert overall_code(codes) == expected
+
+    def test_planQueuesNewTests(self):
+        shards, queue = plan(['a', 'b', 'c', 'new'], 2, {'a': 3.0, 'b': 2.0, 'c': 1.0})
+        assert shards == [['a'], ['b', 'c']]
+        assert queue == ['new']
+
+    def test_runShards(self):
+        out = io.StringIO()
+        codes = run_shards([[f"{MODULE}::test_addition"], [f"{MODULE}::test_subtraction"]], ['-p', 'no:cacheprovider'],
+                           out, queue=[f"{MODULE}::test_integer_division"], workers=2)
+        assert sorted(codes) == [0, 0, 1] # test_subtraction fails on purpose
+        assert overall_code(codes) == 1
+        assert out.getvalue().count("===== worker") == 3
@@ -1,8 +1,135 @@
+import os
+import subprocess
+import sys
+
 import pytest
-from pytest_topics.utils.utils import get_data
+from pytest_topics.utils.utils import get_data, count_rows, iter_data, iter_chunks, row_offsets, shard_range
+from pytest_topics.utils import dataPlane
+from pytest_topics.utils.datacache import DATA_PLANE_ENV, load_data, cache_path, is_fresh, read_meta
+
+# Number of csv rows checked by a single test item, this keeps the count of collected items small for big files.
+CHUNK_SIZE = 10000
+# Synthetic rows with the columns of data.csv (see utils/dataGenerator.py), checked SYNTHETIC_CHUNK at a time.
+SYNTHETIC_ROWS = 100000
+SYNTHETIC_CHUNK = 25000
+
+def pytest_generate_tests(metafunc):
+    # The data file is read when these tests are collected, importing the module does not parse it
+    if metafunc.function.__name__ == 'test_checkFileData':
+        # The row numbers only: every item reads its row from the columnar cache, or from shared memory with
+        # --data-plane, no list of every row is built at collection
+        metafunc.parametrize("row", range(len(load_data())))
+    elif metafunc.function.__name__ == 'test_checkFileDataChunk':
+        # One pass over the file at collection, every item then seeks to its first row
+        metafunc.parametrize("offset", row_offsets(CHUNK_SIZE))
 
 class TestCases:
 
-    @pytest.mark.parametrize("a,b,c,d",get_data())
-    def test_checkFileData(self,a,b,c,d):
+    def test_checkFileData(self, row):
+        a, b, c, d = next(load_data().iter_rows(start=row, stop=row + 1))
         print(f"{b}'s  age is {a}.")
+
+    def test_checkFileDataChunk(self, offset):
+        for age, name, salary, city in iter_data(offset=offset, stop=CHUNK_SIZE):
+            assert isinstance(age, int)
+            assert isinstance(salary, (int, float))
+
+    def test_columnProjection(self):
+        rows = list(iter_data(columns=['city', 'name']))
+        assert rows[0] == ('banaglore', 'aman')
+
+    def test_rowOffsets(self, tmp_path):
+        csv_file = tmp_path.joinpath("data.csv")
+        csv_file.write_text('age,name\n24,"aman\nsingh"\n\n25,aziz\n26,harikesh\n')
+        assert count_rows(csv_file) == len(list(iter_data(csv_file))) == 3
+        offsets = row_offsets(2, csv_file)
+        assert len(offsets) == 2
+        assert list(iter_data(csv_file, offset=offsets[0], stop=2)) == [(24, 'aman\nsingh'), (25, 'aziz')]
+        assert list(iter_data(csv_file, offset=offsets[1], stop=2)) == [(26, 'harikesh')]
+
+    def test_chunks(self):
+        chunks = list(iter_chunks(chunk_size=3))
+        assert [len(chunk) for chunk in chunks] == [3, 1]
+
+    def test_shardRange(self):
+        shards = [shard_range(i, 3) for i in range(3)]
+        assert shards == [(0, 2), (2, 3), (3, 4)]
+        assert sum(len(list(iter_data(start=s, stop=e))) for s, e in shards) == count_rows()
+
+    def test_cacheColumnTypes(self):
+        data = load_data()
+        assert data.column('age').format == 'q'
+        assert data.column('salary(lpa)').format == 'd'
+        assert list(data.column('city')) == [city for (city,) in iter_data(columns=['city'])]
+
+    def test_cacheRebuiltOnChange(self, tmp_path):
+        csv_file = tmp_path.joinpath("data.csv")
+        csv_file.write_text("age,name\n24,aman\n")
+        assert list(load_data(csv_file).iter_rows()) == [(24, 'aman')]
+        assert cache_path(csv_file).exists()
+
+        csv_file.write_text("age,name\n24,aman\n25,aziz\n")
+        assert list(load_data(csv_file).iter_rows()) == [(24, 'aman'), (25, 'aziz')]
+
+    def test_cacheKeepsTouchedMtime(self, tmp_path):
+        csv_file = tmp_path.joinpath("data.csv")
+        csv_file.write_text("age,name\n24,aman\n")
+        load_data(csv_file)
+        os.utime(csv_file, ns=(10 ** 18, 10 ** 18))
+        assert is_fresh(csv_file) # same content, found with the hash
+        assert read_meta(cache_path(csv_file))['source']['mtime_ns'] == 10 ** 18
+
+    @pytest.mark.parametrize("content", ["", "age,name\n24,aman\n25\n", "age,name\n24,aman,21\n"],
+                             ids=['empty', 'short_row', 'long_row'])
+    def test_cacheRejectsMalformedCsv(self, tmp_path, content):
+        csv_file = tmp_path.joinpath("data.csv")
+        csv_file.write_text(content)
+        with pytest.raises(ValueError):
+            load_data(csv_file)
+
+    @pytest.mark.parametrize("start", range(0, SYNTHETIC_ROWS, SYNTHETIC_CHUNK))
+    def test_syntheticDataChunk(self, start):
+        pytest.importorskip("numpy")
+        from pytest_topics.utils.dataGenerator import load_synthetic
+        data = load_synthetic(SYNTHETIC_ROWS, seed=7)
+        for age, name, salary, city in data.iter_rows(start=start, stop=start + SYNTHETIC_CHUNK):
+            assert 18 <= age <= 60
+            assert salary > 0
+
+    def test_syntheticDataDeterministic(self):
+        pytest.importorskip("numpy")
+        from pytest_topics.utils.dataGenerator import load_synthetic
+        data = load_synthetic(1000, seed=7, batch_size=64)
+        assert data.header == ['age', 'name', 'salary(lpa)', 'city']
+        assert list(data.iter_rows(start=100, stop=110)) == list(data.iter_rows())[100:110]
+        assert list(data.iter_rows(columns=['city'], stop=5)) == [row[3:] for row in get_data(rows=5, seed=7)]
+        assert get_data(rows=5, seed=7) != get_data(rows=5, seed=8)
+
+    # page and percentage contain "age" but get the generic column, not ages from 18 to 60
+    @pytest.mark.parametrize("name,like", [("age", "age"), ("salary(lpa)", "salary"), ("homeCity", "city"),
+                                           ("manager_name", "name"), ("page", "value"), ("percentage", "value")])
+    def test_syntheticColumnFromWords(self, name, like):
+        np = pytest.importorskip("numpy")
+        from pytest_topics.utils.dataGenerator import default_column
+        generated = default_column(name, ()).generate(np.random.default_rng(7), 20)
+        assert generated.tolist() == default_column(like, ()).generate(np.random.default_rng(7), 20).tolist()
+
+    def test_dataPlane(self, monkeypatch):
+        # publish() and close() change the environment of this process, monkeypatch puts it back
+        monkeypatch.setenv(DATA_PLANE_ENV, os.environ.get(DATA_PLANE_ENV, '{}'))
+        rows = [(24, 'aman', 21.0), (25, 'aziz', 4.2)]
+        data = dataPlane.publish('test_dataPlane', (['age', 'name', 'salary'], rows))
+        try:
+            assert list(data.iter_rows()) == rows
+            assert data.column('age').format == 'q'
+            # Other processes read the same block, found through the environment. They leave it in place when they
+            # exit: the resource tracker neither removes it nor warns about a leak.
+            code = ("from pytest_topics.utils.dataPlane import attach, close; "
+                    "print(list(attach('test_dataPlane').iter_rows())); close()")
+            for _ in range(2):
+                result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                        cwd=os.path.dirname(os.path.dirname(__file__)))
+                assert (result.stdout.strip(), result.stderr) == (str(rows), '')
+        finally:
+            dataPlane.close('test_dataPlane')
+        assert dataPlane.attach('test_dataPlane') is None
@@ -0,0 +1,81 @@
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+from pytest_topics.utils.envMatrix import SHARED, assign, env_of
+
+pytest_plugins = ['pytester']
+
+TESTS = """
+def test_url(env_config):
+    assert env_config['gmail']['url']
+
+def test_prod_only(target_env):
+    assert target_env == 'prod'
+
+def test_shared():
+    pass
+"""
+
+# Breaks the worker running the prod tests after its first test, outside of any test
+CRASH = """
+import os
+
+MAIN = os.getpid()
+
+def pytest_runtest_logfinish(nodeid):
+    if os.getpid() != MAIN and 'env=prod' in nodeid:
+        raise RuntimeError(f"worker broke after {nodeid}")
+"""
+
+class FakeItem:
+
+    def __init__(self, name, env=None):
+        self.name = name
+        self.callspec = SimpleNamespace(params={'target_env': env}) if env else None
+
+class TestCases:
+
+    def test_assignKeepsEnvironmentsTogether(self):
+        items = [FakeItem('a', 'qa'), FakeItem('b', 'prod'), FakeItem('c'), FakeItem('d', 'qa'), FakeItem('e', 'qa')]
+        shards = assign(items, 2)
+        assert [[item.name for item in shard] for shard in shards] == [['a', 'd', 'e'], ['b', 'c']]
+        assert [env_of(item) for item in shards[1]] == ['prod', SHARED]
+        assert len(assign(items, 8)) == 3 # one worker per environment at most
+
+    def test_matrix(self, pytester):
+        pytester.makepyfile(TESTS)
+        result = pytester.runpytest('-p', 'pytest_topics.conftest', '-p', 'no:cacheprovider', '--envs', 'qa,prod', '-v')
+        result.assert_outcomes(passed=4, failed=1)
+        result.stdout.fnmatch_lines(["*test_url[[]env=qa[]] PASSED*", "*test_url[[]env=prod[]] PASSED*",
+                                     "*results per environment*", "qa * 1 failed, 1 passed", "prod * 2 passed",
+                                     "(shared) * 1 passed"])
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason="the matrix workers need os.fork")
+    def test_matrixWorkers(self, pytester):
+        pytester.makepyfile(TESTS)
+        result = pytester.runpytest('-p', 'pytest_topics.conftest', '-p', 'no:cacheprovider', '--envs', 'qa,prod',
+                                    '--matrix-workers', '2', '--timing-report', 'timing.json')
+        result.assert_outcomes(passed=4, failed=1)
+        result.stdout.fnmatch_lines(["qa * 1 failed, 1 passed", "prod * 2 passed"])
+        # The timing records of the tests come back from the workers
+        records = json.loads((pytester.path / 'timing.json').read_text())['records']
+        calls = sorted(record['nodeid'].split('::')[1] for record in records if record['kind'] == 'call')
+        assert calls == ['test_prod_only[env=prod]', 'test_prod_only[env=qa]', 'test_shared',
+                         'test_url[env=prod]', 'test_url[env=qa]']
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason="the matrix workers need os.fork")
+    def test_matrixWorkerCrash(self, pytester):
+        pytester.makepyfile(TESTS)
+        pytester.makeconftest(CRASH)
+        result = pytester.runpytest('-p', 'pytest_topics.conftest', '-p', 'no:cacheprovider', '--envs', 'qa,prod',
+                                    '--matrix-workers', '2')
+        # The first prod test ran, the second one is lost with the crash; qa and the shared test are not affected
+        result.assert_outcomes(passed=3, failed=2)
+        result.stdout.fnmatch_lines(["*_ test_prod_only[[]env=prod[]] _*",
+                                     "worker process ended (status *) before the test finished: RuntimeError: worker "
+                                     "broke after test_matrixWorkerCrash.py::test_url[[]env=prod[]]",
+                                     "*results per environment*", "qa * 1 failed, 1 passed",
+                                     "prod * 1 failed, 1 passed", "prod * worker crashed:", "    Traceback*",
+                                     "    RuntimeError: worker broke after *", "(shared) * 1 passed"])
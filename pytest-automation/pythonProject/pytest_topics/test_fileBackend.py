@@ -0,0 +1,69 @@
+import os
+
+import pytest
+from pytest_topics.utils import fileBackend
+from pytest_topics.utils.fileBackend import DirectoryBackend, MemoryBackend, TmpfsBackend, get_backend
+
+class TestCases:
+
+    @pytest.mark.parametrize("name", ["memory", "tmpfs", "disk"])
+    def test_createReadWrite(self, name):
+        backend = get_backend(name)
+        try:
+            f = backend.create("file1.txt", "Pytest is good.")
+            assert f.readline() == "Pytest is good."
+            f.write(" Really.")
+            f.seek(0)
+            assert f.read() == "Pytest is good. Really."
+            backend.release(f)
+        finally:
+            backend.cleanup()
+
+    def test_uniqueNames(self, tmp_path):
+        for backend in (MemoryBackend(), DirectoryBackend(tmp_path)):
+            first, second = backend.create("file1.txt"), backend.create("file1.txt")
+            assert first.name != second.name
+            assert first.name.endswith("file1.txt")
+            backend.cleanup()
+
+    def test_memoryNameIsNoPath(self):
+        f = MemoryBackend().create("file1.txt")
+        assert f.name.startswith("memory:")
+        assert not os.path.exists(f.name)
+
+    def test_filesInWorkerDirectory(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw3")
+        backend = DirectoryBackend(tmp_path)
+        f = backend.create("file1.txt", "data")
+        assert os.path.dirname(f.name) == str(backend.root)
+        assert backend.root.name.startswith("pytest-files-gw3-")
+        assert backend.root.parent == tmp_path
+        backend.release(f)
+        backend.cleanup()
+        assert not backend.root.exists()
+
+    def test_releasedFilesDeletedInBatches(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(fileBackend, "CLEANUP_BATCH", 3)
+        backend = DirectoryBackend(tmp_path)
+        files = [backend.create("file1.txt") for _ in range(3)]
+        for f in files[:2]:
+            backend.release(f)
+        assert all(os.path.exists(f.name) for f in files)
+        backend.release(files[2])
+        assert not any(os.path.exists(f.name) for f in files)
+        backend.cleanup()
+
+    def test_tmpfsFallsBackToTempDirectory(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(fileBackend, "TMPFS_DIR", str(tmp_path.joinpath("missing")))
+        monkeypatch.setattr(fileBackend.tempfile, "tempdir", str(tmp_path))
+        backend = TmpfsBackend()
+        assert backend.root.parent == tmp_path
+        backend.cleanup()
+
+    def test_unknownBackend(self):
+        with pytest.raises(ValueError, match="Unknown file backend 'ram'"):
+            get_backend("ram")
+
+    def test_fileWriteName(self, file_backend, file_write):
+        assert pytest.filename == file_write.name
+        assert os.path.isfile(pytest.filename) == (file_backend.name != "memory")
@@ -0,0 +1,74 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from pytest_topics.utils.fixtureGraph import FixtureGraph, FixtureNode, grouped_order, simulate
+
+pytest_plugins = ['pytester']
+
+# ab/test_ab.py gets the function scoped `base` of the root conftest.py, not the session one of a/conftest.py
+# whose directory is a prefix of its name.
+CONFTEST = """
+import pytest
+
+@pytest.fixture()
+def base():
+    return 'root'
+"""
+
+A_CONFTEST = """
+import pytest
+
+@pytest.fixture(scope='session')
+def base():
+    return 'a'
+"""
+
+HELPER = """
+import pytest
+
+@pytest.fixture()
+def helper(base):
+    return base
+
+def test_one(helper):
+    pass
+
+def test_two(helper):
+    pass
+"""
+
+class TestCases:
+
+    def test_fixtureGraphReorder(self):
+        db = FixtureNode(SimpleNamespace(baseid='', argname='db', scope='session', params=['a', 'b'], argnames=(),
+                                         func=None), '/')
+        nodes = {'db': db}
+        ids = dict(function='', module='test_a.py', session='', package='', **{'class': 'test_a.py'})
+        tests = {name: (dict(ids, function=name), {'db': param}) for name, param in (('t1', 0), ('t2', 1), ('t3', 0))}
+        assert simulate(['t1', 't2', 't3'], tests, nodes) == {'db': 3}
+        order = grouped_order(['t1', 't2', 't3'], tests, nodes, {})
+        assert order == ['t1', 't3', 't2'] and simulate(order, tests, nodes) == {'db': 2}
+        # Function scoped, db would be set up for every test whatever the order
+        assert simulate(order, tests, nodes, {'db': 'function'}) == {'db': 3}
+
+    def test_dependenciesResolvedPerTest(self, pytester):
+        pytester.makeconftest(CONFTEST)
+        pytester.mkpydir('a').joinpath('conftest.py').write_text(A_CONFTEST)
+        pytester.path.joinpath('a', 'test_a.py').write_text(HELPER)
+        pytester.mkpydir('ab').joinpath('test_ab.py').write_text(HELPER)
+        plugin = FixtureGraph(str(pytester.path), str(pytester.path / 'graph.json'))
+        pytester.runpytest('-p', 'no:cacheprovider', plugins=[plugin]).assert_outcomes(passed=4)
+
+        assert plugin.nodes['a/test_a.py::helper'].dependencies == {'a::base': 'session'}
+        assert plugin.nodes['ab/test_ab.py::helper'].dependencies == {'.::base': 'function'}
+        promoted = {promotion['fixture'] for promotion in json.loads((pytester.path / 'graph.json').read_text())['promotions']}
+        assert 'a/test_a.py::helper' in promoted and 'ab/test_ab.py::helper' not in promoted
+
+    def test_reorderNeedsRecordedCosts(self, pytester):
+        pytester.makepyfile(HELPER.replace('(base)', '()').replace('return base', 'return 1'))
+        plugin = FixtureGraph(str(pytester.path), reorder=True)
+        result = pytester.runpytest('-p', 'no:cacheprovider', plugins=[plugin])
+        result.assert_outcomes(passed=2)
+        assert plugin.no_costs and plugin.reordered is None
+        result.stdout.fnmatch_lines(["*--fixture-reorder: no fixture costs recorded yet, the collected order was kept"])
@@ -1,6 +1,8 @@
 import pytest
 import os
 
+from pytest_topics.utils.sharedFixture import FixtureMutationWarning, shared_fixture
+
 
 class TestCases:
 
@@ -35,7 +37,9 @@ class TestCases:
     def test_fixtureAccessUsingMark(self):
         assert setup_city[0] == 'Singapore'
 
-    @pytest.fixture()
+    # Runs once per session, so the teardown below runs at the end of the session.
+    # test_completeWeek extends the week on purpose: it gets its own copy without a warning.
+    @shared_fixture(warn=False)
     def teardown_setup(self):
         wk = pytest.days_1.copy()
         wk.append('thur')
@@ -53,7 +57,7 @@ class TestCases:
         except Exception as e:
             print(f"Error Occured: {e}.")
 
-    @pytest.fixture()
+    @shared_fixture()
     def days_2_manipulation(self):
         wk = pytest.days_2.copy()
         wk.insert(0,'thur')
@@ -66,6 +70,16 @@ class TestCases:
         except Exception as e:
             print(f"Unexpected Error Occurred: {e}")
 
+    def test_sharedCityUnchanged(self, setup_city):
+        # test_city_reversed reversed its own copy, not the shared list
+        assert list(setup_city) == ['Singapore', 'Delhi', 'Chicago', 'Almaty']
+
+    def test_sharedCityCopyOnWrite(self, setup_city):
+        with pytest.warns(FixtureMutationWarning):
+            setup_city.append('Paris')
+        assert setup_city[-1] == 'Paris'
+        setup_city.pop() # already a private copy, no second warning
+
     def test_fileData(self, file_write):
         try:
             assert (file_write.readline()) == "Pytest is good."
@@ -1,6 +1,9 @@
 import pytest
 from pytest_topics.utils.configParserOOP import ConfigParser
+from pytest_topics.utils.configRegistry import get_config
+from pytest_topics.utils.configWatcher import ConfigWatcher
 
+# Nothing is read here: prod.ini is parsed by the first getter call, once per process.
 config  = ConfigParser('prod.ini')
 class TestCases():
 
@@ -10,6 +13,44 @@ class TestCases():
     def test_getGmailUrl_prod(self):
         assert config.getGmailUrl() == 'qa_prod.gmail.com'
 
+    def test_configNotMerged(self):
+        # Each .ini file has its own snapshot, building the qa config does not change the prod one.
+        qa_config = ConfigParser('qa.ini')
+        assert qa_config.getGmailUrl() == 'qa.gmail.com'
+        assert config.getGmailUrl() == 'qa_prod.gmail.com'
+
+    def test_configParsedOnce(self):
+        assert ConfigParser('prod.ini').config is get_config('prod')
+
+    def test_configReadOnly(self):
+        with pytest.raises(AttributeError):
+            config.config.gmail.url = 'changed.gmail.com'
+
+    def test_envConfig(self, target_env, env_config):
+        # With --envs qa,prod this runs once for each environment
+        assert env_config is get_config(target_env)
+        assert env_config.gmail.url.endswith('.gmail.com')
+
+    def test_configReload(self, tmp_path):
+        cfg_file = tmp_path.joinpath('watched.ini')
+        cfg_file.write_text("[gmail]\nurl = qa.gmail.com\n\n[outlook]\nurl = qa.outlook.com\n")
+        watcher = ConfigWatcher(['watched'], config_dir=tmp_path, use_inotify=False)
+        assert watcher.reload('watched') == {} # nothing was read from it yet, so nothing changed
+
+        seen = []
+        watcher.subscribe(lambda env, changes: seen.append(changes), keys=['gmail'])
+        cfg_file.write_text("[gmail]\nurl = qa.gmail.com\n\n[outlook]\nurl = new.qa.outlook.com\n")
+        assert watcher.check() == ['watched']
+        assert seen == []
+
+        cfg_file.write_text("[gmail]\nurl = new.qa.gmail.com\n\n[outlook]\nurl = new.qa.outlook.com\n")
+        watcher.check()
+        assert seen == [{('gmail', 'url'): ('qa.gmail.com', 'new.qa.gmail.com')}]
+        assert watcher.snapshots['watched'].gmail.url == 'new.qa.gmail.com'
+        # tmp_path is not CONFIG_DIR, the process wide registry does not get an environment named 'watched'
+        with pytest.raises(FileNotFoundError):
+            get_config('watched')
+
 
 
 
@@ -0,0 +1,19 @@
+import threading
+
+from pytest_topics.utils.httpStub import HttpbinStub
+
+class TestCases:
+
+    def test_stopWithoutStart(self):
+        stub = HttpbinStub()
+        stopper = threading.Thread(target=stub.stop, daemon=True)
+        stopper.start()
+        stopper.join(timeout=5)
+        assert not stopper.is_alive()
+        assert stub.server.socket.fileno() == -1 # the listening socket is closed all the same
+
+    def test_stopTwice(self):
+        stub = HttpbinStub().start()
+        stub.stop()
+        stub.stop()
+        assert stub.thread is None
@@ -0,0 +1,22 @@
+import json
+
+pytest_plugins = ['pytester']
+
+class TestCases:
+
+    def test_importProfile(self, pytester):
+        pytester.makepyfile(profiled_helper="VALUE = 1\n")
+        pytester.makepyfile(test_heavy="import profiled_helper\n\ndef test_heavy():\n    assert profiled_helper.VALUE\n",
+                            test_light="def test_light():\n    pass\n")
+        report = pytester.path / 'imports.json'
+        result = pytester.runpytest('-p', 'pytest_topics.conftest', '-p', 'no:cacheprovider',
+                                    f'--import-profile={report}')
+        result.assert_outcomes(passed=2)
+        # The test module itself is among the modules its collection imports
+        result.stdout.fnmatch_lines(['*= import time per test module =*',
+                                     '*ms * modules  test_heavy.py  first imports: profiled_helper, test_heavy',
+                                     '*ms in total'])
+
+        records = {record['nodeid']: record for record in json.loads(report.read_text())}
+        assert records['test_heavy.py']['packages'] == ['profiled_helper', 'test_heavy']
+        assert records['test_light.py']['packages'] == ['test_light'] and records['test_light.py']['kind'] == 'Module'
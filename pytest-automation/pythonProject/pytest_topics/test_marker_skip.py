@@ -1,6 +1,7 @@
 import sys
 import pytest
-import requests
+
+from pytest_topics.utils.httpStub import HttpbinStub
 
 pytestmark = [pytest.mark.markerr,pytest.mark.temp_conversion, pytest.mark.str_test]
 
@@ -38,9 +39,9 @@ class TestCases:
         assert type(result) == float
 
     @pytest.mark.skipif(sys.version_info > (3,6),reason="Don't execute this for python version above 3.8")
-    def test_404(self):
+    def test_404(self, http_session, httpbin_url):
         with pytest.raises(Exception):
-            assert requests.get("https://httpbin.org/status/404"), f"404 Response Code"
+            assert http_session.get(f"{httpbin_url}/status/404"), f"404 Response Code"
 
     @pytest.mark.str_test
     def test_str_slice(self):
@@ -57,14 +58,16 @@ class TestCases:
         assert s.split(',') == ['My name is Aman and', ' I am a Python Developer']
 
     @pytest.mark.xfail(reason="Expected to fail")
-    def test_404_xfail(self):
-        assert requests.get("https://httpbin.org/status/404"), f"404 Response Code"
+    def test_404_xfail(self, http_session, httpbin_url):
+        assert http_session.get(f"{httpbin_url}/status/404"), f"404 Response Code"
 
     def run_tests(self):
 
         self.test_no_input()
-        self.test_404()
-        self.test_404_xfail()
+        import requests # only needed when the file is run as a script
+        with HttpbinStub() as server, requests.Session() as session:
+            self.test_404(session, server.url)
+            self.test_404_xfail(session, server.url)
         self.test_str_slice()
         self.test_str_split()
         for a,b in testset:
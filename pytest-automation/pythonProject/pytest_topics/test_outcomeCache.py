@@ -0,0 +1,104 @@
+import hashlib
+import os
+
+import pytest
+from pytest_topics.utils import outcomeCache
+
+pytest_plugins = ['pytester']
+
+# test_env reads --cmdopt through the target_env fixture of pytest_topics/conftest.py
+TESTS = """
+import os
+
+LIMIT = {limit}
+
+def test_env(target_env):
+    assert target_env in ('qa', 'prod')
+
+def test_limit():
+    assert LIMIT < 10
+
+def test_url():
+    assert os.environ.get('TOPICS_URL', 'http://qa') != 'http://broken'
+"""
+
+# The tests call their helpers through self. and cls., like TestCases.cent_to_faren in test_marker_skip.py
+CLASS_TESTS = """
+class TestConversion:
+
+    @staticmethod
+    def cent_to_faren(cent):
+        return cent * 9 / 5 + {offset}
+
+    @classmethod
+    def boiling(cls):
+        return cls.cent_to_faren({boiling})
+
+    def test_conversion(self):
+        assert self.cent_to_faren(100) == 212
+
+    def test_boiling(self):
+        assert self.boiling() == 212
+"""
+
+def digest(func):
+    h = hashlib.sha256()
+    outcomeCache.hash_function(func, h, os.path.dirname(__file__))
+    return h.hexdigest()
+
+class TestCases:
+
+    def test_outcomeCacheKey(self):
+        def equation(a, b):
+            return a + b == 3
+
+        def equation_changed(a, b):
+            return a + b == 4
+        assert digest(equation) == digest(equation)
+        assert digest(equation) != digest(equation_changed)
+        # The project functions it calls count too: hash_function calls _hash_code
+        alone = hashlib.sha256()
+        outcomeCache._hash_code(outcomeCache.hash_function.__code__, alone)
+        assert digest(outcomeCache.hash_function) != alone.hexdigest()
+
+    def test_outcomeCacheKeyValues(self, pytester, monkeypatch):
+        def run(*args):
+            result = pytester.runpytest('-p', 'pytest_topics.conftest', '--outcome-cache', *args)
+            return result, [line for line in result.outlines if line.startswith('outcome cache:')]
+
+        monkeypatch.delenv('TOPICS_URL', raising=False)
+        pytester.makepyfile(test_values=TESTS.format(limit=3))
+        assert run()[1] == ["outcome cache: 0 passes replayed, 3 tests run"]
+        assert run()[1] == ["outcome cache: 3 passes replayed, 0 tests run"]
+        # Another option value, environment variable or global value runs the tests reading it again
+        result, summary = run('--cmdopt', 'prod')
+        assert summary == ["outcome cache: 2 passes replayed, 1 tests run"]
+        monkeypatch.setenv('TOPICS_URL', 'http://broken')
+        result, summary = run()
+        result.assert_outcomes(passed=2, failed=1)
+        pytester.makepyfile(test_values=TESTS.format(limit=30))
+        result, summary = run()
+        result.assert_outcomes(passed=1, failed=2)
+        assert summary == ["outcome cache: 1 passes replayed, 2 tests run"]
+
+    def test_outcomeCacheKeyMethods(self, pytester):
+        def run():
+            result = pytester.runpytest('-p', 'pytest_topics.conftest', '--outcome-cache')
+            return result, [line for line in result.outlines if line.startswith('outcome cache:')]
+
+        pytester.makepyfile(test_methods=CLASS_TESTS.format(offset=32, boiling=100))
+        run()
+        assert run()[1] == ["outcome cache: 2 passes replayed, 0 tests run"]
+        # A changed static method runs both tests again, a changed class method too
+        pytester.makepyfile(test_methods=CLASS_TESTS.format(offset=33, boiling=100))
+        result, summary = run()
+        result.assert_outcomes(failed=2)
+        pytester.makepyfile(test_methods=CLASS_TESTS.format(offset=32, boiling=99))
+        result, summary = run()
+        result.assert_outcomes(passed=1, failed=1)
+        assert summary == ["outcome cache: 0 passes replayed, 2 tests run"]
+
+    def test_plainRepr(self):
+        assert outcomeCache.plain_repr({'b': (1, 2.5), 'a': None}) == "dict('b':tuple(1, 2.5), 'a':None)"
+        assert outcomeCache.plain_repr({'y', 'x'}) == outcomeCache.plain_repr({'x', 'y'}) == "set('x', 'y')"
+        assert outcomeCache.plain_repr([1, object()]) is None
@@ -0,0 +1,54 @@
+import pytest
+from pytest_topics.utils.sharding import lpt, parse_shard, read_durations
+
+pytest_plugins = ['pytester']
+
+TESTS = """
+import time
+
+def test_a():
+    pass
+
+def test_b():
+    pass
+
+def test_slow():
+    time.sleep(0.2)
+
+def test_c():
+    pass
+"""
+
+class TestCases:
+
+    def test_parseShard(self):
+        assert parse_shard('2/4') == (2, 4)
+        with pytest.raises(ValueError):
+            parse_shard('5/4')
+
+    def test_shardBalance(self):
+        node_ids = ['a', 'b', 'c', 'd', 'new']
+        plans, loads = lpt(node_ids, 2, {'a': 4.0, 'b': 3.0, 'c': 2.0, 'd': 1.0})
+        assert sorted(sum(plans, [])) == sorted(node_ids)
+        assert plans == [['a', 'c'], ['b', 'd', 'new']] # 'new' counts as the median, 2.5s
+        assert loads == [6.0, 6.5]
+
+    def test_durationsInPytestCache(self, pytester):
+        pytester.makepyfile(TESTS)
+        pytester.runpytest('-p', 'pytest_topics.conftest', '--record-durations').assert_outcomes(passed=4)
+        durations = read_durations(pytester.path)
+        assert sorted(durations) == [f"test_durationsInPytestCache.py::test_{name}" for name in ('a', 'b', 'c', 'slow')]
+        assert durations["test_durationsInPytestCache.py::test_slow"] >= 0.2
+
+        # The slow test alone makes up the first shard, the other three the second one
+        first = pytester.runpytest('-p', 'pytest_topics.conftest', '--shard', '1/2', '-v')
+        first.assert_outcomes(passed=1)
+        first.stdout.fnmatch_lines(["*test_slow PASSED*"])
+        pytester.runpytest('-p', 'pytest_topics.conftest', '--shard', '2/2').assert_outcomes(passed=3)
+
+    def test_withoutCache(self, pytester):
+        pytester.makepyfile(TESTS)
+        result = pytester.runpytest('-p', 'pytest_topics.conftest', '-p', 'no:cacheprovider', '--record-durations',
+                                    '--shard', '1/2')
+        result.assert_outcomes(passed=2)
+        assert read_durations(pytester.path) == {}
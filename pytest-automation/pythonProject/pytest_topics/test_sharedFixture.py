@@ -0,0 +1,78 @@
+import json
+import warnings
+
+import pytest
+from pytest_topics.utils.sharedFixture import CowDict, CowList, FixtureMutationWarning, make_view
+
+pytest_plugins = ['pytester']
+
+DATA = {'cities': ['Singapore', 'Delhi'], 'sizes': {'Delhi': [1, 2]}}
+
+CONFTEST = """
+import pytest
+from pytest_topics.utils.sharedFixture import shared_fixture
+
+@pytest.fixture(params=['qa', 'prod'])
+def env(request):
+    return request.param
+
+@pytest.fixture(scope='session')
+def base():
+    return ['base']
+
+@shared_fixture()
+def from_env(env):
+    return [env]
+
+@shared_fixture()
+def from_tmp_path(tmp_path):
+    return [str(tmp_path)]
+
+@shared_fixture()
+def from_base(base):
+    return base + ['more']
+"""
+
+class TestCases:
+
+    def test_viewsAreListsAndDicts(self):
+        view = make_view(DATA, 'data')
+        assert isinstance(view, dict) and isinstance(view['cities'], list)
+        assert json.loads(json.dumps(view)) == DATA
+
+    def test_nestedChangesStayInTheTest(self):
+        view = make_view(DATA, 'data')
+        with pytest.warns(FixtureMutationWarning):
+            view['sizes']['Delhi'].append(3)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error') # one warning per test
+            view['cities'][0] = 'Paris'
+        assert DATA == {'cities': ['Singapore', 'Delhi'], 'sizes': {'Delhi': [1, 2]}}
+        assert make_view(DATA, 'data') == DATA
+
+    def test_viewOfView(self):
+        view = make_view(make_view(DATA, 'data'), 'data', warn=False)
+        assert type(view) is CowDict and type(view['cities']) is CowList
+        view['cities'].clear()
+        assert DATA['cities'] == ['Singapore', 'Delhi']
+
+    def test_copyMode(self):
+        view = make_view(DATA, 'data', mode='copy')
+        assert type(view) is dict and view == DATA and view['sizes'] is not DATA['sizes']
+
+    def test_dependencies(self, pytester):
+        pytester.makeconftest(CONFTEST)
+        pytester.makepyfile("""
+            def test_env(from_env):
+                pass
+
+            def test_tmp_path(from_tmp_path):
+                pass
+
+            def test_base(from_base):
+                assert from_base == ['base', 'more']
+        """)
+        result = pytester.runpytest('-p', 'no:cacheprovider')
+        result.assert_outcomes(passed=1, errors=3)
+        result.stdout.fnmatch_lines(["*'from_env' depends on 'env', a parametrized fixture*",
+                                     "*'from_tmp_path' depends on 'tmp_path', a function scoped fixture*"])
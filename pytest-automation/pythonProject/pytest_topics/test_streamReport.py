@@ -0,0 +1,93 @@
+import gzip
+import json
+
+import pytest
+from pytest_topics.utils.streamReport import StreamReport
+
+pytest_plugins = ['pytester']
+
+TESTS = """
+import pytest
+
+@pytest.fixture()
+def noisy():
+    print('x' * 25)
+    yield
+    print('x' * 25)
+
+def test_pass():
+    pass
+
+def test_fail(noisy):
+    print('x' * 25)
+    raise ValueError('boom')
+"""
+
+TIMED = """
+import time
+import pytest
+
+@pytest.fixture()
+def slow_setup():
+    time.sleep(0.2)
+
+def test_slow():
+    time.sleep(0.4)
+
+def test_setup(slow_setup):
+    pass
+
+def test_fast():
+    pass
+"""
+
+class TestCases:
+
+    def test_streamReport(self, pytester):
+        pytester.makepyfile(TESTS)
+        path = pytester.path / 'results.ndjson'
+        plugin = StreamReport(str(path), output_limit=60)
+        result = pytester.runpytest('-p', 'no:cacheprovider', '--tb=line', plugins=[plugin])
+        result.assert_outcomes(passed=1, failed=1)
+
+        passed, failed, summary = [json.loads(line) for line in path.read_text().splitlines()]
+        assert passed == dict(nodeid='test_streamReport.py::test_pass', outcome='passed', duration=passed['duration'])
+        assert failed['outcome'] == 'failed' and failed['longrepr'].endswith('ValueError: boom')
+        # Over the limit: the report keeps the start of the output, the spill file the whole text, each section once
+        assert failed['output'] == {f"Captured stdout {when}": 'x' * 25 + '\n' for when in ('setup', 'call', 'teardown')}
+        spilled = (pytester.path / 'results.ndjson.output').read_text()
+        assert failed['spill'] == [0, len(spilled)] and spilled.count('x' * 25) == 3
+        assert summary['summary'] == {'failed': 1, 'passed': 1}
+        assert plugin.failures == [('test_streamReport.py::test_fail', failed['longrepr'])]
+        result.stdout.fnmatch_lines(["*stream report: *results.ndjson (1 failed, 1 passed)*"])
+
+    @pytest.mark.parametrize("option", ["-rp", "-rA", "-rP"])
+    def test_passedSummary(self, pytester, option):
+        # The terminal lists the passed tests at the end: their reports are kept
+        pytester.makepyfile(TESTS)
+        plugin = StreamReport(str(pytester.path / 'results.ndjson'))
+        result = pytester.runpytest('-p', 'no:cacheprovider', option, plugins=[plugin])
+        result.assert_outcomes(passed=1, failed=1)
+        result.stdout.fnmatch_lines(["*PASSED test_passedSummary.py::test_pass*" if option != "-rP"
+                                     else "*= PASSES =*"])
+
+    def test_compressed(self, pytester):
+        pytester.makepyfile(TESTS)
+        pytester.runpytest('-p', 'no:cacheprovider', plugins=[StreamReport(str(pytester.path / 'results.ndjson.gz'))])
+        with gzip.open(pytester.path / 'results.ndjson.gz', 'rt') as f:
+            assert json.loads(f.readlines()[-1])['summary'] == {'failed': 1, 'passed': 1}
+
+    def test_durations(self, pytester):
+        # The passed reports are forgotten, the durations of the slowest ones are still listed
+        pytester.makepyfile(TIMED)
+        result = pytester.runpytest('-p', 'no:cacheprovider', '--durations=2',
+                                    plugins=[StreamReport(str(pytester.path / 'results.ndjson'))])
+        result.assert_outcomes(passed=3)
+        result.stdout.fnmatch_lines(["*= slowest 2 durations =*", "0.4*s call     test_durations.py::test_slow",
+                                     "0.2*s setup    test_durations.py::test_setup"])
+        result.stdout.no_fnmatch_line("*test_fast*")
+
+        result = pytester.runpytest('-p', 'no:cacheprovider', '--durations=0', '--durations-min=0',
+                                    plugins=[StreamReport(str(pytester.path / 'all.ndjson'))])
+        listed = [line for line in result.outlines if 'test_durations.py::' in line]
+        assert len(listed) == 9 # setup, call and teardown of the three tests
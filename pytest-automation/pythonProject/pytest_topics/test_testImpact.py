@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from pytest_topics.utils.inputTracker import record_input, recording
+from pytest_topics.utils.testImpact import file_signature, has_changed
+
+pytest_plugins = ['pytester']
+
+class TestCases:
+
+    def test_impactInputs(self, tmp_path):
+        data = tmp_path / 'data.csv'
+        data.write_text("age,name\n24,aman\n")
+        with recording() as inputs:
+            data.read_text()
+            record_input(tmp_path / 'cached.ini')
+        assert inputs == {str(data), str(tmp_path / 'cached.ini')}
+
+        signature = file_signature(data)
+        assert not has_changed(str(data), signature)
+        data.write_text("age,name\n25,aziz\n")
+        assert has_changed(str(data), signature)
+
+    def test_impactSelection(self, pytester):
+        pytester.makefile('.csv', data="age,name\n24,aman\n")
+        pytester.makepyfile(test_data="""
+            from pathlib import Path
+
+            def test_data():
+                assert Path(__file__).with_name('data.csv').read_text()
+        """, test_other="""
+            def test_other():
+                pass
+        """)
+        pytester.runpytest('-p', 'pytest_topics.conftest', '--impact-record').assert_outcomes(passed=2)
+        pytester.runpytest('-p', 'pytest_topics.conftest', '--impact').assert_outcomes(deselected=2)
+        pytester.makefile('.csv', data="age,name\n25,aziz\n")
+        result = pytester.runpytest('-p', 'pytest_topics.conftest', '--impact', '-v')
+        result.assert_outcomes(passed=1, deselected=1)
+        result.stdout.fnmatch_lines(["*test_data PASSED*", "*test impact: 1 tests deselected*; changed: data.csv"])
+
+    def test_impactEffectsAndPruning(self, pytester):
+        pytester.makepyfile(test_net="""
+            import socket
+            import pytest
+
+            @pytest.fixture(scope='session')
+            def server():
+                socket.socket().close()
+
+            def test_socket():
+                socket.socket().close()
+
+            def test_server(server):
+                pass
+
+            def test_server_again(server):
+                pass
+
+            def test_plain():
+                pass
+
+            def test_removed():
+                pass
+        """)
+        pytester.runpytest('-p', 'pytest_topics.conftest', '--impact-record').assert_outcomes(passed=5)
+        # Nothing changed, but the tests talking to the network depend on more than their files, through their fixtures
+        # too. The other tests of the module do not.
+        result = pytester.runpytest('-p', 'pytest_topics.conftest', '--impact', '-v')
+        result.assert_outcomes(passed=3, deselected=2)
+        result.stdout.fnmatch_lines(["*test_socket PASSED*", "*test_server PASSED*", "*test_server_again PASSED*"])
+
+        source = pytester.path.joinpath('test_net.py')
+        source.write_text(source.read_text().replace('def test_removed', 'def helper'))
+        pytester.runpytest('-p', 'pytest_topics.conftest', '--impact').assert_outcomes(passed=4)
+        tests = json.loads(pytester.path.joinpath('.pytest_cache/v/pytest_topics/testimpact').read_text())['tests']
+        assert sorted(tests) == ['test_net.py::test_plain', 'test_net.py::test_server', 'test_net.py::test_server_again',
+                                 'test_net.py::test_socket']
+        assert '<socket.__new__>' in tests['test_net.py::test_server_again']['inputs']
+        assert not any(path.startswith('<') for path in tests['test_net.py::test_plain']['inputs'])
+
+        source.unlink()
+        pytester.makepyfile(test_other="def test_other():\n    pass\n")
+        pytester.runpytest('-p', 'pytest_topics.conftest', '--impact').assert_outcomes(passed=1)
+        tests = json.loads(pytester.path.joinpath('.pytest_cache/v/pytest_topics/testimpact').read_text())['tests']
+        assert sorted(tests) == ['test_other.py::test_other']
@@ -0,0 +1,63 @@
+import csv
+import json
+import tracemalloc
+
+import pytest
+from pytest_topics.utils.timingPlugin import Timer, TimingPlugin
+
+pytest_plugins = ['pytester']
+
+TESTS = """
+import pytest
+
+@pytest.fixture(scope='session')
+def city():
+    yield 'Delhi'
+
+def test_city(city):
+    assert city == 'Delhi'
+"""
+
+class TestCases:
+
+    def test_timingReport(self, pytester):
+        pytester.makepyfile(TESTS)
+        pytester.runpytest(plugins=[TimingPlugin(str(pytester.path / 'timing.json'))]).assert_outcomes(passed=1)
+        report = json.loads((pytester.path / 'timing.json').read_text())
+        kinds = [record['kind'] for record in report['records']]
+        assert {'collection', 'collect', 'fixture_setup', 'fixture_teardown', 'call'} <= set(kinds)
+        assert kinds.index('fixture_setup') < kinds.index('call') < kinds.index('fixture_teardown')
+        city = [total for total in report['fixtures'] if total['name'] == 'city']
+        assert city == [dict(name='city', scope='session', setups=1, wall=city[0]['wall'], cpu=city[0]['cpu'])]
+
+    def test_timingReportCsv(self, pytester):
+        pytester.makepyfile(TESTS)
+        pytester.runpytest(plugins=[TimingPlugin(str(pytester.path / 'timing.csv'))]).assert_outcomes(passed=1)
+        with open(pytester.path / 'timing.csv') as f:
+            rows = list(csv.DictReader(f))
+        assert ('call', 'test_city') in [(row['kind'], row['name']) for row in rows]
+
+    def test_slowestOnlyWhenAsked(self, pytester):
+        pytester.makepyfile(TESTS)
+        result = pytester.runpytest('-p', 'pytest_topics.conftest', '-p', 'no:cacheprovider', '--timing-report', 'timing.json')
+        result.assert_outcomes(passed=1)
+        result.stdout.no_fnmatch_line("*slowest * steps*")
+        assert (pytester.path / 'timing.json').exists()
+        result = pytester.runpytest('-p', 'pytest_topics.conftest', '-p', 'no:cacheprovider', '--timing-slowest', '2')
+        result.stdout.fnmatch_lines(["*slowest 2 steps*", "*slowest 2 fixtures*", "*city (session)*"])
+
+    def test_nestedPeak(self):
+        tracing = tracemalloc.is_tracing()
+        tracemalloc.start()
+        try:
+            outer = Timer(True)
+            block = bytearray(4 * 1024 * 1024)
+            del block
+            inner = Timer(True)
+            inner_mem = inner.stop()[2]
+            outer_mem = outer.stop()[2]
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+        assert inner_mem < 1024
+        assert outer_mem >= 4 * 1024 # KiB: the inner timer did not hide the outer peak
@@ -0,0 +1,99 @@
+import io
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from pytest_bdd import feature as bdd_feature
+
+from pytest_topics.utils import configRegistry, featureCache, warmDaemon
+
+def serve_once(path, chunks):
+    """A stand-in daemon answering one run request with the chunks, sent one by one."""
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)
+
+    def answer():
+        conn, _ = listener.accept()
+        with conn:
+            conn.makefile('rb').readline()
+            for chunk in chunks:
+                conn.sendall(chunk)
+                time.sleep(0.05)
+        listener.close()
+    thread = threading.Thread(target=answer)
+    thread.start()
+    return thread
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="the warm daemon needs unix sockets")
+class TestCases:
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason="the warm daemon needs os.fork")
+    def test_warmDaemon(self, tmp_path):
+        sock = str(tmp_path / 'daemon.sock')
+        daemon = subprocess.Popen([sys.executable, '-m', 'pytest_topics.utils.warmDaemon', 'serve', '-n', '1',
+                                   '--socket', sock], cwd=warmDaemon.ROOT_DIR, stdout=subprocess.DEVNULL)
+        try:
+            for _ in range(100):
+                if os.path.exists(sock):
+                    break
+                time.sleep(0.1)
+            # A client that never sends its request only holds the daemon up for REQUEST_TIMEOUT
+            silent = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            silent.connect(sock)
+            out = io.BytesIO()
+            code = warmDaemon.run([str(warmDaemon.BASE_DIR / 'test_module01.py'), '-q', '-p', 'no:cacheprovider',
+                                   '-k', 'not subtraction'], sock, out)
+            assert code == 0
+            assert b'passed' in out.getvalue()
+            silent.close()
+        finally:
+            warmDaemon.command('stop', sock)
+            daemon.wait(timeout=10)
+
+    def test_dataChangeWarmsAgain(self, tmp_path, monkeypatch):
+        config_dir = tmp_path.joinpath('config')
+        config_dir.mkdir()
+        qa = config_dir.joinpath('qa.ini')
+        qa.write_text("[gmail]\nurl = qa.gmail.com\n")
+        monkeypatch.setattr(configRegistry, 'CONFIG_DIR', config_dir)
+        monkeypatch.setattr(featureCache, 'FEATURE_DIR', tmp_path.joinpath('features'))
+        # The registry and pytest-bdd's feature cache of this session stay as they are
+        monkeypatch.setattr(configRegistry, '_snapshots', {})
+        monkeypatch.setattr(bdd_feature, 'features', {})
+        monkeypatch.setattr(warmDaemon, 'warm', lambda: configRegistry.get_config('qa'))
+
+        warmDaemon.warm()
+        mtimes = warmDaemon.data_mtimes()
+        assert warmDaemon.reload_data(mtimes) == (mtimes, [])
+
+        qa.write_text("[gmail]\nurl = new.qa.gmail.com\n")
+        os.utime(qa, ns=(10 ** 18, 10 ** 18))
+        mtimes, changed = warmDaemon.reload_data(mtimes)
+        assert changed == [str(qa)] and mtimes[str(qa)] == 10 ** 18
+        assert configRegistry.get_config('qa').gmail.url == 'new.qa.gmail.com'
+
+        feature = tmp_path.joinpath('features', 'new.feature')
+        feature.parent.mkdir()
+        feature.write_text("Feature: New\n")
+        assert warmDaemon.reload_data(mtimes)[1] == [str(feature)]
+
+    def test_exitCodeInItsOwnChunk(self, tmp_path):
+        sock = str(tmp_path / 'daemon.sock')
+        thread = serve_once(sock, [b'1 failed\n', warmDaemon.EXIT_MARKER, b'4', b'2\n'])
+        out = io.BytesIO()
+        assert warmDaemon.run(['-q'], sock, out) == 42
+        thread.join()
+        assert out.getvalue() == b'1 failed\n'
+
+    def test_workerDiedInTheMarker(self, tmp_path):
+        sock = str(tmp_path / 'daemon.sock')
+        thread = serve_once(sock, [b'output', warmDaemon.EXIT_MARKER[:5], warmDaemon.EXIT_MARKER[5:]])
+        out = io.BytesIO()
+        assert warmDaemon.run(['-q'], sock, out) == 1
+        thread.join()
+        assert out.getvalue() == b'output'
@@ -0,0 +1,258 @@
+"""
+asyncio support for the pytest_topics suite, without any extra plugin.
+
+- `async def` tests run on one event loop shared by the whole session.
+- async_fixture() turns an `async def` fixture (coroutine or async generator) into a regular pytest fixture.
+- With --async-concurrency N (option added in conftest.py), consecutive tests marked `async_concurrent` of the same
+  class or module run together on the loop, at most N at a time. Only tests without function scoped fixtures can run
+  together, the others run one by one as usual.
+- AsyncFile and AsyncHttpClient give an awaitable interface to blocking files and to a requests.Session.
+
+A concurrent group still goes through the public hooks: every test gets its pytest_runtest_setup, _call and _teardown,
+makereport and logreport, in order. But the test bodies run before that, all together on the loop, and
+pytest_runtest_call only replays the outcome of its test. So the plugins wrapping pytest_runtest_call see the replay,
+not the test running: timingPlugin times the replay, the output printed by a test is not captured in its report, and
+the pytest_runtest_protocol wrappers of the first test (outcomeCache's file tracking) surround the whole group. The
+call report keeps the duration measured on the loop.
+
+conftest.py registers this module as a plugin, unless pytest-asyncio is installed.
+"""
+import asyncio
+import functools
+import inspect
+import time
+
+import pytest
+
+MARKER = 'async_concurrent'
+GROUP_FACTOR = 8 # a concurrent group holds at most concurrency * GROUP_FACTOR tests, so reports keep flowing
+# pytest.skip / pytest.fail / pytest.xfail inside a test
+OUTCOMES = (pytest.skip.Exception, pytest.fail.Exception, pytest.xfail.Exception)
+RERAISE = (pytest.exit.Exception, KeyboardInterrupt)
+
+_loop = None
+_done_key = pytest.StashKey[set]() # tests already run as part of a concurrent group
+_positions_key = pytest.StashKey[dict]() # item -> its index in session.items
+_outcome_key = pytest.StashKey[object]() # the exception (or None) of a test already run by its group
+
+
+def get_loop():
+    """The event loop of the session, created on first use."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop
+
+
+def run(coro):
+    return get_loop().run_until_complete(coro)
+
+
+def async_fixture(*fixture_args, **fixture_kwargs):
+    """Like @pytest.fixture(), for an `async def` fixture. Setup and teardown run on the session loop."""
+
+    def decorator(func):
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                agen = func(*args, **kwargs)
+                yield run(agen.__anext__())
+                try:
+                    run(agen.__anext__())
+                except StopAsyncIteration:
+                    pass
+                else:
+                    raise RuntimeError(f"Async fixture {func.__name__} yielded more than once")
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                return run(func(*args, **kwargs))
+        return pytest.fixture(*fixture_args, **fixture_kwargs)(wrapper)
+
+    # Allow both @async_fixture and @async_fixture(scope="session")
+    if len(fixture_args) == 1 and callable(fixture_args[0]) and not fixture_kwargs:
+        func, fixture_args = fixture_args[0], ()
+        return decorator(func)
+    return decorator
+
+
+class AsyncFile:
+    """Awaitable wrapper of an open file, the blocking calls run in the default thread pool."""
+
+    def __init__(self, f):
+        self.file = f
+
+    async def read(self, size=-1):
+        return await asyncio.to_thread(self.file.read, size)
+
+    async def readline(self):
+        return await asyncio.to_thread(self.file.readline)
+
+    async def write(self, data):
+        return await asyncio.to_thread(self.file.write, data)
+
+    async def close(self):
+        await asyncio.to_thread(self.file.close)
+
+
+class AsyncHttpClient:
+    """
+    Awaitable requests.Session, e.g. `response = await client.get(url)`.
+
+    The requests run in a thread pool over the session's connection pool, at most `limit` of them at once.
+    """
+
+    def __init__(self, session, limit=16):
+        self.session = session
+        self.semaphore = asyncio.Semaphore(limit)
+
+    async def request(self, method, url, **kwargs):
+        async with self.semaphore:
+            return await asyncio.to_thread(functools.partial(self.session.request, method, url, **kwargs))
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+
+# pytest has no public accessor for the fixtures of a test, these two helpers are the only readers of _fixtureinfo.
+def _argnames(item):
+    """The fixture names the test function takes as arguments."""
+    return item._fixtureinfo.argnames
+
+
+def _fixturedefs(item):
+    """{name: [FixtureDef, ...]} of every fixture the test uses, the last definition is the one it gets."""
+    return item._fixtureinfo.name2fixturedefs
+
+
+def is_async_test(item):
+    return isinstance(item, pytest.Function) and inspect.iscoroutinefunction(item.obj)
+
+
+def can_run_concurrently(item):
+    """An async test marked async_concurrent, whose fixtures are all shared wider than the function."""
+    if not is_async_test(item) or item.get_closest_marker(MARKER) is None:
+        return False
+    for name, fixturedefs in _fixturedefs(item).items():
+        fixturedef = fixturedefs[-1]
+        if getattr(fixturedef.func, '__name__', '') == 'get_direct_param_fixture_func':
+            continue # a parametrize value, not a real fixture
+        if name != 'request' and fixturedef.scope == 'function':
+            return False
+    return True
+
+
+def pytest_configure(config):
+    config.stash[_done_key] = set()
+
+
+def pytest_collection_finish(session):
+    session.config.stash[_positions_key] = {item: i for i, item in enumerate(session.items)}
+
+
+def pytest_unconfigure(config):
+    global _loop
+    if _loop is not None and not _loop.is_closed():
+        _loop.run_until_complete(_loop.shutdown_asyncgens())
+        _loop.close()
+    _loop = None
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    if not is_async_test(pyfuncitem):
+        return None
+    if _outcome_key in pyfuncitem.stash:
+        # Already run by its concurrent group, only its outcome goes through the call hooks
+        error = pyfuncitem.stash[_outcome_key]
+        del pyfuncitem.stash[_outcome_key]
+        if error is not None:
+            raise error
+        return True
+    funcargs = pyfuncitem.funcargs
+    kwargs = {name: funcargs[name] for name in _argnames(pyfuncitem)}
+    run(pyfuncitem.obj(**kwargs))
+    return True
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_protocol(item, nextitem):
+    done = item.config.stash[_done_key]
+    if item in done:
+        done.discard(item)
+        return True # already run by the group it belongs to
+
+    concurrency = item.config.getoption("async_concurrency")
+    if concurrency <= 0 or not can_run_concurrently(item):
+        return None
+
+    items = item.session.items
+    positions = item.config.stash.get(_positions_key, {})
+    start = positions[item] if item in positions else items.index(item)
+    group = [item]
+    for other in items[start + 1:start + concurrency * GROUP_FACTOR]:
+        if other.parent is not item.parent or not can_run_concurrently(other):
+            break
+        group.append(other)
+    if len(group) == 1:
+        return None
+
+    last = start + len(group) - 1
+    _run_group(group, items[last + 1] if last + 1 < len(items) else None, concurrency)
+    done.update(group[1:])
+    return True
+
+
+def _phase(item, when, **kwargs):
+    """Run pytest_runtest_<when> for the item and return its report, like pytest's own runner."""
+    hook = getattr(item.ihook, f"pytest_runtest_{when}")
+    call = pytest.CallInfo.from_call(lambda: hook(item=item, **kwargs), when=when, reraise=RERAISE)
+    return item.ihook.pytest_runtest_makereport(item=item, call=call)
+
+
+def _run_group(group, nextitem, concurrency):
+    """Run the bodies of the group's tests together on the loop, then every test through the usual hooks, in order."""
+    # Set every test up for its fixture values. They are all shared wider than the function, and the tests share their
+    # class or module: tearing the function node down for the next test keeps them alive, and the setups below find
+    # them cached.
+    ready = []
+    for i, item in enumerate(group):
+        if _phase(item, "setup").passed:
+            ready.append((item, {name: item.funcargs[name] for name in _argnames(item)}))
+        _phase(item, "teardown", nextitem=group[(i + 1) % len(group)])
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(item, kwargs):
+        async with semaphore:
+            begin = time.time()
+            counter = time.perf_counter()
+            try:
+                await item.obj(**kwargs)
+                error = None
+            except (Exception, *OUTCOMES) as e:
+                error = e
+            return error, begin, time.time(), time.perf_counter() - counter
+
+    async def call_all():
+        return await asyncio.gather(*(call(item, kwargs) for item, kwargs in ready))
+
+    outcomes = dict(zip((item for item, _ in ready), run(call_all())))
+
+    for i, item in enumerate(group):
+        item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+        setup = _phase(item, "setup")
+        item.ihook.pytest_runtest_logreport(report=setup)
+        if setup.passed and item in outcomes:
+            error, begin, end, duration = outcomes[item]
+            item.stash[_outcome_key] = error # replayed by pytest_pyfunc_call
+            call = pytest.CallInfo.from_call(lambda: item.ihook.pytest_runtest_call(item=item), "call", reraise=RERAISE)
+            call.start, call.stop, call.duration = begin, end, duration # the test on the loop, not the replay
+            item.ihook.pytest_runtest_logreport(report=item.ihook.pytest_runtest_makereport(item=item, call=call))
+        teardown = _phase(item, "teardown", nextitem=group[i + 1] if i + 1 < len(group) else nextitem)
+        item.ihook.pytest_runtest_logreport(report=teardown)
+        item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+        item.funcargs = None
@@ -0,0 +1,120 @@
+"""
+Batched parametrize for pure numeric checks.
+
+pytest.mark.parametrize makes one test item per parameter set, which costs far more than the arithmetic of a check
+like cent_to_faren. batch_parametrize takes the same argnames / argvalues / ids, but makes a single item: the test
+gets one NumPy array per argname, plus a `batch` object to compare whole arrays at once:
+
+    @batch_parametrize("cent,expected", zip(cent, faren))
+    def test_conversion_batch(self, cent, expected, batch):
+        batch.assert_approx(self.cent_to_faren(cent), expected, rel=1e-3)
+
+A failing comparison lists the failing parameter sets with the ids parametrize would have given them.
+"""
+import functools
+import inspect
+
+import pytest
+
+MAX_REPORTED = 20 # failing parameter sets listed in the assertion message
+PARAMETER_SET = type(pytest.param()) # what pytest.param() returns
+
+
+def _split_argnames(argnames):
+    if isinstance(argnames, str):
+        return [name.strip() for name in argnames.split(',') if name.strip()]
+    return list(argnames)
+
+
+def _unpack(argnames, argvalues, ids):
+    """Return (columns, ids) from parametrize style argvalues."""
+    rows = []
+    row_ids = []
+    for i, value in enumerate(argvalues):
+        param_id = None
+        if isinstance(value, PARAMETER_SET):
+            if value.marks:
+                raise ValueError("batch_parametrize does not support marks on single parameter sets")
+            param_id = value.id
+            value = value.values
+        elif len(argnames) == 1:
+            value = (value,)
+        if len(value) != len(argnames):
+            raise ValueError(f"Parameter set {i} has {len(value)} values, expected {len(argnames)} ({argnames})")
+        rows.append(tuple(value))
+        if param_id is None:
+            param_id = ids[i] if ids is not None else "-".join(str(v) for v in value)
+        row_ids.append(param_id)
+    columns = {name: [row[i] for row in rows] for i, name in enumerate(argnames)}
+    return columns, row_ids
+
+
+class Batch:
+    """The parameter sets of one batched test, given to the test as the `batch` argument."""
+
+    def __init__(self, ids, columns):
+        self.ids = ids
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _fail(self, failing, describe):
+        lines = [f"{len(failing)} of {len(self)} parameter sets failed:"]
+        for i in failing[:MAX_REPORTED]:
+            lines.append(f"  [{self.ids[i]}] {describe(i)}")
+        if len(failing) > MAX_REPORTED:
+            lines.append(f"  ... and {len(failing) - MAX_REPORTED} more")
+        pytest.fail("\n".join(lines), pytrace=False)
+
+    def assert_true(self, mask, message="check failed"):
+        """Fail for every parameter set where mask is False."""
+        import numpy as np
+        mask = np.broadcast_to(np.asarray(mask, dtype=bool), (len(self),))
+        failing = np.flatnonzero(~mask).tolist()
+        if failing:
+            self._fail(failing, lambda i: message)
+
+    def assert_approx(self, actual, expected, rel=None, abs=None):
+        """Vectorized `actual == pytest.approx(expected, rel, abs)`, with the same default tolerances."""
+        import numpy as np
+        if rel is None and abs is None:
+            rel = 1e-6
+        elif rel is None:
+            rel = 0.0 # like pytest.approx: only abs is used when only abs is given
+        if abs is None:
+            abs = 1e-12 # like pytest.approx: kept when only rel is given, so values near zero still compare equal
+        actual = np.broadcast_to(np.asarray(actual, dtype=float), (len(self),))
+        expected = np.broadcast_to(np.asarray(expected, dtype=float), (len(self),))
+        tolerance = np.maximum(rel * np.abs(expected), abs)
+        with np.errstate(invalid='ignore'):
+            ok = (actual == expected) | (np.abs(actual - expected) <= tolerance)
+        failing = np.flatnonzero(~ok).tolist()
+        if failing:
+            self._fail(failing, lambda i: f"{float(actual[i])!r} != {float(expected[i])!r} ± {tolerance[i]:.1e}")
+
+
+def batch_parametrize(argnames, argvalues, ids=None):
+    """Drop-in for pytest.mark.parametrize that runs all parameter sets in one item, on NumPy arrays."""
+    argnames = _split_argnames(argnames)
+    columns, row_ids = _unpack(argnames, list(argvalues), ids)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        wants_batch = 'batch' in signature.parameters
+        hidden = set(argnames) | {'batch'}
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            np = pytest.importorskip("numpy")
+            for name, values in columns.items():
+                kwargs[name] = np.asarray(values)
+            if wants_batch:
+                kwargs['batch'] = Batch(row_ids, columns)
+            return func(*args, **kwargs)
+
+        # pytest reads the fixtures to request from the signature, the batched arguments are not fixtures.
+        wrapper.__signature__ = signature.replace(
+            parameters=[p for name, p in signature.parameters.items() if name not in hidden])
+        return wrapper
+    return decorator
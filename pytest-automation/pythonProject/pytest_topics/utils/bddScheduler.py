@@ -0,0 +1,133 @@
+"""
+Run the BDD scenarios of every feature_dir/*.feature file in several pytest processes at once.
+
+    python -m pytest_topics.utils.bddScheduler -n 4 [extra pytest arguments]
+
+The scenarios are collected once, split into one shard per worker, and every shard runs in its own pytest process.
+The shards are balanced with the durations recorded by past runs (see sharding.py), the tests without history are
+handed out in small batches to the workers done first. With --data-plane, data.csv is loaded into shared memory once,
+here, and every worker reads it from there.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from pytest_topics.utils.sharding import lpt, read_durations
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+ROOT_DIR = BASE_DIR.parent # the directory holding pytest.ini
+BDD_DIR = BASE_DIR.joinpath('bdd_test')
+STEAL_BATCH = 8 # at most this many tests without history handed to a free worker at a time
+POLL_INTERVAL = 0.05 # seconds
+
+
+def collect(paths=(BDD_DIR,), extra_args=()):
+    """Return the node ids of the tests found in paths, without running them."""
+    cmd = [sys.executable, '-m', 'pytest', '--collect-only', '-q', *map(str, paths), *extra_args]
+    result = subprocess.run(cmd, cwd=ROOT_DIR, capture_output=True, text=True)
+    if result.returncode not in (0, 5): # 5 = no tests collected
+        raise RuntimeError(f"Collection failed:\n{result.stdout}{result.stderr}")
+    return [line.strip() for line in result.stdout.splitlines() if '::' in line]
+
+
+def plan(node_ids, workers, durations):
+    """
+    Balance the tests with a recorded duration over the workers, longest first (see sharding.py).
+
+    Returns (shards, queue): the tests without history are left in the queue, for the workers done first.
+    """
+    known = [nodeid for nodeid in node_ids if nodeid in durations]
+    queue = [nodeid for nodeid in node_ids if nodeid not in durations]
+    shards = lpt(known, workers, durations)[0] if known else []
+    return [shard for shard in shards if shard], queue
+
+
+def run_shards(shards, extra_args=(), stream=sys.stdout, queue=(), workers=None):
+    """
+    Run every shard in its own pytest process, at most `workers` (default: one per shard) at the same time.
+
+    Work stealing: a worker done with its shard gets the next batch of the queue, in a new pytest process.
+    Returns the list of pytest exit codes, one per process.
+    """
+    pending = list(shards)
+    queue = list(queue)
+    workers = workers or max(len(shards), 1)
+    batch = max(1, min(STEAL_BATCH, -(-len(queue) // (workers * 2))))
+    running = []
+    codes = []
+    with tempfile.TemporaryDirectory() as tmp:
+        def start(shard):
+            number = len(codes) + len(running)
+            # The node ids are passed through an @file (pytest >= 8.2), thousands of them do not fit in a command line.
+            args_file = Path(tmp).joinpath(f"shard{number}.txt")
+            args_file.write_text("\n".join(shard))
+            output = open(Path(tmp).joinpath(f"output{number}.txt"), 'w+')
+            cmd = [sys.executable, '-m', 'pytest', f"@{args_file}", '--record-durations', *extra_args]
+            proc = subprocess.Popen(cmd, cwd=ROOT_DIR, stdout=output, stderr=subprocess.STDOUT, text=True)
+            running.append((proc, number, shard, output))
+
+        while pending or queue or running:
+            while len(running) < workers and (pending or queue):
+                if pending:
+                    start(pending.pop(0))
+                else:
+                    start(queue[:batch])
+                    del queue[:batch]
+            time.sleep(POLL_INTERVAL)
+            for entry in [entry for entry in running if entry[0].poll() is not None]:
+                proc, number, shard, output = entry
+                running.remove(entry)
+                output.seek(0)
+                stream.write(f"\n===== worker {number} ({len(shard)} tests) =====\n{output.read()}")
+                output.close()
+                codes.append(proc.returncode)
+    return codes
+
+
+def overall_code(codes):
+    """
+    The exit code of the whole run from the codes of the pytest processes: the most severe one. An interrupted,
+    crashed or misused process (2, 3, 4) comes first, then failed tests (1). A shard without tests (5) only counts
+    when no process ran any test. A worker killed by a signal counts as an internal error.
+    """
+    codes = [code if 0 <= code <= 5 else 3 for code in codes]
+    if all(code == 5 for code in codes):
+        return 5
+    for severe in (3, 2, 4, 1):
+        if severe in codes:
+            return severe
+    return 0
+
+
+def run(paths=(BDD_DIR,), workers=None, extra_args=(), stream=sys.stdout):
+    """Collect the tests in paths and run them on `workers` processes. Returns an overall pytest exit code."""
+    workers = workers or os.cpu_count() or 1
+    node_ids = collect(paths)
+    if not node_ids:
+        return 5
+    shards, queue = plan(node_ids, workers, read_durations(ROOT_DIR))
+    if '--data-plane' not in extra_args:
+        return overall_code(run_shards(shards, extra_args, stream, queue, workers))
+    # Published once here, the workers inherit the block names through the environment (see dataPlane.py)
+    from pytest_topics.utils import dataPlane
+    dataPlane.publish_data_file()
+    try:
+        return overall_code(run_shards(shards, extra_args, stream, queue, workers))
+    finally:
+        dataPlane.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--workers', type=int, default=None, help="number of pytest processes (default: cpu count)")
+    parser.add_argument('--path', action='append', default=None, help="test path to collect (default: bdd_test)")
+    args, extra_args = parser.parse_known_args(argv)
+    return run(args.path or (BDD_DIR,), args.workers, extra_args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
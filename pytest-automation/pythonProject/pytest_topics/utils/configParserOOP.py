@@ -1,7 +1,6 @@
-import configparser
 from pathlib import Path
 
-from setuptools.command.setopt import config_file
+from pytest_topics.utils.configRegistry import env_name, get_config
 
 
 class ConfigParser():
@@ -9,14 +8,18 @@ class ConfigParser():
     cfgFile = 'qa.ini' # default config file
     cfgFileDirectory = 'config' # config directory
 
-    config = configparser.ConfigParser()
-
     # Next, we will start by creating a constructor for the clas
     def __init__(self, cfg=cfgFile):
         self.cfgFile = cfg
         self.BASE_DIR = Path(__file__).resolve().parent.parent
         self.CONFIG_FILE = self.BASE_DIR.joinpath(self.cfgFileDirectory).joinpath(self.cfgFile)
-        self.config.read(self.CONFIG_FILE)
+        self.env = env_name(self.cfgFile) # normalized once, get_config() finds it with a single lookup
+
+    @property
+    def config(self):
+        # The shared, read only snapshot of our file. It is parsed once per process, and looked up on every call
+        # so that a snapshot swapped in by the config watcher is picked up by the getters.
+        return get_config(self.env)
 
     def getGmailUrl(self):
         return self.config['gmail']['url']
@@ -38,5 +41,5 @@ class ConfigParser():
         return self.config['outlook']['user']
 
 
-    def getOutlookPass():
-        return config['outlook']['pass']
\ No newline at end of file
+    def getOutlookPass(self):
+        return self.config['outlook']['pass']
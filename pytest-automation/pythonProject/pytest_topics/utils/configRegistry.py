@@ -0,0 +1,118 @@
+import configparser
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from types import MappingProxyType
+
+from pytest_topics.utils.inputTracker import record_input, tracking
+
+cfgFileDirectory = 'config'
+cfgFileSuffix = '.ini'
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+CONFIG_DIR = BASE_DIR.joinpath(cfgFileDirectory)
+
+# One parsed snapshot per environment for the whole process, e.g. {'qa': ConfigSnapshot, 'prod': ConfigSnapshot}
+_snapshots = {}
+_lock = threading.Lock()
+
+
+class ReadOnlyMapping(Mapping):
+    """Immutable mapping whose keys can also be read as attributes, e.g. section.url or section['url']."""
+
+    __slots__ = ('_name', '_values')
+
+    def __init__(self, name, values):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_values', MappingProxyType(dict(values)))
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getattr__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            raise AttributeError(f"'{self._name}' has no key '{key}'") from None
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"'{self._name}' is read only")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"'{self._name}' is read only")
+
+    def __reduce__(self):
+        # MappingProxyType cannot be pickled, rebuild from a plain dict (needed to send snapshots to other processes).
+        return (type(self), (self._name, dict(self._values)))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._name!r}, {dict(self._values)!r})"
+
+
+class Section(ReadOnlyMapping):
+    """One section of an .ini file, with every value already interpolated."""
+
+
+class ConfigSnapshot(ReadOnlyMapping):
+    """All sections of one .ini file, e.g. snapshot.gmail.url or snapshot['gmail']['url']."""
+
+    @property
+    def name(self):
+        return self._name
+
+
+def env_name(cfg):
+    """'qa', 'qa.ini' and 'config/qa.ini' all name the 'qa' environment."""
+    return Path(cfg).name.removesuffix(cfgFileSuffix)
+
+
+def config_file(env):
+    return CONFIG_DIR.joinpath(env_name(env) + cfgFileSuffix)
+
+
+def load_snapshot(cfg_file, name=None):
+    """Parse an .ini file into a ConfigSnapshot. This does not go through the registry."""
+    cfg_file = Path(cfg_file)
+    parser = configparser.ConfigParser()
+    # configparser.read() silently skips missing files, read_file() reports them.
+    with open(cfg_file) as f:
+        parser.read_file(f)
+    sections = {section: Section(section, parser.items(section)) for section in parser.sections()}
+    return ConfigSnapshot(name or env_name(cfg_file), sections)
+
+
+def get_config(env='qa'):
+    """Return the snapshot of the environment, the .ini file is parsed on the first call only."""
+    # Fast path for the getters, which pass the environment name itself: a single dict lookup.
+    snapshot = _snapshots.get(env)
+    name = env if snapshot is not None else env_name(env)
+    if tracking():
+        record_input(config_file(name)) # a cached snapshot is still a read of the file
+    if snapshot is None:
+        with _lock:
+            snapshot = _snapshots.get(name)
+            if snapshot is None:
+                snapshot = load_snapshot(config_file(name), name)
+                _snapshots[name] = snapshot
+    return snapshot
+
+
+def replace_config(env, snapshot):
+    """Swap in a new snapshot for the environment and return the previous one (None if it was never loaded)."""
+    name = env_name(env)
+    with _lock:
+        old = _snapshots.get(name)
+        _snapshots[name] = snapshot
+    return old
+
+
+def clear():
+    """Forget every parsed snapshot, the next get_config() reads the .ini file again."""
+    with _lock:
+        _snapshots.clear()
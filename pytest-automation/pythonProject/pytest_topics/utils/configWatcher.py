@@ -0,0 +1,153 @@
+import os
+import threading
+import warnings
+
+from pytest_topics.utils.configRegistry import CONFIG_DIR, cfgFileSuffix, env_name, load_snapshot, replace_config
+
+try:
+    # Optional, the watcher polls the file modification time when inotify_simple is not installed.
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+POLL_INTERVAL = 1.0 # seconds between two checks of the config files
+
+
+def diff_snapshots(old, new):
+    """
+    Compare two config snapshots key by key.
+
+    Returns {(section, key): (old_value, new_value)} for every added, removed or changed key, None marks a missing value.
+    """
+    old = old or {}
+    new = new or {}
+    changes = {}
+    for section in set(old) | set(new):
+        old_section = old.get(section, {})
+        new_section = new.get(section, {})
+        for key in set(old_section) | set(new_section):
+            old_value = old_section.get(key)
+            new_value = new_section.get(key)
+            if old_value != new_value:
+                changes[(section, key)] = (old_value, new_value)
+    return changes
+
+
+class ConfigWatcher:
+    """
+    Reload the .ini files of the given environments while tests are running.
+
+    Only the file that changed is parsed again. Its snapshot is swapped in the config registry, so the existing getters
+    (getGmailUrl(), ConfigParser('prod.ini').getOutlookUsr(), ...) return the new values from their next call. The
+    registry only holds the files of CONFIG_DIR, the snapshots of another config_dir are kept in self.snapshots.
+    """
+
+    def __init__(self, envs=('qa', 'prod'), config_dir=CONFIG_DIR, interval=POLL_INTERVAL, use_inotify=True):
+        self.config_dir = config_dir
+        self.shared = os.path.abspath(config_dir) == os.path.abspath(CONFIG_DIR)
+        self.snapshots = {}
+        self.interval = interval
+        self.use_inotify = use_inotify and inotify_simple is not None
+        self.files = {env_name(env): config_dir.joinpath(env_name(env) + cfgFileSuffix) for env in envs}
+        self._stats = {env: self._stat(env) for env in self.files}
+        self._subscribers = []
+        self._checking = threading.Lock() # check() runs on the watcher thread and in the callers
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _stat(self, env):
+        try:
+            stat = os.stat(self.files[env])
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def subscribe(self, callback, keys=None):
+        """
+        Call callback(env, changes) after a reload, changes is the diff_snapshots() result.
+
+        keys limits the notification to some section names ('gmail') or (section, key) pairs (('gmail', 'url')).
+        """
+        self._subscribers.append((callback, None if keys is None else set(keys)))
+        return callback
+
+    def unsubscribe(self, callback):
+        self._subscribers = [(cb, keys) for cb, keys in self._subscribers if cb is not callback]
+
+    def reload(self, env):
+        """
+        Parse the file of one environment again, swap its snapshot and notify the subscribers of the changed keys.
+        An environment nobody loaded yet has no old values to compare with, its first reload reports no change.
+        """
+        env = env_name(env)
+        try:
+            new = load_snapshot(self.files[env], env)
+        except Exception as e:
+            # Most likely the file is being written right now, keep the current snapshot until the next change.
+            warnings.warn(f"Could not reload {self.files[env]}: {e}")
+            return {}
+        if self.shared:
+            old = replace_config(env, new)
+        else:
+            old = self.snapshots.get(env)
+        self.snapshots[env] = new
+        changes = diff_snapshots(old, new) if old is not None else {}
+        if changes:
+            self._notify(env, changes)
+        return changes
+
+    def _notify(self, env, changes):
+        for callback, keys in list(self._subscribers):
+            if keys is not None:
+                selected = {k: v for k, v in changes.items() if k in keys or k[0] in keys}
+            else:
+                selected = changes
+            if selected:
+                callback(env, selected)
+
+    def check(self):
+        """Reload every environment whose file changed since the last check. Returns the names of the reloaded ones."""
+        reloaded = []
+        with self._checking:
+            for env in self.files:
+                stat = self._stat(env)
+                if stat is not None and stat != self._stats[env]:
+                    self._stats[env] = stat
+                    self.reload(env)
+                    reloaded.append(env)
+        return reloaded
+
+    def _poll(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def _watch_inotify(self):
+        flags = inotify_simple.flags
+        names = {path.name for path in self.files.values()}
+        with inotify_simple.INotify() as inotify:
+            # Watch the directory, editors often replace the file instead of writing into it.
+            inotify.add_watch(self.config_dir, flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE)
+            while not self._stop.is_set():
+                events = inotify.read(timeout=int(self.interval * 1000))
+                if any(event.name in names for event in events):
+                    self.check()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            target = self._watch_inotify if self.use_inotify else self._poll
+            self._thread = threading.Thread(target=target, name="config-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
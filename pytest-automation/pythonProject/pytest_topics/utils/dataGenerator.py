@@ -0,0 +1,157 @@
+"""
+Synthetic rows with the columns of config/data.csv (age,name,salary(lpa),city), as many as needed for load tests.
+
+    data = load_synthetic(10_000_000, seed=7)        # nothing is generated yet
+    for age, name, salary, city in data.iter_rows(start=0, stop=1000):
+        ...
+    get_data(rows=1000, seed=7)                      # the same rows, as a list for parametrize
+
+- The schema comes from the csv header: every column gets a generator from the words of its name (age, salary,
+  city, name...; manager_name is a name, page is not an age), which can be replaced, e.g.
+  load_synthetic(rows, schema={'city': Choice.of(500, 'City')}).
+- Rows are generated in numpy batches of BATCH_SIZE. Every batch and column has its own random stream seeded with
+  (seed, batch, column), so any row range or column projection gives the same values, in any process, for the same
+  seed and batch_size: another batch_size gives other rows.
+- load_synthetic() returns the same interface as datacache.load_data(): header, len(), column() and iter_rows().
+"""
+import re
+
+import numpy as np
+
+from pytest_topics.utils.utils import DATA_FILE, get_header, iter_data
+
+BATCH_SIZE = 1 << 16
+DEFAULT_SEED = 0
+
+
+class Normal:
+    """Normal distribution clipped to [low, high]: ints, or floats rounded to `decimals`."""
+
+    def __init__(self, mean, std, low, high, decimals=None):
+        self.mean = mean
+        self.std = std
+        self.low = low
+        self.high = high
+        self.decimals = decimals
+
+    def generate(self, rng, size):
+        values = np.clip(rng.normal(self.mean, self.std, size), self.low, self.high)
+        if self.decimals is None:
+            return np.rint(values).astype(np.int64)
+        return values.round(self.decimals)
+
+
+class LogNormal:
+    """Log-normal distribution around `median` (salaries), floats rounded to `decimals`."""
+
+    def __init__(self, median, sigma, decimals=1):
+        self.median = median
+        self.sigma = sigma
+        self.decimals = decimals
+
+    def generate(self, rng, size):
+        return rng.lognormal(np.log(self.median), self.sigma, size).round(self.decimals)
+
+
+class Choice:
+    """
+    One of `values` for every row. skew 0 picks them uniformly, skew > 0 follows Zipf's law: the first value is
+    the most common, like the biggest city.
+    """
+
+    def __init__(self, values, skew=1.0):
+        self.values = np.array(list(values), dtype=object)
+        weights = 1.0 / np.arange(1, len(self.values) + 1) ** skew
+        self.cdf = np.cumsum(weights / weights.sum())
+
+    @classmethod
+    def of(cls, cardinality, prefix, known=(), skew=1.0):
+        """`cardinality` values: the known ones first, then prefix1, prefix2, ..."""
+        values = list(dict.fromkeys(known))[:cardinality]
+        values += [f"{prefix}{i}" for i in range(1, cardinality - len(values) + 1)]
+        return cls(values, skew)
+
+    def generate(self, rng, size):
+        index = np.searchsorted(self.cdf, rng.random(size), side='right')
+        return self.values[np.minimum(index, len(self.values) - 1)]
+
+
+def name_words(name):
+    """The lower case words of a column name: 'salary(lpa)' -> {'salary', 'lpa'}, 'managerName' -> {'manager', 'name'}."""
+    return {word.lower() for word in re.findall(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+', name)}
+
+
+def default_column(name, known):
+    """The generator for a column, from the words of its name. known - the values of the column in the csv file."""
+    words = name_words(name)
+    if 'age' in words:
+        return Normal(28, 6, 18, 60)
+    if 'salary' in words:
+        return LogNormal(20, 0.6)
+    if 'city' in words:
+        return Choice.of(50, 'City', known)
+    if 'name' in words:
+        return Choice.of(10_000, 'name', known, skew=0)
+    return Normal(50, 15, 0, 100)
+
+
+def schema_for(data_file=DATA_FILE, schema=None):
+    """{column: generator} for the header of the csv file, with the generators of `schema` taking precedence."""
+    header = get_header(data_file)
+    schema = dict(schema or {})
+    unknown = [name for name in schema if name not in header]
+    if unknown:
+        raise ValueError(f"Unknown column(s) {unknown}, available columns are {header}")
+    missing = [name for name in header if name not in schema]
+    if missing:
+        # The values of the csv file come first in the Choice columns
+        known = dict(zip(missing, zip(*iter_data(data_file, columns=missing, typed=False))))
+        for name in missing:
+            schema[name] = default_column(name, known.get(name, ()))
+    return {name: schema[name] for name in header}
+
+
+class SyntheticData:
+    """`rows` deterministic rows generated on demand, with the interface of datacache.ColumnarData."""
+
+    def __init__(self, rows, schema, seed=DEFAULT_SEED, batch_size=BATCH_SIZE):
+        if rows < 0:
+            raise ValueError("rows must be 0 or more")
+        self.rows = rows
+        self.schema = schema
+        self.header = list(schema)
+        self.seed = seed
+        self.batch_size = batch_size
+
+    def __len__(self):
+        return self.rows
+
+    def _batch(self, name, batch):
+        rng = np.random.default_rng((self.seed, batch, self.header.index(name)))
+        size = min(self.batch_size, self.rows - batch * self.batch_size)
+        return self.schema[name].generate(rng, size)
+
+    def iter_batches(self, columns=None, start=0, stop=None):
+        """Yield lists of numpy arrays, one per column, covering rows start to stop in order."""
+        columns = list(columns or self.header)
+        missing = [name for name in columns if name not in self.schema]
+        if missing:
+            raise KeyError(f"Unknown column(s) {missing}, available columns are {self.header}")
+        start, stop, _ = slice(start, stop).indices(self.rows)
+        for batch in range(start // self.batch_size, -(-stop // self.batch_size)):
+            first = batch * self.batch_size
+            low, high = max(start - first, 0), min(stop - first, self.batch_size)
+            yield [self._batch(name, batch)[low:high] for name in columns]
+
+    def column(self, name):
+        return np.concatenate([arrays[0] for arrays in self.iter_batches([name])] or [np.empty(0)])
+
+    def iter_rows(self, columns=None, start=0, stop=None):
+        """Yield rows as tuples of python values, with the same column projection and row range as utils.iter_data()."""
+        for arrays in self.iter_batches(columns, start, stop):
+            yield from zip(*(array.tolist() for array in arrays))
+
+
+def load_synthetic(rows, seed=DEFAULT_SEED, data_file=DATA_FILE, schema=None, batch_size=BATCH_SIZE):
+    """SyntheticData with the columns of the csv file."""
+    return SyntheticData(rows, schema_for(data_file, schema), seed, batch_size)
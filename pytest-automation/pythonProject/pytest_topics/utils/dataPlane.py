@@ -0,0 +1,154 @@
+"""
+Data plane: datasets loaded once into shared memory, read by every worker process without a copy.
+
+    pytest pytest_topics --data-plane                          # config/data.csv is published for the session
+    python -m pytest_topics.utils.bddScheduler -n 8 --data-plane   # published once, read by the 8 workers
+
+- publish(name, data) copies a dataset (a ColumnarData, a SyntheticData, or (header, rows)) into one shared memory
+  block, in the columnar layout of datacache.py: int64 and float64 columns, str columns as offsets + utf-8 blob.
+- attach(name), in the publishing process or any process started after it (forked, or a subprocess inheriting the
+  environment), maps the block and returns a ColumnarData over it. Numeric columns are views of the shared pages.
+- The block names reach the child processes in the PYTEST_TOPICS_DATA_PLANE environment variable.
+- datacache.load_data() looks at the data plane first, so get_data() and test_dataProvider.py read the published
+  snapshot of the csv file instead of opening it in every worker.
+
+The process that published a dataset removes its block in close(), at the end of the session.
+"""
+import array
+import json
+import os
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+from pytest_topics.utils.datacache import (DATA_PLANE_ENV, FLOAT, INT, STR, ColumnarData, StrColumn, encode,
+                                           load_data)
+from pytest_topics.utils.utils import DATA_FILE
+
+_published = {} # dataset name -> SharedMemory created by this process
+_attached = {} # dataset name -> (SharedMemory, ColumnarData)
+
+
+def dataset_name(data_file):
+    return os.path.abspath(data_file)
+
+
+def block_names():
+    """{dataset name: shared memory block name} of the datasets published by this process or its parents."""
+    return json.loads(os.environ.get(DATA_PLANE_ENV) or '{}')
+
+
+def _str_column(values):
+    offsets = array.array('q', [0])
+    blob = bytearray()
+    for value in values:
+        blob += str(value).encode()
+        offsets.append(len(blob))
+    return offsets, blob
+
+
+def _column(values):
+    """(type, column) for encode(), from a numpy array or a sequence of python values."""
+    kind = getattr(getattr(values, 'dtype', None), 'kind', None)
+    if kind in ('i', 'u', 'b'):
+        return INT, values.astype('int64')
+    if kind == 'f':
+        return FLOAT, values.astype('float64')
+    if kind is None:
+        if all(type(value) is int for value in values):
+            return INT, array.array('q', values)
+        if all(type(value) in (int, float) for value in values):
+            return FLOAT, array.array('d', values)
+    return STR, _str_column(values)
+
+
+def columns_of(data):
+    """(header, types, columns, rows) of a dataset, as encode() takes them."""
+    if isinstance(data, ColumnarData):
+        columns = [data.column(name) for name in data.header]
+        types = [STR if isinstance(column, StrColumn) else INT if column.format == 'q' else FLOAT
+                 for column in columns]
+        columns = [(column.offsets, column.data) if isinstance(column, StrColumn) else column for column in columns]
+        return data.header, types, columns, len(data)
+    if hasattr(data, 'iter_batches'): # dataGenerator.SyntheticData
+        typed = [_column(data.column(name)) for name in data.header]
+        return data.header, [t for t, _ in typed], [column for _, column in typed], len(data)
+    header, rows = data
+    rows = list(rows)
+    typed = [_column(values) for values in zip(*rows)] if rows else [(STR, _str_column(()))] * len(header)
+    return list(header), [t for t, _ in typed], [column for _, column in typed], len(rows)
+
+
+def publish(name, data):
+    """Copy the dataset into a new shared memory block, published under `name`. Returns a ColumnarData over it."""
+    close(name)
+    header, types, columns, rows = columns_of(data)
+    parts = encode(header, types, columns, rows, source=dict(dataset=name))
+    block = shared_memory.SharedMemory(create=True, size=max(sum(len(part) for part in parts), 1))
+    position = 0
+    for part in parts:
+        block.buf[position:position + len(part)] = part
+        position += len(part)
+    _published[name] = block
+    names = block_names()
+    names[name] = block.name
+    os.environ[DATA_PLANE_ENV] = json.dumps(names)
+    return attach(name)
+
+
+def _open(block_name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=block_name, track=False)
+    # Before 3.13 attaching registers the block with the resource tracker, which would remove it when this worker
+    # exits, under the feet of the other workers. Only the publishing process owns it: the registration is undone.
+    block = shared_memory.SharedMemory(name=block_name)
+    resource_tracker.unregister(block._name, 'shared_memory')
+    return block
+
+
+def attach(name):
+    """The ColumnarData of a published dataset, None when no process published it."""
+    if name in _attached:
+        return _attached[name][1]
+    block = _published.get(name)
+    if block is None:
+        block_name = block_names().get(name)
+        if block_name is None:
+            return None
+        try:
+            block = _open(block_name)
+        except FileNotFoundError: # the publishing process has ended
+            return None
+    data = ColumnarData(buffer=block.buf)
+    _attached[name] = (block, data)
+    return data
+
+
+def publish_data_file(data_file=DATA_FILE):
+    """Publish the csv file for this session, unless a parent process already did."""
+    name = dataset_name(data_file)
+    data = attach(name) if name in block_names() else None
+    return data if data is not None else publish(name, load_data(data_file))
+
+
+def close(name=None):
+    """Unmap the dataset (every dataset by default), and remove its block when this process published it."""
+    for dataset in [name] if name is not None else list({*_attached, *_published}):
+        block, data = _attached.pop(dataset, (None, None))
+        if data is not None:
+            data.close()
+        owned = _published.pop(dataset, None)
+        block = owned or block
+        if block is None:
+            continue
+        try:
+            block.close()
+        except BufferError:
+            pass # a test still holds a view of it, the mapping goes away with the process
+        if owned is not None:
+            block.unlink()
+            names = block_names()
+            names.pop(dataset, None)
+            if names:
+                os.environ[DATA_PLANE_ENV] = json.dumps(names)
+            else:
+                os.environ.pop(DATA_PLANE_ENV, None)
@@ -0,0 +1,302 @@
+import array
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+
+from pytest_topics.utils.inputTracker import record_input
+from pytest_topics.utils.utils import DATA_FILE, get_header, iter_data
+
+# Layout of a cache file:
+#   MAGIC | meta length (8 bytes, little endian) | meta as json | padding | column blocks
+# Every column block starts on an ALIGN boundary, so numeric columns can be cast straight from the mmap.
+MAGIC = b'PTCOL1\x00\x00'
+VERSION = 1
+ALIGN = 8
+CACHE_DIR = '__pycache__' # kept next to the csv file, like python's own bytecode cache
+CACHE_SUFFIX = '.colcache'
+DATA_PLANE_ENV = 'PYTEST_TOPICS_DATA_PLANE' # the shared memory blocks of dataPlane.py, set for the whole session
+
+INT = 'int'
+FLOAT = 'float'
+STR = 'str'
+
+TYPECODES = {INT: 'q', FLOAT: 'd'}
+
+# Cache files opened by this process, keyed by the cache path.
+_loaded = {}
+
+
+def cache_path(data_file=DATA_FILE):
+    data_file = Path(data_file)
+    return data_file.parent.joinpath(CACHE_DIR).joinpath(data_file.name + CACHE_SUFFIX)
+
+
+def file_hash(data_file):
+    digest = hashlib.sha256()
+    with open(data_file, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _padding(position):
+    return -position % ALIGN
+
+
+def _infer_types(data_file, width):
+    """First pass over the csv: narrowest type (int, then float, then str) that fits every value of each column."""
+    types = [INT] * width
+    for row in iter_data(data_file, typed=False): # raises ValueError on a row of another width than the header
+        for i, value in enumerate(row):
+            if types[i] == INT:
+                try:
+                    int(value)
+                    continue
+                except ValueError:
+                    types[i] = FLOAT
+            if types[i] == FLOAT:
+                try:
+                    float(value)
+                except ValueError:
+                    types[i] = STR
+    return types
+
+
+def encode(header, types, columns, rows, source=None):
+    """
+    The cache layout of the columns, as a list of byte strings to write one after the other. A numeric column is anything with tobytes() (array.array, numpy array)
+    holding int64 or float64 values, a str column is (offsets, utf-8 blob) with the end offset of every value.
+    """
+    # Column blocks, with their offsets relative to the start of the data section.
+    blocks = []
+    position = 0
+    meta_columns = []
+    for name, t, column in zip(header, types, columns):
+        if t == STR:
+            offsets, blob = column
+            meta_columns.append(dict(name=name, type=t, offsets=position, data=position + len(offsets) * 8,
+                                     length=len(blob)))
+            parts = [offsets.tobytes(), bytes(blob)]
+        else:
+            meta_columns.append(dict(name=name, type=t, offset=position))
+            parts = [column.tobytes()]
+        for part in parts:
+            blocks.append(part + b'\x00' * _padding(len(part)))
+            position += len(blocks[-1])
+
+    meta = dict(version=VERSION, byteorder=sys.byteorder, rows=rows, columns=meta_columns, source=source)
+    return [_head(meta), *blocks]
+
+
+def _head(meta):
+    """MAGIC, the meta and the padding up to the first column block, which all offsets are relative to."""
+    meta = json.dumps(meta).encode()
+    head = MAGIC + struct.pack('<Q', len(meta)) + meta
+    return head + b'\x00' * _padding(len(head))
+
+
+def build_cache(data_file=DATA_FILE, cache_file=None):
+    """Parse the csv file once and write it as a columnar cache file. Returns the cache path."""
+    data_file = Path(data_file)
+    cache_file = Path(cache_file) if cache_file else cache_path(data_file)
+
+    stat = data_file.stat()
+    header = get_header(data_file)
+    types = _infer_types(data_file, len(header))
+
+    columns = []
+    for t in types:
+        if t == STR:
+            columns.append((array.array('q', [0]), bytearray()))
+        else:
+            columns.append(array.array(TYPECODES[t]))
+
+    rows = 0
+    for row in iter_data(data_file, typed=False):
+        for value, t, column in zip(row, types, columns):
+            if t == INT:
+                column.append(int(value))
+            elif t == FLOAT:
+                column.append(float(value))
+            else:
+                offsets, blob = column
+                blob += value.encode()
+                offsets.append(len(blob))
+        rows += 1
+
+    parts = encode(header, types, columns, rows,
+                   source=dict(mtime_ns=stat.st_mtime_ns, size=stat.st_size, sha256=file_hash(data_file)))
+
+    cache_file.parent.mkdir(exist_ok=True)
+    _replace(cache_file, parts)
+    return cache_file
+
+
+def _replace(cache_file, parts):
+    # Write to a private file and rename it, so parallel workers never see a half written cache.
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    with open(tmp_file, 'wb') as f:
+        f.writelines(parts)
+    os.replace(tmp_file, cache_file)
+
+
+def _restamp(cache_file, meta, stat):
+    """Store the new mtime of a csv file whose content did not change, the next processes trust it without hashing."""
+    meta['source'] = dict(meta['source'], mtime_ns=stat.st_mtime_ns)
+    with open(cache_file, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            _, base = _meta_from(mapped)
+            try:
+                _replace(cache_file, [_head(meta), mapped[base:]])
+            except OSError:
+                pass # read-only checkout, the hash is checked again next time
+
+
+def read_meta(cache_file):
+    with open(cache_file, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{cache_file} is not a column cache file")
+        (length,) = struct.unpack('<Q', f.read(8))
+        return json.loads(f.read(length))
+
+
+def _meta_from(buffer):
+    if bytes(buffer[:len(MAGIC)]) != MAGIC:
+        raise ValueError("the buffer does not hold a column cache")
+    (length,) = struct.unpack_from('<Q', buffer, len(MAGIC))
+    head = len(MAGIC) + 8 + length
+    return json.loads(bytes(buffer[len(MAGIC) + 8:head])), head + _padding(head)
+
+
+def is_fresh(data_file=DATA_FILE, cache_file=None):
+    """
+    Check if the cache file still matches the csv file.
+
+    A matching mtime and size is trusted, otherwise the content hash decides, so touching the csv does not force a rebuild.
+    The cache then keeps the new mtime, the file is only hashed once after a touch.
+    """
+    cache_file = Path(cache_file) if cache_file else cache_path(data_file)
+    try:
+        meta = read_meta(cache_file)
+    except (OSError, ValueError):
+        return False
+    if meta.get('version') != VERSION or meta.get('byteorder') != sys.byteorder:
+        return False
+    stat = os.stat(data_file)
+    source = meta['source']
+    if source['mtime_ns'] == stat.st_mtime_ns and source['size'] == stat.st_size:
+        return True
+    if source['size'] != stat.st_size or source['sha256'] != file_hash(data_file):
+        return False
+    _restamp(cache_file, meta, stat)
+    return True
+
+
+class StrColumn:
+    """Read only sequence of str, decoded from the cache file on access."""
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("StrColumn index out of range")
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class ColumnarData:
+    """
+    Memory mapped view of a cache file written by build_cache(), or of a buffer holding the same layout
+    (shared memory, see dataPlane.py).
+
+    Numeric columns are memoryview objects over the mapped file (no copy is made), str columns are decoded lazily.
+    """
+
+    def __init__(self, cache_file=None, buffer=None):
+        self.cache_file = Path(cache_file) if cache_file else None
+        self._mmap = None
+        if buffer is None:
+            with open(self.cache_file, 'rb') as f:
+                self._mmap = buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.meta, self._base = _meta_from(buffer)
+        self.rows = self.meta['rows']
+        self.header = [c['name'] for c in self.meta['columns']]
+        self._view = memoryview(buffer)
+        self._columns = {}
+
+    def __len__(self):
+        return self.rows
+
+    def _slice(self, offset, length):
+        start = self._base + offset
+        return self._view[start:start + length]
+
+    def column(self, name):
+        if name not in self._columns:
+            if name not in self.header:
+                raise KeyError(f"Unknown column {name}, available columns are {self.header}")
+            meta = self.meta['columns'][self.header.index(name)]
+            if meta['type'] == STR:
+                offsets = self._slice(meta['offsets'], (self.rows + 1) * 8).cast('q')
+                self._columns[name] = StrColumn(offsets, self._slice(meta['data'], meta['length']))
+            else:
+                self._columns[name] = self._slice(meta['offset'], self.rows * 8).cast(TYPECODES[meta['type']])
+        return self._columns[name]
+
+    def iter_rows(self, columns=None, start=0, stop=None):
+        """Yield rows as tuples, with the same column projection and row range as utils.iter_data()."""
+        selected = [self.column(name) for name in (columns or self.header)]
+        start, stop, _ = slice(start, stop).indices(self.rows)
+        for i in range(start, stop):
+            yield tuple(column[i] for column in selected)
+
+    def close(self):
+        for column in self._columns.values():
+            if isinstance(column, StrColumn):
+                column.offsets.release()
+                column.data.release()
+            else:
+                column.release()
+        self._columns.clear()
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+
+def load_data(data_file=DATA_FILE):
+    """Return the ColumnarData for the csv file, (re)building its cache first when the csv has changed."""
+    record_input(data_file)
+    if os.environ.get(DATA_PLANE_ENV):
+        # Published in shared memory for the session (see dataPlane.py), no need to open the files
+        from pytest_topics.utils.dataPlane import attach, dataset_name
+        shared = attach(dataset_name(data_file))
+        if shared is not None:
+            return shared
+    cache_file = cache_path(data_file)
+    stat = os.stat(data_file)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    loaded = _loaded.get(cache_file)
+    if loaded is not None and loaded[0] == signature:
+        return loaded[1]
+
+    if not is_fresh(data_file, cache_file):
+        build_cache(data_file, cache_file)
+    # An older ColumnarData is not closed here, views handed out from it stay valid until they are released.
+    data = ColumnarData(cache_file)
+    _loaded[cache_file] = (signature, data)
+    return data
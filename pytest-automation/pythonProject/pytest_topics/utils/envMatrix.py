@@ -0,0 +1,200 @@
+"""
+Run the environment specific tests against several environments in one pytest run.
+
+    pytest pytest_topics --envs qa,prod,custom --matrix-workers 3
+
+- Every test using the `target_env` fixture (cmdOpt, acmdOpt and env_config do) is parametrized over the
+  environments, e.g. test_readCmdOpt[env=prod]. The other tests run once, as usual.
+- The config of each environment is a snapshot of config/<env>.ini in the config registry, parsed once per process.
+- With --matrix-workers N the tests are collected once, then run by N forked worker processes, the tests of one
+  environment staying together in a worker. The reports come back to the main process, which prints them as usual.
+  The runtest hooks only run in the workers, and a worker ends without pytest_sessionfinish: a plugin gathering
+  results while the tests run gives them to the main process with two methods, worker_state() called in the worker
+  at its end (json data), and merge_worker_state(state, items) called in the main process (items: node id -> item).
+  The main process then saves them once, in its own pytest_sessionfinish.
+- The end of the run shows the results per environment. When a worker crashes outside of a test, its traceback is
+  shown under the environments it was running, and its remaining tests fail.
+
+conftest.py registers this module's MatrixPlugin when --envs is given.
+"""
+import json
+import os
+import selectors
+import sys
+import traceback
+
+import pytest
+
+ENV_PARAM = 'target_env'
+SHARED = '(shared)' # the group of the tests not tied to an environment
+
+
+def env_of(item):
+    callspec = getattr(item, 'callspec', None)
+    if callspec is not None and ENV_PARAM in callspec.params:
+        return callspec.params[ENV_PARAM]
+    return SHARED
+
+
+def assign(items, workers):
+    """Split the items into at most `workers` lists, keeping every environment in one list, largest groups first."""
+    groups = {}
+    for item in items:
+        groups.setdefault(env_of(item), []).append(item)
+    shards = [[] for _ in range(min(workers, len(groups)))]
+    for group in sorted(groups.values(), key=len, reverse=True):
+        min(shards, key=len).extend(group)
+    # Keep the collection order inside every worker, module and class fixtures are set up once.
+    order = {item: i for i, item in enumerate(items)}
+    return [sorted(shard, key=order.__getitem__) for shard in shards if shard]
+
+
+class MatrixPlugin:
+
+    def __init__(self, config, envs, workers=0):
+        self.config = config
+        self.envs = envs
+        self.workers = workers
+        self.results = {} # env -> {outcome: count}
+        self.crashes = {} # env -> tracebacks of the workers that crashed while running it
+        self._env_by_nodeid = {}
+
+    def pytest_generate_tests(self, metafunc):
+        if ENV_PARAM in metafunc.fixturenames:
+            metafunc.parametrize(ENV_PARAM, self.envs, ids=[f"env={env}" for env in self.envs])
+
+    def pytest_collection_modifyitems(self, items):
+        self._env_by_nodeid = {item.nodeid: env_of(item) for item in items}
+
+    def pytest_runtest_logreport(self, report):
+        # One outcome per test: its call, or the setup / teardown that failed or skipped it.
+        if report.when == 'call':
+            outcome = report.outcome
+            if hasattr(report, 'wasxfail'):
+                outcome = 'xfailed' if report.skipped else 'xpassed'
+        elif report.failed:
+            outcome = 'error'
+        elif report.skipped:
+            outcome = 'skipped'
+        else:
+            return
+        counts = self.results.setdefault(self._env_by_nodeid.get(report.nodeid, SHARED), {})
+        counts[outcome] = counts.get(outcome, 0) + 1
+
+    def pytest_terminal_summary(self, terminalreporter):
+        tr = terminalreporter
+        tr.write_sep("=", "results per environment")
+        for env in [*self.envs, SHARED]:
+            counts = self.results.get(env)
+            if counts:
+                tr.write_line(f"{env:<10} " + ", ".join(f"{count} {outcome}" for outcome, count in sorted(counts.items())))
+            for crash in self.crashes.get(env, ()):
+                tr.write_line(f"{env:<10} worker crashed:", red=True)
+                for line in crash.rstrip().splitlines():
+                    tr.write_line(f"    {line}")
+
+    # Worker processes
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtestloop(self, session):
+        if self.workers <= 1 or not hasattr(os, 'fork') or session.config.option.collectonly:
+            return None # pytest's own loop, in this process
+        if session.testsfailed and session.config.option.continue_on_collection_errors is False:
+            raise session.Interrupted(f"{session.testsfailed} error(s) during collection")
+
+        shards = assign(session.items, self.workers)
+        selector = selectors.DefaultSelector()
+        pending = {}
+        for shard in shards:
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_fd)
+                self._worker(session, shard, write_fd)
+            os.close(write_fd)
+            reader = os.fdopen(read_fd, 'r')
+            envs = sorted(set(map(env_of, shard)), key=[*self.envs, SHARED].index)
+            selector.register(reader, selectors.EVENT_READ, (pid, envs, {item.nodeid: item for item in shard}))
+            pending[pid] = set(item.nodeid for item in shard)
+
+        started = set()
+        errors = {} # pid -> traceback sent by the worker
+        while selector.get_map():
+            for key, _ in selector.select():
+                pid, envs, items = key.data
+                line = key.fileobj.readline()
+                if not line:
+                    selector.unregister(key.fileobj)
+                    key.fileobj.close()
+                    _, status = os.waitpid(pid, 0)
+                    for nodeid in pending.pop(pid):
+                        self._report_lost(items[nodeid], status, errors.get(pid)) # the worker died before running it
+                    continue
+                data = json.loads(line)
+                if 'worker_state' in data:
+                    self._merge_state(data['worker_state'], items)
+                    continue
+                if 'worker_error' in data:
+                    errors[pid] = data['worker_error']
+                    for env in envs:
+                        self.crashes.setdefault(env, []).append(data['worker_error'])
+                    continue
+                report = self.config.hook.pytest_report_from_serializable(config=self.config, data=data)
+                item = items[report.nodeid]
+                if report.nodeid not in started:
+                    started.add(report.nodeid)
+                    item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+                item.ihook.pytest_runtest_logreport(report=report)
+                if report.when == 'teardown':
+                    item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+                    pending[pid].discard(report.nodeid)
+        return True
+
+    def _worker(self, session, items, write_fd):
+        """Run in the forked process: run the items, send every report as a json line, and exit."""
+        out = os.fdopen(write_fd, 'w')
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 1) # the main process prints the reports
+        config = session.config
+        config.pluginmanager.unregister(name="terminalreporter")
+
+        class Sender:
+            @staticmethod
+            def pytest_runtest_logreport(report):
+                data = config.hook.pytest_report_to_serializable(config=config, report=report)
+                out.write(json.dumps(data) + "\n")
+                out.flush()
+
+        config.pluginmanager.register(Sender(), "pytest_topics_matrix_sender")
+        code = 0
+        try:
+            session.items = items
+            for i, item in enumerate(items):
+                nextitem = items[i + 1] if i + 1 < len(items) else None
+                item.config.hook.pytest_runtest_protocol(item=item, nextitem=nextitem)
+            state = {name: plugin.worker_state() for name, plugin in config.pluginmanager.list_name_plugin()
+                     if hasattr(plugin, 'worker_state')}
+            out.write(json.dumps(dict(worker_state=state)) + "\n")
+        except BaseException:
+            code = 1
+            # Only the main process prints, the traceback goes there with the reports
+            out.write(json.dumps(dict(worker_error=traceback.format_exc())) + "\n")
+        finally:
+            out.close()
+            sys.stdout.flush()
+            os._exit(code)
+
+    def _merge_state(self, state, items):
+        for name, plugin_state in state.items():
+            plugin = self.config.pluginmanager.get_plugin(name)
+            if plugin is not None:
+                plugin.merge_worker_state(plugin_state, items)
+
+    def _report_lost(self, item, status, error=None):
+        item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+        longrepr = f"worker process ended (status {status}) before the test finished"
+        if error:
+            longrepr += f": {error.rstrip().splitlines()[-1]}"
+        report = pytest.TestReport(item.nodeid, item.location, {}, 'failed', longrepr, 'call')
+        item.ihook.pytest_runtest_logreport(report=report)
+        item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
@@ -0,0 +1,94 @@
+import hashlib
+import os
+import pickle
+import sys
+from importlib.metadata import version
+from pathlib import Path
+
+from pytest_bdd import feature as bdd_feature
+from pytest_bdd.parser import FeatureParser
+
+from pytest_topics.utils.inputTracker import record_input
+
+featureFileDir = 'feature_dir'
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+BDD_DIR = BASE_DIR.joinpath('bdd_test')
+FEATURE_DIR = BDD_DIR.joinpath(featureFileDir)
+CACHE_DIR = '__pycache__'
+CACHE_NAME = 'features.pickle'
+
+CACHE_VERSION = 2 # of the cached Feature objects, 1 had absolute rel_filename values
+# A cache written by another pytest-bdd or python version is thrown away, the pickled classes may have changed.
+CACHE_KEY = (CACHE_VERSION, version('pytest-bdd'), sys.version_info[:2])
+
+
+def feature_path(path):
+    """The key of a .feature file in pytest-bdd's feature cache: its absolute path, symlinks are not resolved."""
+    return os.path.abspath(path)
+
+
+def cache_path(feature_dir=FEATURE_DIR):
+    return Path(feature_dir).joinpath(CACHE_DIR).joinpath(CACHE_NAME)
+
+
+def _read_index(cache_file):
+    try:
+        with open(cache_file, 'rb') as f:
+            key, index = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError):
+        return {}
+    return index if key == CACHE_KEY else {}
+
+
+def _write_index(cache_file, index):
+    try:
+        cache_file.parent.mkdir(exist_ok=True)
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        with open(tmp_file, 'wb') as f:
+            pickle.dump((CACHE_KEY, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass # read only checkout, the features were parsed anyway
+
+
+def load_features(feature_dir=FEATURE_DIR, cache_file=None):
+    """
+    Put every parsed .feature file of feature_dir in pytest-bdd's own feature cache, before scenarios() asks for them.
+
+    A file whose mtime and size did not change costs a stat, a touched file costs a hash of its content, and only
+    a file whose content changed is parsed again. The files are parsed and keyed like pytest-bdd's get_feature()
+    does, with feature_path(), so scenarios() finds them and reports the same file names.
+    Returns {path: Feature}.
+    """
+    cache_file = Path(cache_file) if cache_file else cache_path(feature_dir)
+    index = _read_index(cache_file)
+    changed = False
+    loaded = {}
+
+    for path in sorted(str(p) for p in Path(feature_path(feature_dir)).rglob('*.feature')):
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        entry = index.get(path)
+        if entry is None or entry['stat'] != signature:
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            if entry is None or entry['sha256'] != digest:
+                feature = FeatureParser(os.path.dirname(path), os.path.basename(path)).parse()
+                entry = dict(sha256=digest, feature=pickle.dumps(feature, protocol=pickle.HIGHEST_PROTOCOL))
+                loaded[path] = feature
+            entry['stat'] = signature
+            index[path] = entry
+            changed = True
+        if path not in loaded:
+            loaded[path] = pickle.loads(entry['feature'])
+
+    for path in set(index) - set(loaded):
+        del index[path] # the feature file was deleted
+        changed = True
+    if changed:
+        _write_index(cache_file, index)
+
+    record_input(*loaded) # read from the cache or not, the scenarios depend on these files
+    bdd_feature.features.update(loaded)
+    return loaded
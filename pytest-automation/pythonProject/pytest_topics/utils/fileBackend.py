@@ -0,0 +1,103 @@
+"""
+Where fixtures like file_write put their files.
+
+- disk: a real file in a directory of the temp directory, the default.
+- tmpfs: a real file in a directory of /dev/shm (the temp directory when there is no /dev/shm).
+- memory: an io.StringIO, no file system access at all. Its name is not a path: "memory:<worker>/<n>-<filename>".
+
+Every worker process gets its own directory and every file a unique name, so parallel workers never collide.
+Files are not removed one by one: they are deleted in batches, and the directory is removed at the end of the session.
+"""
+import io
+import itertools
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+TMPFS_DIR = '/dev/shm'
+CLEANUP_BATCH = 1000 # released files deleted together
+
+
+def worker_id():
+    # Set by pytest-xdist in its worker processes.
+    return os.environ.get('PYTEST_XDIST_WORKER', 'main')
+
+
+class MemoryBackend:
+
+    name = 'memory'
+
+    def __init__(self):
+        self._counter = itertools.count()
+
+    def create(self, filename, data=''):
+        """Return an open, readable and writable file holding data, positioned at its start."""
+        f = io.StringIO(data)
+        # Unique like the names of the real files, but never mistaken for a path of the current directory.
+        f.name = f"memory:{worker_id()}/{next(self._counter)}-{filename}"
+        return f
+
+    def release(self, f):
+        f.close()
+
+    def cleanup(self):
+        pass
+
+
+class DirectoryBackend:
+
+    name = 'disk'
+
+    def __init__(self, base_dir=None):
+        base_dir = base_dir or tempfile.gettempdir()
+        self.root = Path(tempfile.mkdtemp(prefix=f"pytest-files-{worker_id()}-", dir=base_dir))
+        self._counter = itertools.count()
+        self._released = []
+
+    def create(self, filename, data=''):
+        path = self.root.joinpath(f"{next(self._counter)}-{filename}")
+        # One open for writing and reading, then back to the start for the test.
+        f = open(path, 'w+')
+        f.write(data)
+        f.flush()
+        f.seek(0)
+        return f
+
+    def release(self, f):
+        f.close()
+        self._released.append(f.name)
+        if len(self._released) >= CLEANUP_BATCH:
+            self._delete_released()
+
+    def _delete_released(self):
+        for path in self._released:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._released.clear()
+
+    def cleanup(self):
+        self._released.clear()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+class TmpfsBackend(DirectoryBackend):
+
+    name = 'tmpfs'
+
+    def __init__(self, base_dir=None):
+        if base_dir is None and os.path.isdir(TMPFS_DIR) and os.access(TMPFS_DIR, os.W_OK):
+            base_dir = TMPFS_DIR
+        super().__init__(base_dir)
+
+
+BACKENDS = {backend.name: backend for backend in (MemoryBackend, TmpfsBackend, DirectoryBackend)}
+
+
+def get_backend(name):
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown file backend {name!r}, choose one of {sorted(BACKENDS)}") from None
@@ -0,0 +1,315 @@
+"""
+Fixture graph of a test session: which fixture depends on which, which tests use them, how often each one is set up
+and what its setup and teardown cost.
+
+    pytest pytest_topics --fixture-graph              # analysis at the end of the run
+    pytest pytest_topics --fixture-graph graph.json   # ... and the whole graph as JSON
+    pytest pytest_topics --fixture-reorder            # run the tests in the order that sets the fixtures up least
+
+The analysis proposes:
+
+- scope promotions: a fixture whose dependencies would allow a wider scope, with the setups and seconds it would
+  save. Only a proposal: the fixture must not keep per test state (request.node, a file deleted after every test...).
+- a reordering: the number of setups of every fixture is simulated for the collected order and for an order grouping
+  the tests by the parameters of the expensive session, package and module fixtures. --fixture-reorder applies it
+  when the simulation says it is cheaper, with the costs recorded in pytest's cache directory
+  (.pytest_cache/d/pytest_topics/fixturecosts.json) by earlier --fixture-graph or --fixture-reorder runs. Without
+  recorded costs the collected order is kept.
+
+The simulation follows pytest's caching: a fixture is set up again when its parameter changes or when the tests leave
+the class, module or package its scope is tied to.
+"""
+import inspect
+import json
+import os
+import time
+
+import pytest
+
+from pytest_topics.utils.sharding import load_durations, save_durations
+
+SCOPES = ('function', 'class', 'module', 'package', 'session') # narrow to wide
+DEFAULT_COST = 0.001 # seconds, for a fixture without recorded cost
+SHOWN = 10
+
+
+def fixture_key(fixturedef):
+    return f"{fixturedef.baseid}::{fixturedef.argname}" if fixturedef.baseid else fixturedef.argname
+
+
+def _is_direct_param(fixturedef):
+    # @pytest.mark.parametrize arguments are fixtures inside pytest too
+    return getattr(fixturedef.func, '__name__', '') == 'get_direct_param_fixture_func'
+
+
+def scope_ids(item):
+    """{scope: node id of the item's class, module, ... for that scope}."""
+    module = item.getparent(pytest.Module)
+    cls = item.getparent(pytest.Class)
+    package = item.getparent(pytest.Package)
+    module_id = module.nodeid if module else ''
+    # A class scoped fixture used outside of a class lives as long as the module.
+    return dict(function=item.nodeid, module=module_id, session='', package=package.nodeid if package else '',
+                **{'class': cls.nodeid if cls else module_id})
+
+
+class FixtureNode:
+    """One fixture definition in the graph, with what the run measured."""
+
+    __slots__ = ('key', 'name', 'baseid', 'scope', 'params', 'depends_on', 'dependencies', 'shared', 'local', 'users',
+                 'setups', 'setup_s', 'teardown_s')
+
+    def __init__(self, fixturedef, root):
+        self.key = fixture_key(fixturedef)
+        self.name = fixturedef.argname
+        self.baseid = fixturedef.baseid
+        self.scope = fixturedef.scope
+        self.params = len(fixturedef.params) if fixturedef.params else 0
+        self.depends_on = [name for name in fixturedef.argnames if name != 'request']
+        self.dependencies = {} # fixture key -> scope of the definitions the tests resolved depends_on to
+        self.shared = getattr(fixturedef.func, 'shared', False) # a shared_fixture
+        try:
+            self.local = os.path.abspath(inspect.getsourcefile(fixturedef.func)).startswith(root)
+        except TypeError:
+            self.local = False
+        self.users = 0
+        self.setups = 0
+        self.setup_s = 0.0
+        self.teardown_s = 0.0
+
+    def cost(self, recorded):
+        """Seconds per setup and teardown: measured in this run, else recorded, else DEFAULT_COST."""
+        if self.setups:
+            return (self.setup_s + self.teardown_s) / self.setups
+        return recorded.get(self.key, DEFAULT_COST)
+
+    def as_dict(self):
+        data = {name: getattr(self, name) for name in self.__slots__ if name != 'local'}
+        data['setup_s'] = round(self.setup_s, 6)
+        data['teardown_s'] = round(self.teardown_s, 6)
+        return data
+
+
+def simulate(order, tests, nodes, scopes=None, only=None):
+    """{fixture key: setups} when the tests run in this order. scopes overrides the scope of some fixtures,
+    only limits the simulation to these fixture keys."""
+    scopes = scopes or {}
+    setups = dict.fromkeys(nodes if only is None else only, 0)
+    alive = {} # fixture key -> cache key of the instance set up
+    for nodeid in order:
+        ids, used = tests[nodeid]
+        # Leaving a class, module or package tears its fixtures down.
+        for key, (scope_id, _) in list(alive.items()):
+            if scope_id != ids[scopes.get(key, nodes[key].scope)]:
+                del alive[key]
+        for key, param in used.items():
+            if key not in setups:
+                continue
+            cache_key = (ids[scopes.get(key, nodes[key].scope)], param)
+            if alive.get(key) != cache_key:
+                setups[key] += 1
+                alive[key] = cache_key
+    return setups
+
+
+def total_cost(setups, nodes, recorded):
+    return sum(count * nodes[key].cost(recorded) for key, count in setups.items())
+
+
+def grouped_order(order, tests, nodes, recorded):
+    """The order grouping the tests by the parameters of the expensive fixtures wider than function scope."""
+    params = sorted((key for key, node in nodes.items() if node.params and node.scope != 'function'),
+                    key=lambda key: (-SCOPES.index(nodes[key].scope), -nodes[key].cost(recorded)))
+    position = {nodeid: i for i, nodeid in enumerate(order)}
+
+    def group(nodeid):
+        used = tests[nodeid][1]
+        return tuple(-1 if used.get(key) is None else used[key] for key in params), position[nodeid]
+    return sorted(order, key=group)
+
+
+class FixtureGraph:
+
+    def __init__(self, rootdir, report=None, reorder=False, costs_file=None):
+        self.root = os.path.abspath(rootdir)
+        self.report = report
+        self.reorder = reorder
+        self.costs_file = costs_file
+        self.recorded = load_durations(costs_file)
+        self.nodes = {} # fixture key -> FixtureNode
+        self.tests = {} # test node id -> (scope ids, {fixture key: param index})
+        self.order = []
+        self.reordered = None # (setups before, setups after, seconds before, seconds after)
+        self.no_costs = False # --fixture-reorder without recorded costs
+        self._teardowns = {}
+
+    # Graph
+
+    def add_item(self, item):
+        info = getattr(item, '_fixtureinfo', None)
+        if info is None:
+            return
+        callspec = getattr(item, 'callspec', None)
+        indices = callspec.indices if callspec is not None else {}
+        used = {}
+        for name in info.names_closure:
+            fixturedefs = info.name2fixturedefs.get(name)
+            if not fixturedefs or _is_direct_param(fixturedefs[-1]):
+                continue
+            fixturedef = fixturedefs[-1] # the definition closest to the test wins
+            key = fixture_key(fixturedef)
+            node = self.nodes.get(key)
+            if node is None:
+                node = self.nodes[key] = FixtureNode(fixturedef, self.root)
+            node.users += 1
+            used[key] = indices.get(name)
+            self._resolve(node, fixturedef, info.name2fixturedefs)
+        self.tests[item.nodeid] = (scope_ids(item), used)
+
+    def _resolve(self, node, fixturedef, name2fixturedefs):
+        """Record the definitions the dependencies of a fixture resolve to for this test, as pytest resolves them."""
+        for name in node.depends_on:
+            fixturedefs = name2fixturedefs.get(name)
+            if not fixturedefs:
+                continue
+            if name == node.name:
+                # A fixture requesting its own name gets the definition it overrides.
+                position = fixturedefs.index(fixturedef) if fixturedef in fixturedefs else 0
+                if position == 0:
+                    continue
+                dependency = fixturedefs[position - 1]
+            else:
+                dependency = fixturedefs[-1]
+            node.dependencies[fixture_key(dependency)] = dependency.scope
+
+    def widest_scope(self, node):
+        """The widest scope the fixture could have: no wider than any fixture it depends on."""
+        widest = len(SCOPES) - 1
+        for scope in node.dependencies.values():
+            widest = min(widest, SCOPES.index(scope))
+        return SCOPES[widest]
+
+    # Analysis
+
+    def promotions(self):
+        """[(saved seconds, node, new scope, setups now, setups then)], most saving first."""
+        current = simulate(self.order, self.tests, self.nodes)
+        proposals = []
+        for key, node in self.nodes.items():
+            scope = self.widest_scope(node)
+            if not node.local or node.shared or SCOPES.index(scope) <= SCOPES.index(node.scope):
+                continue
+            promoted = simulate(self.order, self.tests, self.nodes, {key: scope}, only=(key,))[key]
+            saved = (current[key] - promoted) * node.cost(self.recorded)
+            if promoted < current[key]:
+                proposals.append((saved, node, scope, current[key], promoted))
+        return sorted(proposals, key=lambda proposal: proposal[0], reverse=True)
+
+    def reordering(self):
+        """(order, setups now, setups then, seconds now, seconds then) of the grouped order."""
+        order = grouped_order(self.order, self.tests, self.nodes, self.recorded)
+        before = simulate(self.order, self.tests, self.nodes)
+        after = simulate(order, self.tests, self.nodes)
+        return (order, sum(before.values()), sum(after.values()),
+                total_cost(before, self.nodes, self.recorded), total_cost(after, self.nodes, self.recorded))
+
+    # Hooks
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, config, items):
+        for item in items:
+            self.add_item(item)
+        self.order = [item.nodeid for item in items]
+        if not self.reorder:
+            return
+        if not self.recorded:
+            # Every fixture would cost DEFAULT_COST: nothing to tell the expensive ones apart
+            self.no_costs = True
+            return
+        order, setups_before, setups_after, before, after = self.reordering()
+        if after < before:
+            position = {nodeid: i for i, nodeid in enumerate(order)}
+            items.sort(key=lambda item: position[item.nodeid])
+            self.order = order
+            self.reordered = (setups_before, setups_after, before, after)
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        start = time.perf_counter()
+        try:
+            return (yield)
+        finally:
+            node = self.nodes.get(fixture_key(fixturedef))
+            if node is not None:
+                node.setups += 1
+                node.setup_s += time.perf_counter() - start
+                # Runs before the fixture's own teardown, pytest_fixture_post_finalizer after it (see timingPlugin.py)
+                key = (id(fixturedef), request.node.nodeid)
+                fixturedef.addfinalizer(lambda: self._teardowns.__setitem__(key, time.perf_counter()))
+
+    def pytest_fixture_post_finalizer(self, fixturedef, request):
+        start = self._teardowns.pop((id(fixturedef), request.node.nodeid), None)
+        node = self.nodes.get(fixture_key(fixturedef))
+        if start is not None and node is not None:
+            node.teardown_s += time.perf_counter() - start
+
+    def write_report(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        order, setups_before, setups_after, before, after = self.reordering()
+        with open(path, 'w') as f:
+            json.dump(dict(
+                fixtures=[node.as_dict() for node in self.nodes.values()],
+                tests={nodeid: sorted(used) for nodeid, (_, used) in self.tests.items()},
+                promotions=[dict(fixture=node.key, scope=node.scope, to=scope, setups=now, setups_after=then,
+                                 saved_s=round(saved, 6)) for saved, node, scope, now, then in self.promotions()],
+                reordering=dict(setups=setups_before, setups_after=setups_after,
+                                cost_s=round(before, 6), cost_after_s=round(after, 6))), f, separators=(',', ':'))
+
+    # Worker processes of envMatrix.py
+
+    def worker_state(self):
+        return {key: [node.setups, node.setup_s, node.teardown_s] for key, node in self.nodes.items() if node.setups}
+
+    def merge_worker_state(self, state, items):
+        for key, (setups, setup_s, teardown_s) in state.items():
+            node = self.nodes.get(key)
+            if node is not None:
+                node.setups += setups
+                node.setup_s += setup_s
+                node.teardown_s += teardown_s
+
+    def pytest_sessionfinish(self, session):
+        measured = {node.key: node.cost(self.recorded) for node in self.nodes.values() if node.setups}
+        if measured:
+            save_durations(measured, self.costs_file)
+        if self.report:
+            self.write_report(self.report)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        tr = terminalreporter
+        tr.write_sep("=", "fixture graph")
+        nodes = sorted(self.nodes.values(), key=lambda node: node.setup_s + node.teardown_s, reverse=True)
+        tr.write_line(f"{'fixture':<40} {'scope':<8} {'tests':>6} {'setups':>6} {'setup':>9} {'teardown':>9}  depends on")
+        for node in nodes[:SHOWN]:
+            tr.write_line(f"{node.name:<40} {node.scope:<8} {node.users:6d} {node.setups:6d} {node.setup_s:8.4f}s "
+                          f"{node.teardown_s:8.4f}s  {', '.join(node.depends_on)}")
+        for saved, node, scope, now, then in self.promotions()[:SHOWN]:
+            tr.write_line(f"promote {node.name} ({node.baseid or 'plugin'}) {node.scope} -> {scope}: "
+                          f"{now} setups -> {then}, saves ~{saved:.4f}s if it keeps no per test state")
+        if self.no_costs:
+            tr.write_line("--fixture-reorder: no fixture costs recorded yet, the collected order was kept"
+                          + (" (the next run uses the costs of this one)" if self.costs_file is not None else ""))
+        if self.reordered:
+            setups_before, setups_after, before, after = self.reordered
+            tr.write_line(f"reordered: {setups_before} setups -> {setups_after}, ~{before:.4f}s -> ~{after:.4f}s")
+        else:
+            _, setups_before, setups_after, before, after = self.reordering()
+            if after < before:
+                tr.write_line(f"--fixture-reorder would save ~{before - after:.4f}s "
+                              f"({setups_before} setups -> {setups_after})")
+            else:
+                tr.write_line("the collected order already sets the fixtures up least")
+        if self.report:
+            tr.write_line(f"fixture graph: {self.report}")
@@ -0,0 +1,99 @@
+"""
+A small local stand-in for the httpbin.org endpoints used by the tests, so they run offline.
+
+    with HttpbinStub() as server:
+        requests.get(f"{server.url}/status/404")
+
+It serves on a free loopback port, handles requests on threads, and keeps connections alive so a pooled
+requests.Session reuses them.
+"""
+import json
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+HOST = '127.0.0.1'
+
+
+class HttpbinHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1' # keep-alive, needed for connection pooling
+
+    def _send(self, status, body=b'', content_type='text/plain'):
+        self.send_response(status)
+        if status not in (HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED) and status >= 200:
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body and self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _handle(self):
+        body = self._read_body()
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split('/') if part]
+
+        if len(parts) == 2 and parts[0] == 'status':
+            # httpbin picks one of several comma separated codes at random, the stand-in always uses the first.
+            try:
+                status = int(parts[1].split(',')[0])
+            except ValueError:
+                return self._send(HTTPStatus.BAD_REQUEST, b'Invalid status code')
+            return self._send(status)
+
+        if len(parts) == 1 and parts[0] in ('get', 'post', 'put', 'patch', 'delete', 'anything'):
+            if parts[0] != 'anything' and parts[0].upper() != self.command:
+                return self._send(HTTPStatus.METHOD_NOT_ALLOWED)
+            payload = dict(
+                args={k: v[0] if len(v) == 1 else v for k, v in parse_qs(url.query).items()},
+                headers=dict(self.headers),
+                method=self.command,
+                url=f"http://{self.headers.get('Host', HOST)}{self.path}",
+                data=body.decode(errors='replace'),
+            )
+            return self._send(HTTPStatus.OK, json.dumps(payload).encode(), 'application/json')
+
+        return self._send(HTTPStatus.NOT_FOUND, b'Not Found')
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _handle
+
+    def log_message(self, format, *args):
+        pass # keep the test output clean
+
+
+class HttpbinStub:
+    """Runs an HttpbinHandler server on a background thread, `url` is its base url."""
+
+    def __init__(self, host=HOST, port=0):
+        self.server = ThreadingHTTPServer((host, port), HttpbinHandler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="httpbin-stub", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.thread is not None:
+            # shutdown() waits for serve_forever() to return, it would block forever on a server never started.
+            self.server.shutdown()
+            self.thread.join()
+            self.thread = None
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
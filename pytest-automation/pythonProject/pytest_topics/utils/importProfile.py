@@ -0,0 +1,60 @@
+"""
+Import-time profile of the collection: how long each test module (and each directory, for its conftest.py) takes to
+import, and which packages it is the first to import.
+
+    pytest pytest_topics --import-profile              # table at the end of the run
+    pytest pytest_topics --import-profile=imports.json # also as JSON
+
+A module importing numpy or requests at the top pays for it at collection, even when -k deselects all of its tests.
+The "first imports" column shows who pays: a package is listed for the first collector that imported it only.
+Collection time does not only come from imports: pytest-bdd's scenarios() and parametrize run there as well.
+"""
+import json
+import sys
+import time
+
+import pytest
+
+MAX_LISTED = 5 # first imported packages shown per module
+
+
+class ImportProfile:
+
+    def __init__(self, report=None):
+        self.report = report
+        self.records = []
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_make_collect_report(self, collector):
+        if not isinstance(collector, (pytest.Module, pytest.Dir, pytest.Package)):
+            return (yield)
+        before = set(sys.modules)
+        begin = time.perf_counter()
+        try:
+            return (yield)
+        finally:
+            elapsed = time.perf_counter() - begin
+            new = set(sys.modules) - before
+            if isinstance(collector, pytest.Module) or new:
+                # Only the roots of what was imported: numpy, not numpy.linalg
+                packages = sorted(name for name in new
+                                  if not any(name[:i] in new for i, c in enumerate(name) if c == '.'))
+                self.records.append(dict(nodeid=collector.nodeid or '.', kind=type(collector).__name__,
+                                         seconds=round(elapsed, 6), modules=len(new), packages=packages))
+
+    def pytest_sessionfinish(self, session):
+        if self.report:
+            with open(self.report, 'w') as f:
+                json.dump(sorted(self.records, key=lambda record: record['seconds'], reverse=True), f, indent=1)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        tr = terminalreporter
+        tr.write_sep("=", "import time per test module")
+        for record in sorted(self.records, key=lambda record: record['seconds'], reverse=True):
+            packages = ", ".join(record['packages'][:MAX_LISTED])
+            if len(record['packages']) > MAX_LISTED:
+                packages += f", +{len(record['packages']) - MAX_LISTED}"
+            tr.write_line(f"{record['seconds'] * 1000:9.1f}ms {record['modules']:5d} modules  {record['nodeid']}"
+                          + (f"  first imports: {packages}" if packages else ""))
+        total = sum(record['seconds'] for record in self.records)
+        tr.write_line(f"{total * 1000:9.1f}ms in total")
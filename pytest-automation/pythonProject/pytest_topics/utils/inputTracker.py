@@ -0,0 +1,67 @@
+"""
+Records the input files read while a piece of code runs, for test impact selection (see testImpact.py).
+
+    with recording() as inputs:
+        ...
+    inputs  # absolute paths of every file opened for reading
+
+Files opened with open() are seen through an audit hook. Code serving a file from a cache (the columnar csv cache,
+the config registry, the feature cache) calls record_input() itself, so a cache hit still counts as a read.
+Outside of recording() both cost a single check.
+
+The audit hook also notes the side effects making a run depend on more than its files (network, subprocesses), as
+"<event>" entries, e.g. "<socket.connect>".
+"""
+import os
+import sys
+from contextlib import contextmanager
+
+_active = None # the set being recorded into
+EFFECTS = ('socket.__new__', 'socket.bind', 'socket.connect', 'socket.sendto', 'subprocess.Popen', 'os.system', 'os.exec', 'os.posix_spawn')
+_hooked = False
+
+
+def tracking():
+    return _active is not None
+
+
+def record_input(*paths):
+    if _active is not None:
+        for path in paths:
+            _active.add(os.path.abspath(os.fspath(path)))
+
+
+def _audit(event, args):
+    if _active is None:
+        return
+    if event in EFFECTS:
+        _active.add(f"<{event}>")
+        return
+    if event != 'open':
+        return
+    try:
+        path, mode = args[0], args[1]
+        if isinstance(path, int) or path is None:
+            return # an already open file descriptor
+        if mode is None or 'r' in mode or '+' in mode: # os.open() has no mode
+            _active.add(os.path.abspath(os.fsdecode(path)))
+    except Exception:
+        pass # never break the open() itself
+
+
+@contextmanager
+def recording(inputs=None):
+    """Collect the paths read inside the block into `inputs` (a new set by default), nested blocks included."""
+    global _active, _hooked
+    if not _hooked:
+        sys.addaudithook(_audit) # audit hooks cannot be removed, it stays idle outside of recording()
+        _hooked = True
+    inputs = set() if inputs is None else inputs
+    outer = _active
+    _active = inputs
+    try:
+        yield inputs
+    finally:
+        _active = outer
+        if outer is not None:
+            outer.update(inputs)
@@ -1,34 +1,36 @@
-import configparser
 from pathlib import Path
 
+from pytest_topics.utils.configRegistry import env_name, get_config
+
 cfgFile = 'qa.ini'
 cfgFileDirectory = 'config'
 
-# Here, we initialise the configparser module, and will use the config variable to read the config file.
-config = configparser.ConfigParser()
-
-
 BASE_DIR = Path(__file__).resolve().parent.parent
 CONFIG_FILE = BASE_DIR.joinpath(cfgFileDirectory).joinpath(cfgFile)
+ENV = env_name(CONFIG_FILE)
 
-config.read(CONFIG_FILE)
+# Here, we take the parsed config file from the registry, looked up on every access so a reloaded file is seen.
+def __getattr__(name):
+    if name == 'config':
+        return get_config(ENV)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def getGmailUrl():
-    return config['gmail']['url']
+    return get_config(ENV)['gmail']['url']
 
 def getGmailUsr():
-    return config['gmail']['user']
+    return get_config(ENV)['gmail']['user']
 
 def getGmailPass():
-    return config['gmail']['pass']
+    return get_config(ENV)['gmail']['pass']
 
 def getOutlookUrl():
-    return config['outlook']['url']
+    return get_config(ENV)['outlook']['url']
 
 def getOutlookUsr():
-    return config['outlook']['user']
+    return get_config(ENV)['outlook']['user']
 
 def getOutlookPass():
-    return config['outlook']['pass']
+    return get_config(ENV)['outlook']['pass']
 
 
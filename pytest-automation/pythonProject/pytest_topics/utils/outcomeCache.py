@@ -0,0 +1,287 @@
+"""
+Outcome cache: with --outcome-cache a test that passed before is not run again while nothing it depends on changed,
+its pass is replayed instead.
+
+    pytest pytest_topics --outcome-cache            # replays the cached passes, runs the rest
+    pytest pytest_topics --outcome-cache-refresh    # runs everything again, and refreshes the cache
+
+The key of a test is a hash of:
+
+- the bytecode of the test function, and of the functions of the project it calls, followed through their globals,
+- for a test method, the bytecode of every method of its class (the helpers it calls through self. or cls.),
+- the bytecode of every fixture it uses, directly or through other fixtures,
+- the values of what that code reads besides its arguments: the plain data globals (numbers, strings and containers of
+  them), the command line options it asks pytestconfig.getoption() or config.option for (--cmdopt, --envs...), and
+  the environment variables it reads from os.environ or os.getenv(),
+- its parameter values,
+- the python and pytest versions.
+
+A pass is only kept when the test, and the setup of every fixture it uses, did not open a socket or start a process
+(see inputTracker.py). The files it read are kept with a signature, a changed file runs the test again. The entries live
+in pytest's cache (config.cache, in .pytest_cache) under pytest_topics/outcomes; with -p no:cacheprovider every test
+runs and nothing is kept.
+"""
+import hashlib
+import inspect
+import os
+import sys
+import types
+
+import pytest
+
+from pytest_topics.utils.inputTracker import recording
+from pytest_topics.utils.testImpact import file_signature, has_changed
+
+OUTCOMES_KEY = 'pytest_topics/outcomes'
+VERSION = 3
+PLAIN_TYPES = (type(None), bool, int, float, complex, str, bytes)
+NOT_AN_OPTION = object()
+
+
+def _hash_code(code, digest):
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _hash_code(const, digest)
+        else:
+            digest.update(repr(const).encode())
+
+
+def plain_repr(value, depth=0):
+    """repr of plain data (numbers, strings, and containers of them) that is the same in every process, else None."""
+    if isinstance(value, PLAIN_TYPES):
+        return repr(value)
+    if depth < 4 and isinstance(value, (tuple, list, set, frozenset, dict)):
+        parts = []
+        for item in value.items() if isinstance(value, dict) else ((item,) for item in value):
+            reprs = [plain_repr(part, depth + 1) for part in item]
+            if None in reprs:
+                return None
+            parts.append(':'.join(reprs))
+        if isinstance(value, (set, frozenset)):
+            parts.sort() # the order of a set of str changes with the hash seed of the process
+        return f"{type(value).__name__}({', '.join(parts)})"
+    return None
+
+
+def _names_and_strings(code):
+    """The names and the str constants of the code, nested functions and comprehensions included."""
+    names, strings = set(code.co_names), set()
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            nested_names, nested_strings = _names_and_strings(const)
+            names |= nested_names
+            strings |= nested_strings
+        elif isinstance(const, str):
+            strings.add(const)
+    return names, strings
+
+
+def hash_function(func, digest, root, seen=None, option=None):
+    """
+    Add the bytecode of func, and of the project functions it calls through its globals, to the digest, with the
+    values of the plain data globals, options and environment variables they read. option - the value of a command
+    line option by name, NOT_AN_OPTION for other names (pytestconfig.getoption with a default).
+    """
+    seen = set() if seen is None else seen
+    func = inspect.unwrap(func)
+    code = getattr(func, '__code__', None)
+    if code is None or code in seen:
+        return
+    seen.add(code)
+    _hash_code(code, digest)
+    names, strings = _names_and_strings(code)
+    if option is not None and ('getoption' in names or 'option' in names):
+        # getoption('cmdopt') names the option in a constant, config.option.cmdopt in an attribute
+        for name in sorted(strings | names):
+            value = option(name)
+            if value is not NOT_AN_OPTION:
+                digest.update(f"option {name}={plain_repr(value) or repr(value)}".encode())
+    if 'environ' in names or 'getenv' in names:
+        for name in sorted(strings):
+            if name in os.environ:
+                digest.update(f"env {name}={os.environ[name]}".encode())
+    module_globals = getattr(func, '__globals__', {})
+    for name in sorted(names):
+        if name not in module_globals:
+            continue
+        value = module_globals[name]
+        data = plain_repr(value)
+        if data is not None:
+            digest.update(f"global {name}={data}".encode())
+            continue
+        if isinstance(value, type):
+            hash_class(value, digest, root, seen, option)
+        elif inspect.isfunction(value) and value.__code__.co_filename.startswith(root):
+            hash_function(value, digest, root, seen, option)
+
+
+def hash_class(cls, digest, root, seen=None, option=None):
+    """Add every method of the project defined in the class or its bases, static and class methods included."""
+    seen = set() if seen is None else seen
+    for klass in cls.__mro__:
+        for candidate in vars(klass).values():
+            candidate = getattr(candidate, '__func__', candidate) # the function of a staticmethod or classmethod
+            if inspect.isfunction(candidate) and candidate.__code__.co_filename.startswith(root):
+                hash_function(candidate, digest, root, seen, option)
+
+
+class OutcomeCache:
+
+    def __init__(self, rootdir, cache=None, refresh=False):
+        self.root = os.path.abspath(rootdir)
+        self.cache = cache
+        self.refresh = refresh
+        self.entries = self._load() # key -> {nodeid, inputs: {path: signature}}
+        self.keys = {} # node id -> key of this run
+        self.passed = {} # node id -> the test passed and stayed pure so far in this run
+        self.read = {} # node id -> files read and side effects seen while it ran
+        self.replayed = set()
+        self.fixtures = {} # node id -> names of the fixtures it uses
+        self.config = None
+        self.impure_fixtures = set() # names of the fixtures with side effects in their setup
+        self._functions = {} # function or class -> digest of its code, fixtures are shared by many tests
+
+    def _load(self):
+        data = self.cache.get(OUTCOMES_KEY, None) if self.cache is not None else None
+        return data['entries'] if isinstance(data, dict) and data.get('version') == VERSION else {}
+
+    # Keys
+
+    def _function_digest(self, func):
+        digest = self._functions.get(func)
+        if digest is None:
+            h = hashlib.sha256()
+            if isinstance(func, type):
+                hash_class(func, h, self.root, option=self._option)
+            else:
+                hash_function(func, h, self.root, option=self._option)
+            digest = self._functions[func] = h.hexdigest()
+        return digest
+
+    def _option(self, name):
+        if self.config is None:
+            return NOT_AN_OPTION
+        return self.config.getoption(name, NOT_AN_OPTION)
+
+    def key(self, item):
+        h = hashlib.sha256()
+        h.update(f"{sys.version}|{sys.implementation.cache_tag}|{pytest.__version__}|{item.nodeid}".encode())
+        h.update(self._function_digest(item.function).encode())
+        if item.cls is not None:
+            h.update(self._function_digest(item.cls).encode())
+        info = item._fixtureinfo
+        for name in sorted(info.names_closure):
+            fixturedefs = info.name2fixturedefs.get(name)
+            if fixturedefs:
+                h.update(f"{name}={self._function_digest(fixturedefs[-1].func)}".encode())
+        callspec = getattr(item, 'callspec', None)
+        if callspec is not None:
+            h.update(repr(sorted(callspec.params.items())).encode())
+        return h.hexdigest()
+
+    def cached(self, item):
+        """The test passed before with the same key, and the files it read did not change."""
+        entry = self.entries.get(self.keys.get(item.nodeid))
+        if entry is None or entry['nodeid'] != item.nodeid:
+            return False
+        return not any(has_changed(path, signature) for path, signature in entry['inputs'].items())
+
+    # Hooks
+
+    def pytest_collection_modifyitems(self, config, items):
+        self.config = config
+        for item in items:
+            if isinstance(item, pytest.Function):
+                try:
+                    self.keys[item.nodeid] = self.key(item)
+                    self.fixtures[item.nodeid] = tuple(item._fixtureinfo.names_closure)
+                except Exception: # no key, the test simply runs
+                    pass
+
+    # A second implementation of pytest_runtest_protocol, pytest only looks at names starting with pytest_
+    @pytest.hookimpl(wrapper=True, specname='pytest_runtest_protocol')
+    def pytest_runtest_protocol_inputs(self, item, nextitem):
+        with recording(self.read.setdefault(item.nodeid, set())):
+            return (yield)
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        if self.refresh or not self.cached(item):
+            return None
+        # Replay the pass: the reports of a passing run, without setting anything up. The class and module fixtures of
+        # the previous tests that the next test does not need are still torn down, like after a real run.
+        self.replayed.add(item.nodeid)
+        item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+        for when in ('setup', 'call', 'teardown'):
+            outcome, longrepr = 'passed', None
+            if when == 'teardown':
+                try:
+                    item.session._setupstate.teardown_exact(nextitem)
+                except Exception as e:
+                    outcome, longrepr = 'failed', f"teardown of the previous tests' fixtures failed: {e!r}"
+            report = pytest.TestReport(item.nodeid, item.location, {}, outcome, longrepr, when,
+                                user_properties=[('outcome_cache', 'replayed')])
+            item.ihook.pytest_runtest_logreport(report=report)
+        item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+        return True
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        with recording() as seen:
+            result = yield
+        if any(path.startswith('<') for path in seen):
+            self.impure_fixtures.add(fixturedef.argname)
+        return result
+
+    def pytest_runtest_logreport(self, report):
+        if report.nodeid not in self.keys or report.nodeid in self.replayed:
+            return
+        ok = report.passed and not hasattr(report, 'wasxfail')
+        self.passed[report.nodeid] = self.passed.get(report.nodeid, True) and ok
+
+    # Saving
+
+    def save(self):
+        entries = dict(self.entries)
+        # A test keeps one entry, the one of its latest run
+        for key in [key for key, entry in entries.items() if entry['nodeid'] in self.passed]:
+            del entries[key]
+        signatures = {}
+        for nodeid, passed in self.passed.items():
+            read = self.read.get(nodeid, set())
+            if (not passed or any(path.startswith('<') for path in read)
+                    or self.impure_fixtures.intersection(self.fixtures.get(nodeid, ()))):
+                continue
+            inputs = {}
+            for path in sorted(read):
+                if path.startswith(self.root) and '__pycache__' not in path and not path.endswith('.pyc'):
+                    if path not in signatures:
+                        signatures[path] = file_signature(path)
+                    inputs[path] = signatures[path]
+            entries[self.keys[nodeid]] = dict(nodeid=nodeid, inputs=inputs)
+
+        self.cache.set(OUTCOMES_KEY, dict(version=VERSION, entries=entries))
+
+    # Worker processes of envMatrix.py
+
+    def worker_state(self):
+        return dict(read={nodeid: sorted(paths) for nodeid, paths in self.read.items()},
+                    replayed=sorted(self.replayed), impure_fixtures=sorted(self.impure_fixtures))
+
+    def merge_worker_state(self, state, items):
+        for nodeid, paths in state['read'].items():
+            self.read.setdefault(nodeid, set()).update(paths)
+        self.impure_fixtures.update(state['impure_fixtures'])
+        for nodeid in state['replayed']:
+            # The main process only saw the reports of the replay, not a run
+            self.replayed.add(nodeid)
+            self.passed.pop(nodeid, None)
+
+    def pytest_sessionfinish(self, session):
+        if self.passed and self.cache is not None:
+            self.save()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        terminalreporter.write_line(f"outcome cache: {len(self.replayed)} passes replayed, {len(self.passed)} tests run")
@@ -0,0 +1,167 @@
+"""
+Batch mode for Scenario Outlines made of pure computation steps.
+
+pytest-bdd turns every row of an Examples table into its own test, with its own fixture setup and teardown. In batch
+mode the Examples table is loaded as NumPy columns and every step runs once for the whole table:
+
+    steps = BatchSteps()
+
+    @steps.given("We have {count:d} fruits")
+    def have_fruits(state, count):       # count is the whole <initial> column
+        state["left"] = count
+
+    @steps.then("I should have {left:d} fruits")
+    def check_left(state, left):
+        return state["left"] == left     # then steps return one bool per row
+
+    test_eating_batch = batch_scenario(FEATURE_FILE, "Eating multiple fruits in sequence", steps)
+
+Every row is still reported on its own, passed or failed (as a subtest, with the same id pytest-bdd would give it).
+batch_scenario(..., report_passes=False) only reports the failing rows, for tables too big for a line per row.
+NumPy is imported when an outline runs, not when the test module is collected.
+"""
+import os
+import re
+
+import pytest
+from parse import compile as parse_compile
+from pytest_bdd.feature import get_feature
+
+from pytest_topics.utils.featureCache import feature_path
+from pytest_topics.utils.utils import convert
+
+_FIELD = re.compile(r'\{(\w+)(?::[^{}]*)?\}') # {count:d} -> the field name and its format
+_PARAM = re.compile(r'^<(\w+)>$') # a whole <param> of a templated step
+
+
+def as_column(values):
+    """Turn the str values of an Examples column into an int, float or str NumPy array."""
+    import numpy as np
+    converted = [convert(v) for v in values]
+    if all(isinstance(v, int) for v in converted):
+        return np.array(converted, dtype=np.int64)
+    if all(isinstance(v, (int, float)) for v in converted):
+        return np.array(converted, dtype=np.float64)
+    return np.array(values, dtype=object)
+
+
+class BatchSteps:
+    """Step definitions that can run on whole Examples columns, registered with the given / when / then decorators."""
+
+    def __init__(self):
+        self.steps = [] # (step_type, parser, func)
+
+    def step(self, step_type, pattern):
+        # The field formats are dropped: the templated step holds '<eat1>', not a number.
+        parser = parse_compile(_FIELD.sub(r'{\1}', pattern))
+
+        def decorator(func):
+            func.vectorized = True
+            self.steps.append((step_type, parser, func))
+            return func
+        return decorator
+
+    def given(self, pattern):
+        return self.step('given', pattern)
+
+    def when(self, pattern):
+        return self.step('when', pattern)
+
+    def then(self, pattern):
+        return self.step('then', pattern)
+
+    def find(self, step_type, text):
+        for other_type, parser, func in self.steps:
+            if other_type == step_type:
+                result = parser.parse(text)
+                if result is not None:
+                    return func, result.named
+        raise LookupError(f"No vectorized {step_type} step for {text!r}")
+
+
+class BatchResult:
+
+    def __init__(self, ids, columns):
+        self.ids = ids
+        self.columns = columns
+        import numpy as np
+        self.passed = np.ones(len(ids), dtype=bool)
+        self.failed_step = [None] * len(ids) # first failing step of each row
+
+    def fail(self, mask, step):
+        import numpy as np
+        newly_failed = np.flatnonzero(self.passed & ~mask)
+        for i in newly_failed:
+            self.failed_step[i] = step
+        self.passed &= mask
+
+    @property
+    def failures(self):
+        import numpy as np
+        return [(self.ids[i], self.failed_step[i]) for i in np.flatnonzero(~self.passed)]
+
+    def row(self, i):
+        return {name: column[i].item() if hasattr(column[i], 'item') else column[i] for name, column in self.columns.items()}
+
+    def report(self, subtests, report_passes=True):
+        """Report every row as its own subtest, or only the failing rows without report_passes."""
+        for i, row_id in enumerate(self.ids):
+            if self.passed[i] and not report_passes:
+                continue
+            with subtests.test(msg=row_id, **self.row(i)):
+                assert self.passed[i], f"Step '{self.failed_step[i]}' failed for example {self.row(i)}"
+
+
+def load_template(feature_file, scenario_name):
+    # Keyed like load_features() keys the files it parses, or a symlinked feature_dir would be parsed a second time.
+    feature_file = feature_path(feature_file)
+    feature = get_feature(os.path.dirname(feature_file), feature_file)
+    try:
+        return feature.scenarios[scenario_name]
+    except KeyError:
+        raise LookupError(f"Scenario {scenario_name!r} not found in {feature_file}") from None
+
+
+def run_outline(feature_file, scenario_name, steps):
+    """Run every row of the outline's Examples at once, returns a BatchResult."""
+    np = pytest.importorskip("numpy")
+    template = load_template(feature_file, scenario_name)
+    params = None
+    rows = []
+    for examples in template.examples:
+        if params is not None and examples.example_params != params:
+            raise ValueError(f"Every Examples table of {scenario_name!r} must have the same columns to run in batch")
+        params = examples.example_params
+        rows.extend(examples.examples)
+    if not rows:
+        raise ValueError(f"{scenario_name!r} has no Examples rows")
+
+    columns = {name: as_column([row[i] for row in rows]) for i, name in enumerate(params)}
+    result = BatchResult(["-".join(row) for row in rows], columns)
+
+    state = {}
+    for step in template.steps:
+        func, arguments = steps.find(step.type, step.name)
+        kwargs = {}
+        for name, value in arguments.items():
+            param = _PARAM.match(value)
+            if param:
+                kwargs[name] = columns[param.group(1)]
+            elif '<' in value:
+                raise ValueError(f"Step {step.name!r} mixes text and parameters in {{{name}}}, it cannot run in batch")
+            else:
+                kwargs[name] = convert(value) # the same value for every row
+        outcome = func(state, **kwargs)
+        if step.type == 'then' and outcome is not None:
+            result.fail(np.broadcast_to(np.asarray(outcome, dtype=bool), result.passed.shape), f"{step.keyword} {step.name}")
+    return result
+
+
+def batch_scenario(feature_file, scenario_name, steps, report_passes=True):
+    """Build a test function running the outline in batch mode, assign it to a test_... name in the test module."""
+
+    def test_batch(subtests):
+        run_outline(feature_file, scenario_name, steps).report(subtests, report_passes)
+
+    test_batch.__doc__ = f"Scenario Outline '{scenario_name}' in batch mode."
+    return test_batch
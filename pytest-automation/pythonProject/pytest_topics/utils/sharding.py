@@ -0,0 +1,148 @@
+"""
+Duration-aware sharding: split the tests into shards of about the same run time, from the durations of past runs.
+
+    pytest pytest_topics --shard 2/4     # on CI machine 2 of 4, runs its quarter of the estimated time
+    pytest pytest_topics --record-durations
+
+The duration of every test (setup + call + teardown) is kept in pytest's cache directory, in
+.pytest_cache/d/pytest_topics/durations.json, smoothed over the runs. Runs with --record-durations update it, like
+every worker of the local pool in bddScheduler.py, which builds its shards with the same lpt() function. --shard only
+reads it. Without the cache (-p no:cacheprovider) nothing is recorded and every test counts the same.
+
+Shards are built longest processing time first: the longest test goes to the least loaded shard, and so on. A test
+without history counts as the median known test. Inside a shard the tests keep the collection order, so module and
+class fixtures are still set up once. For --shard every machine must see the same durations file (e.g. .pytest_cache
+kept in a CI cache), or the machines would not agree on the split.
+"""
+import heapq
+import json
+import os
+import statistics
+from pathlib import Path
+
+import pytest
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+
+CACHE_DIR = 'pytest_topics' # .pytest_cache/d/pytest_topics
+DURATIONS_FILE = 'durations.json'
+SMOOTHING = 0.5 # weight of the newest run in the recorded duration
+DEFAULT_DURATION = 0.01 # seconds, for a test when nothing at all has history
+
+
+def parse_shard(text):
+    """'2/4' -> (2, 4), shards count from 1."""
+    try:
+        index, count = (int(part) for part in text.split('/'))
+    except ValueError:
+        raise ValueError(f"--shard takes i/N, e.g. 2/4, not {text!r}") from None
+    if not 1 <= index <= count:
+        raise ValueError(f"--shard {text}: i must be between 1 and N")
+    return index, count
+
+
+def cache_file(cache, name):
+    """The file `name` in pytest's cache directory (config.cache), None without the cache."""
+    return cache.mkdir(CACHE_DIR).joinpath(name) if cache is not None else None
+
+
+def load_durations(path):
+    if path is None:
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def read_durations(rootdir, name=DURATIONS_FILE):
+    """load_durations() outside of a pytest run (bddScheduler.py), from the cache directory of the rootdir."""
+    return load_durations(Path(rootdir).joinpath('.pytest_cache', 'd', CACHE_DIR, name))
+
+
+def save_durations(new, path):
+    """Merge the durations of this run into the file. Parallel workers merge one after the other."""
+    if path is None:
+        return
+    path = Path(path)
+    path.parent.mkdir(exist_ok=True)
+    with open(path.with_name(path.name + '.lock'), 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        durations = load_durations(path)
+        for nodeid, seconds in new.items():
+            old = durations.get(nodeid)
+            durations[nodeid] = round(seconds if old is None else old + SMOOTHING * (seconds - old), 6)
+        tmp_file = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump(durations, f, separators=(',', ':'))
+        os.replace(tmp_file, path)
+
+
+def estimate(node_ids, durations):
+    """{node id: expected seconds}, the median known duration for a test without history."""
+    known = [durations[nodeid] for nodeid in node_ids if nodeid in durations]
+    default = statistics.median(known) if known else DEFAULT_DURATION
+    return {nodeid: durations.get(nodeid, default) for nodeid in node_ids}
+
+
+def lpt(node_ids, shards, durations):
+    """Split node_ids into `shards` lists of about the same expected time. Returns (lists, expected seconds of each)."""
+    expected = estimate(node_ids, durations)
+    order = {nodeid: i for i, nodeid in enumerate(node_ids)}
+    heap = [(0.0, i) for i in range(shards)]
+    plans = [[] for _ in range(shards)]
+    # Longest first, ties in collection order so every machine computes the same split.
+    for nodeid in sorted(node_ids, key=lambda nodeid: (-expected[nodeid], order[nodeid])):
+        load, i = heapq.heappop(heap)
+        plans[i].append(nodeid)
+        heapq.heappush(heap, (load + expected[nodeid], i))
+    loads = [0.0] * shards
+    for load, i in heap:
+        loads[i] = load
+    return [sorted(plan, key=order.__getitem__) for plan in plans], loads
+
+
+class DurationRecorder:
+    """Records the duration of every test and merges them into the durations file at the end of the session."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.durations = {}
+
+    def pytest_runtest_logreport(self, report):
+        self.durations[report.nodeid] = self.durations.get(report.nodeid, 0.0) + report.duration
+
+    def pytest_sessionfinish(self, session):
+        if self.durations:
+            save_durations(self.durations, self.path)
+
+
+class ShardPlugin:
+    """Keeps only the tests of shard `index` of `count`."""
+
+    def __init__(self, index, count, path=None):
+        self.path = path
+        self.index = index
+        self.count = count
+        self.loads = None
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, config, items):
+        node_ids = [item.nodeid for item in items]
+        plans, self.loads = lpt(node_ids, self.count, load_durations(self.path))
+        mine = set(plans[self.index - 1])
+        deselected = [item for item in items if item.nodeid not in mine]
+        if deselected:
+            items[:] = [item for item in items if item.nodeid in mine]
+            config.hook.pytest_deselected(items=deselected)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.loads:
+            terminalreporter.write_line(
+                f"shard {self.index}/{self.count}: expected {self.loads[self.index - 1]:.2f}s, "
+                f"longest shard {max(self.loads):.2f}s, all shards {sum(self.loads):.2f}s")
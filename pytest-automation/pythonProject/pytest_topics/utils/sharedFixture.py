@@ -0,0 +1,234 @@
+"""
+Fixtures whose data is computed once per session and shared by every test.
+
+    @shared_fixture()
+    def setup_city():
+        return ['Singapore', 'Delhi', 'Chicago', 'Almaty']
+
+The fixture function runs on the first test that asks for it, later tests get the cached value:
+
+- mode="cow" (default): every test gets its own CowList / CowDict, real lists and dicts holding the cached data. The
+  lists and dicts nested in them are copied the same way, the other values are shared (immutable ones) or deep
+  copied. The first change a test makes warns with FixtureMutationWarning (warn=False does not warn): the test
+  only changed its own copy, but it relied on data other tests do not see.
+- mode="copy": every test gets its own deep copy, without warning.
+
+Immutable values (str, numbers, tuples, functions, ...) are shared as they are. A yield fixture also runs only once,
+its teardown runs at the end of the session.
+
+A shared fixture can only depend on session scoped, non parametrized fixtures (or other shared fixtures): the cached
+value would otherwise belong to the first test, module or parameter only. Such a dependency fails the test.
+"""
+import copy
+import functools
+import inspect
+import warnings
+
+import pytest
+
+IMMUTABLE = (str, bytes, int, float, complex, bool, type(None), tuple, frozenset, range, type)
+
+_cache_key = pytest.StashKey[dict]()
+
+
+class FixtureMutationWarning(UserWarning):
+    """A test changed the data of a shared fixture, only its own copy changed."""
+
+
+class _Writes:
+    """What the views of one test share: the fixture name, and whether the test changed the data yet."""
+
+    __slots__ = ('name', 'warn', 'written')
+
+    def __init__(self, name, warn):
+        self.name = name
+        self.warn = warn
+        self.written = False
+
+    def write(self):
+        if not self.written:
+            self.written = True
+            if self.warn:
+                warnings.warn(f"Test modified the shared data of fixture '{self.name}', only its own copy changed",
+                              FixtureMutationWarning, stacklevel=3)
+
+
+def _own(value, writes):
+    """A copy of value for one test: lists and dicts become views, down to the innermost ones."""
+    if type(value) in (list, CowList):
+        return CowList(value, writes)
+    if type(value) in (dict, CowDict):
+        return CowDict(value, writes)
+    if isinstance(value, IMMUTABLE) or callable(value):
+        return value
+    return copy.deepcopy(value)
+
+
+class CowList(list):
+    """A list of one test, copied from shared data. The first change warns."""
+
+    __slots__ = ('_writes',)
+
+    def __init__(self, data, writes):
+        super().__init__(_own(value, writes) for value in data)
+        self._writes = writes
+
+    # Every method below changes the data
+    def __setitem__(self, index, value):
+        self._writes.write()
+        super().__setitem__(index, value)
+
+    def __delitem__(self, index):
+        self._writes.write()
+        super().__delitem__(index)
+
+    def __iadd__(self, other):
+        self._writes.write()
+        return super().__iadd__(other)
+
+    def __imul__(self, n):
+        self._writes.write()
+        return super().__imul__(n)
+
+    def insert(self, index, value):
+        self._writes.write()
+        super().insert(index, value)
+
+    def append(self, value):
+        self._writes.write()
+        super().append(value)
+
+    def extend(self, values):
+        self._writes.write()
+        super().extend(values)
+
+    def pop(self, index=-1):
+        self._writes.write()
+        return super().pop(index)
+
+    def remove(self, value):
+        self._writes.write()
+        super().remove(value)
+
+    def clear(self):
+        self._writes.write()
+        super().clear()
+
+    def reverse(self):
+        self._writes.write()
+        super().reverse()
+
+    def sort(self, *args, **kwargs):
+        self._writes.write()
+        super().sort(*args, **kwargs)
+
+
+class CowDict(dict):
+    """A dict of one test, copied from shared data. The first change warns."""
+
+    __slots__ = ('_writes',)
+
+    def __init__(self, data, writes):
+        super().__init__((key, _own(value, writes)) for key, value in data.items())
+        self._writes = writes
+
+    # Every method below changes the data
+    def __setitem__(self, key, value):
+        self._writes.write()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._writes.write()
+        super().__delitem__(key)
+
+    def __ior__(self, other):
+        self._writes.write()
+        return super().__ior__(other)
+
+    def pop(self, *args):
+        self._writes.write()
+        return super().pop(*args)
+
+    def popitem(self):
+        self._writes.write()
+        return super().popitem()
+
+    def clear(self):
+        self._writes.write()
+        super().clear()
+
+    def update(self, *args, **kwargs):
+        self._writes.write()
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self._writes.write()
+        return super().setdefault(key, default)
+
+
+def make_view(value, name, mode='cow', warn=True):
+    if isinstance(value, IMMUTABLE) or callable(value):
+        return value
+    if mode == 'cow':
+        return _own(value, _Writes(name, warn))
+    return copy.deepcopy(value)
+
+
+def check_dependencies(request, name, dependencies):
+    """Fail when a dependency of the shared fixture can change between tests, its cached value would be wrong."""
+    fixtureinfo = request._pyfuncitem._fixtureinfo
+    for dependency in dependencies:
+        fixturedefs = fixtureinfo.name2fixturedefs.get(dependency)
+        if not fixturedefs or getattr(fixturedefs[-1].func, 'shared', False):
+            continue
+        fixturedef = fixturedefs[-1]
+        if fixturedef.scope != 'session' or fixturedef.params is not None:
+            kind = 'parametrized' if fixturedef.params is not None else f"{fixturedef.scope} scoped"
+            raise ValueError(f"Shared fixture {name!r} depends on {dependency!r}, a {kind} fixture. "
+                             f"Its value is computed once per session: make {dependency!r} session scoped, "
+                             f"without params, or use @pytest.fixture for {name!r}")
+
+
+def shared_fixture(fixture_function=None, *, mode='cow', warn=True, **fixture_kwargs):
+    """Like @pytest.fixture(), but the fixture function runs once per session (see the module docstring)."""
+    if mode not in ('cow', 'copy'):
+        raise ValueError(f"mode must be 'cow' or 'copy', got {mode!r}")
+    if 'params' in fixture_kwargs:
+        raise ValueError("shared_fixture does not support params, every parameter would need its own cache")
+
+    def decorator(func):
+        name = fixture_kwargs.get('name', func.__name__)
+        key = f"{func.__module__}.{func.__qualname__}"
+        signature = inspect.signature(func)
+        add_request = 'request' not in signature.parameters
+        parameters = list(signature.parameters.values())
+        if add_request:
+            parameters.append(inspect.Parameter('request', inspect.Parameter.KEYWORD_ONLY))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            request = kwargs.pop('request') if add_request else kwargs['request']
+            check_dependencies(request, name, [dependency for dependency in kwargs if dependency != 'request'])
+            cache = request.config.stash.setdefault(_cache_key, {})
+            if key not in cache:
+                if inspect.isgeneratorfunction(func):
+                    generator = func(*args, **kwargs)
+                    cache[key] = next(generator)
+
+                    def finish():
+                        cache.pop(key, None)
+                        next(generator, None)
+                    request.session.addfinalizer(finish)
+                else:
+                    cache[key] = func(*args, **kwargs)
+            return make_view(cache[key], name, mode, warn)
+
+        # pytest reads the fixtures to pass from the signature
+        wrapper.__signature__ = signature.replace(parameters=parameters)
+        wrapper.shared = True # already one value per session, whatever the scope (see fixtureGraph.py)
+        return pytest.fixture(**fixture_kwargs)(wrapper)
+
+    if fixture_function is not None:
+        return decorator(fixture_function)
+    return decorator
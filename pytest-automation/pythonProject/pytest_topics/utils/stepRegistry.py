@@ -0,0 +1,228 @@
+"""
+One index for every BDD step definition of the project.
+
+Use the given / when / then decorators from this module instead of the pytest_bdd ones:
+
+    from pytest_topics.utils.stepRegistry import given, when, then
+
+    @given(parsers.parse("We have {count:d} fruits"), target_fixture="start_fruits")
+
+The steps are still registered with pytest-bdd. On top of that, every pattern goes in a literal prefix trie, so a step
+line of a feature file is only tried against the patterns sharing its literal prefix, and the result is remembered for
+every step definition. Duplicate and ambiguous step definitions are reported when they are registered, checked
+against the few definitions that could clash (same text, same shape, literal steps sharing the prefix), not all of them.
+A module imported again (warmDaemon.py) registers its steps again under the same keys, without warnings.
+"""
+import bisect
+import re
+import warnings
+
+import pytest_bdd
+from pytest_bdd import parsers
+
+MEMO_SIZE = 10000 # step lines whose matching patterns are remembered
+
+_END = object() # trie key holding the patterns whose literal prefix ends at this node
+_PLACEHOLDER = re.compile(r'(?<!\{)\{[^{}]*\}(?!\})') # a {field} of a parse pattern, {{ and }} are escaped braces
+_REGEX_SPECIAL = set('.^$*+?{}[]\\|()')
+
+
+class AmbiguousStepWarning(UserWarning):
+    """Two step definitions of the same type can match the same step line."""
+
+
+def literal_prefix(parser):
+    """
+    The text every step line matched by the parser starts with, lower cased.
+
+    parse patterns ignore case by default, so the trie is built and walked on lower case text. A prefix shorter than
+    the real one is always safe, it only means more patterns are tried.
+    """
+    if isinstance(parser, parsers.string):
+        return parser.name.lower()
+    if isinstance(parser, parsers.parse): # cfparse is a parse subclass
+        return parser.name.split('{', 1)[0].replace('}}', '}').lower()
+    if isinstance(parser, parsers.re):
+        if '|' in parser.name:
+            return '' # an alternative may start with anything
+        prefix = []
+        for char in parser.name:
+            if char in _REGEX_SPECIAL:
+                # A quantifier after the last literal character makes that character optional.
+                if char in '*?{' and prefix:
+                    prefix.pop()
+                break
+            prefix.append(char)
+        return ''.join(prefix).lower()
+    return '' # unknown parser, always tried
+
+
+def pattern_shape(parser):
+    """The pattern with the field names and formats removed, 'We have {count:d} fruits' -> 'We have {} fruits'."""
+    if isinstance(parser, parsers.parse):
+        return _PLACEHOLDER.sub('{}', parser.name)
+    return parser.name
+
+
+class IndexedParser(parsers.StepParser):
+    """Step parser handed to pytest-bdd, its is_matching() is a set lookup in the registry."""
+
+    def __init__(self, registry, parser, key):
+        super().__init__(parser.name)
+        self.registry = registry
+        self.parser = parser
+        self.key = key
+
+    def parse_arguments(self, name):
+        return self.parser.parse_arguments(name)
+
+    def is_matching(self, name):
+        return self.key in self.registry.matching(name)
+
+    def __repr__(self):
+        return f"IndexedParser({self.parser.name!r})"
+
+
+class StepRegistry:
+
+    def __init__(self, strict=False):
+        self.strict = strict # raise ValueError instead of warning for duplicate or ambiguous steps
+        self.steps = [] # (step_type, parser, location) by key
+        self._literal = {} # complete step text -> keys, for plain string steps
+        self._literal_sorted = [] # (lower case text, key) of the plain string steps, sorted for prefix lookups
+        self._trie = {} # character -> child node, for every other pattern
+        self._by_name = {} # (parser class, pattern) -> keys
+        self._by_shape = {} # pattern_shape() -> keys
+        self._memo = {}
+
+    def _report(self, message):
+        if self.strict:
+            raise ValueError(message)
+        warnings.warn(message, AmbiguousStepWarning, stacklevel=5)
+
+    def _candidates(self, text):
+        """Keys of the non literal patterns whose literal prefix starts text."""
+        node = self._trie
+        keys = list(node.get(_END, ()))
+        for char in text.lower():
+            node = node.get(char)
+            if node is None:
+                break
+            keys.extend(node.get(_END, ()))
+        return keys
+
+    def _literals_starting_with(self, prefix):
+        i = bisect.bisect_left(self._literal_sorted, (prefix,))
+        while i < len(self._literal_sorted) and self._literal_sorted[i][0].startswith(prefix):
+            yield self._literal_sorted[i][1]
+            i += 1
+
+    def _clashing(self, parser):
+        """Keys of the registered patterns that may match the same step lines as the parser, in registration order."""
+        keys = set(self._by_name.get((type(parser), parser.name), ()))
+        keys.update(self._by_shape.get(pattern_shape(parser), ()))
+        if isinstance(parser, parsers.string):
+            keys.update(self._candidates(parser.name))
+        else:
+            keys.update(self._literals_starting_with(literal_prefix(parser)))
+        return sorted(keys)
+
+    def _check(self, step_type, parser, location):
+        for key in self._clashing(parser):
+            other_type, other, other_location = self.steps[key]
+            if step_type is not None and other_type is not None and other_type != step_type:
+                continue
+            if type(other) is type(parser) and other.name == parser.name:
+                self._report(f"Duplicate {step_type} step {parser.name!r} in {location}, already defined in {other_location}")
+                return
+            if pattern_shape(other) == pattern_shape(parser):
+                ambiguous = True
+            elif isinstance(parser, parsers.string):
+                ambiguous = other.is_matching(parser.name)
+            elif isinstance(other, parsers.string):
+                ambiguous = parser.is_matching(other.name)
+            else:
+                ambiguous = False
+            if ambiguous:
+                self._report(f"Ambiguous {step_type} step {parser.name!r} in {location}, "
+                             f"{other.name!r} from {other_location} matches the same steps")
+                return
+
+    def _registered(self, step_type, parser, location):
+        """The key of the same step of the same function, registered again when its module is imported again."""
+        if location is None:
+            return None
+        for key in self._by_name.get((type(parser), parser.name), ()):
+            if self.steps[key][0] == step_type and self.steps[key][2] == location:
+                return key
+        return None
+
+    def add(self, step_type, name, location=None):
+        """Index a step pattern and return the parser to give to pytest-bdd."""
+        parser = parsers.get_parser(name)
+        key = self._registered(step_type, parser, location)
+        if key is not None:
+            self.steps[key] = (step_type, parser, location)
+            self._memo.clear()
+            return IndexedParser(self, parser, key)
+        self._check(step_type, parser, location)
+
+        key = len(self.steps)
+        self.steps.append((step_type, parser, location))
+        self._by_name.setdefault((type(parser), parser.name), []).append(key)
+        self._by_shape.setdefault(pattern_shape(parser), []).append(key)
+        if isinstance(parser, parsers.string):
+            self._literal.setdefault(parser.name, []).append(key)
+            bisect.insort(self._literal_sorted, (parser.name.lower(), key))
+        else:
+            node = self._trie
+            for char in literal_prefix(parser):
+                node = node.setdefault(char, {})
+            node.setdefault(_END, []).append(key)
+        self._memo.clear()
+        return IndexedParser(self, parser, key)
+
+    def matching(self, text):
+        """Keys of every registered pattern matching the step line."""
+        keys = self._memo.get(text)
+        if keys is None:
+            keys = set(self._literal.get(text, ()))
+            keys.update(key for key in self._candidates(text) if self.steps[key][1].is_matching(text))
+            keys = frozenset(keys)
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[text] = keys
+        return keys
+
+    def match(self, text, step_type=None):
+        """Return [(parser, arguments)] for the patterns matching the step line."""
+        result = []
+        for key in sorted(self.matching(text)):
+            other_type, parser, _ = self.steps[key]
+            if step_type is None or other_type is None or other_type == step_type:
+                result.append((parser, parser.parse_arguments(text)))
+        return result
+
+    def step(self, name, step_type=None, converters=None, target_fixture=None, stacklevel=1):
+        def decorator(func):
+            location = f"{func.__module__}.{func.__qualname__}"
+            parser = self.add(step_type, name, location)
+            # One frame more than a direct pytest_bdd call: this decorator.
+            return pytest_bdd.step(parser, step_type, converters=converters, target_fixture=target_fixture,
+                                   stacklevel=stacklevel + 1)(func)
+        return decorator
+
+
+registry = StepRegistry()
+
+
+def given(name, converters=None, target_fixture=None, stacklevel=1):
+    return registry.step(name, 'given', converters, target_fixture, stacklevel)
+
+
+def when(name, converters=None, target_fixture=None, stacklevel=1):
+    return registry.step(name, 'when', converters, target_fixture, stacklevel)
+
+
+def then(name, converters=None, target_fixture=None, stacklevel=1):
+    return registry.step(name, 'then', converters, target_fixture, stacklevel)
@@ -0,0 +1,240 @@
+"""
+Streaming test report with bounded memory, for runs with a very large number of (parametrized) tests.
+
+    pytest pytest_topics --stream-report results.ndjson.gz --stream-output-limit 2000
+
+- Every test is written as one json line when it finishes: node id, outcome, duration, the failure text for failed
+  tests, and its captured output. Paths ending with .gz are gzip compressed.
+- Captured output longer than --stream-output-limit characters is cut in the report; the whole text goes to the spill
+  file next to the report (results.ndjson.gz.output), and the line gives its [offset, length] in bytes there.
+- Only the counts and the failures stay in memory. The terminal keeps working as usual, but forgets the reports of
+  the passed tests once they are counted, and keeps at most --stream-output-limit characters of any captured output.
+  With --durations=N the node id, phase and duration of the N slowest forgotten reports are kept for its summary.
+- The last line holds the counts of the whole run: {"summary": {...}, "duration": ...}.
+
+conftest.py registers StreamReport when --stream-report is given.
+"""
+import gzip
+import heapq
+import itertools
+import json
+import os
+import time
+
+import pytest
+
+DEFAULT_OUTPUT_LIMIT = 4000 # characters of captured output kept per test
+MAX_FAILURES = 1000 # failures kept in memory for the terminal summary, the report has all of them
+FLUSH_EVERY = 1000 # lines
+RANK = dict(passed=0, skipped=1, xfailed=1, xpassed=1, failed=2, error=2)
+
+
+def outcome_of(report):
+    """The outcome of a test from one of its reports, None for the passed setup and teardown."""
+    if report.when == 'call':
+        if hasattr(report, 'wasxfail'):
+            return 'xfailed' if report.skipped else 'xpassed'
+        return report.outcome
+    if report.failed:
+        return 'error'
+    if report.skipped:
+        return 'skipped'
+    return None
+
+
+class _Counted:
+    """Stands in for a passed report the terminal has counted: one shared object instead of a report per test."""
+    count_towards_summary = True
+    when = 'call'
+    sections = ()
+
+
+COUNTED = _Counted()
+
+
+class _Timed:
+    """What the --durations summary reads of a forgotten report."""
+    __slots__ = ('nodeid', 'when', 'duration')
+
+    def __init__(self, report):
+        self.nodeid = report.nodeid
+        self.when = report.when
+        self.duration = report.duration
+
+
+class StreamReport:
+
+    def __init__(self, path, output_limit=DEFAULT_OUTPUT_LIMIT):
+        self.path = path
+        self.output_limit = output_limit
+        self.counts = {}
+        self.failures = []
+        self.failed_nodeids = set() # to keep their teardown reports for the terminal's failure summary
+        self.slowest = [] # (duration, order, _Timed) of the forgotten reports, a heap of the slowest with --durations=N
+        self._order = itertools.count()
+        self._file = None
+        self._spill = None
+        self._spill_offset = 0
+        self._lines = 0
+        self._current = None
+        self._pid = os.getpid()
+        self._start = time.time()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # Files
+
+    def _open(self):
+        if self.path.endswith('.gz'):
+            return gzip.open(self.path, 'wt', compresslevel=6)
+        return open(self.path, 'w')
+
+    def _write(self, record, flush=False):
+        if os.getpid() != self._pid:
+            return # a forked worker process (envMatrix), its reports are written by the main process
+        if self._file is None:
+            self._file = self._open()
+        self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._lines += 1
+        if flush or self._lines % FLUSH_EVERY == 0:
+            self._file.flush()
+
+    def spill(self, text):
+        """Append text to the spill file, returns its [offset, length] in bytes."""
+        if self._spill is None:
+            self._spill = open(self.path + '.output', 'wb')
+        data = text.encode('utf-8', 'replace')
+        self._spill.write(data)
+        location = [self._spill_offset, len(data)]
+        self._spill_offset += len(data)
+        return location
+
+    def cut(self, text):
+        if len(text) <= self.output_limit:
+            return text
+        return text[:self.output_limit] + f"\n... {len(text) - self.output_limit} more characters"
+
+    # Reports
+
+    def _record(self, report):
+        record = self._current
+        if record is None or record['nodeid'] != report.nodeid:
+            record = self._current = dict(nodeid=report.nodeid, outcome='passed', duration=0.0)
+        record['duration'] += report.duration
+        outcome = outcome_of(report)
+        # a failed setup or teardown outweighs the call
+        if outcome is not None and RANK[outcome] > RANK[record['outcome']]:
+            record['outcome'] = outcome
+            if report.when != 'call':
+                record['when'] = report.when
+        if report.failed:
+            record['longrepr'] = self.cut(str(report.longrepr))
+        # every report carries the sections of the phases before it too
+        for name, content in report.sections:
+            if name.startswith('Captured'):
+                record.setdefault('output', {})[name] = content
+
+    def _finish(self, record):
+        output = record.get('output')
+        if output:
+            text = ''.join(output.values())
+            if len(text) > self.output_limit:
+                record['spill'] = self.spill(''.join(f"{name}\n{content}" for name, content in output.items()))
+                record['output'] = {name: self.cut(content) for name, content in output.items()}
+        outcome = record['outcome']
+        record['duration'] = round(record['duration'], 6)
+        self.counts[outcome] = self.counts.get(outcome, 0) + 1
+        failed = outcome in ('failed', 'error')
+        if failed and len(self.failures) < MAX_FAILURES:
+            lines = record.get('longrepr', '').strip().splitlines()
+            self.failures.append((record['nodeid'], lines[-1] if lines else ''))
+        self._write(record, flush=failed)
+
+    def _trim(self, report):
+        # The terminal keeps the failed reports to print them at the end: no more captured output than the report.
+        report.sections = [(name, self.cut(content)) for name, content in report.sections]
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_logreport(self, report):
+        self._record(report)
+        self._trim(report)
+        if report.failed:
+            self.failed_nodeids.add(report.nodeid)
+        try:
+            return (yield)
+        finally:
+            self._forget(report)
+
+    def _forget(self, report):
+        """Drop the report from the terminal once it is counted, unless a summary at the end needs it."""
+        tr = getattr(self, '_terminal', None)
+        if tr is None or report.failed:
+            return
+        # -rp lists the passed tests and -rP prints their output, both from the reports
+        keep_passed = tr.hasopt('p') or tr.hasopt('P')
+        if report.when == 'call' and report.passed and not hasattr(report, 'wasxfail') and not keep_passed:
+            reports = tr.stats.get('passed')
+            if reports and reports[-1] is report:
+                reports[-1] = COUNTED
+                self._time(report, tr.config.option.durations)
+        elif report.when != 'call' and report.passed and report.nodeid not in self.failed_nodeids:
+            reports = tr.stats.get('')
+            if reports and reports[-1] is report:
+                reports.pop()
+                self._time(report, tr.config.option.durations)
+
+    def _time(self, report, durations):
+        """Keep the duration of a forgotten report for --durations, only the slowest ones with --durations=N."""
+        if durations is None:
+            return
+        entry = (report.duration, next(self._order), _Timed(report))
+        if not durations: # --durations=0 lists them all
+            self.slowest.append(entry)
+        elif len(self.slowest) < durations:
+            heapq.heappush(self.slowest, entry)
+        else:
+            heapq.heappushpop(self.slowest, entry)
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        try:
+            return (yield)
+        finally:
+            # pytest keeps the captured output on the item too, for the whole session
+            item._report_sections.clear()
+
+    def pytest_runtest_logfinish(self, nodeid):
+        if self._current is not None and self._current['nodeid'] == nodeid:
+            self._finish(self._current)
+            self._current = None
+        self.failed_nodeids.discard(nodeid)
+
+    def pytest_collectreport(self, report):
+        if report.failed:
+            self._finish(dict(nodeid=report.nodeid, outcome='error', when='collect', duration=0.0,
+                              longrepr=self.cut(str(report.longrepr))))
+
+    # Session
+
+    def pytest_sessionstart(self, session):
+        self._terminal = session.config.pluginmanager.get_plugin('terminalreporter')
+
+    def pytest_sessionfinish(self, session):
+        if os.getpid() != self._pid:
+            return
+        self._write(dict(summary=self.counts, duration=round(time.time() - self._start, 3)))
+        self._file.close()
+        if self._spill is not None:
+            self._spill.close()
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_terminal_summary(self, terminalreporter):
+        tr = terminalreporter
+        # Before pytest's --durations summary reads the reports, under the key of setup and teardown that no count uses
+        tr.stats.setdefault('', []).extend(timed for _, _, timed in self.slowest)
+        self.slowest = []
+        counts = ", ".join(f"{count} {outcome}" for outcome, count in sorted(self.counts.items()))
+        tr.write_line(f"stream report: {self.path} ({counts or 'no tests'})")
+        if len(self.failures) == MAX_FAILURES:
+            tr.write_line(f"stream report: only the first {MAX_FAILURES} failures are kept in memory, all are in the report")
@@ -0,0 +1,248 @@
+"""
+Test impact selection: with --impact only the tests whose inputs changed since their last run are run.
+
+The inputs of a test are:
+
+- the files it reads (config/*.ini, config/data.csv, *.prop, feature_dir/*.feature, ...), recorded by inputTracker
+  while it runs, and while its module and the directories above it are collected (conftest.py, scenarios()).
+  A module's tests share their reads: a cache filled by one test is read by the others too.
+- the source files of its test module, the conftest.py files above it, and every module of the project the test
+  module uses, directly or through other project modules.
+
+The map test -> inputs is kept in pytest's cache (config.cache, in .pytest_cache) under pytest_topics/testimpact, with
+a signature of every input. Without the cache (-p no:cacheprovider) every test runs and nothing is kept.
+A test runs again when one of its inputs changed, when it is new, or when it did not pass last time. A test that
+opened a socket or started a process ("<socket.connect>", ... see inputTracker.py), itself or in one of its fixtures,
+depends on more than its files and always runs. These side effects are not shared with the rest of the module.
+The tests removed from a collected file, or whose file was deleted, are dropped from the map.
+"""
+import hashlib
+import os
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+from pytest_topics.utils.inputTracker import recording
+
+IMPACT_KEY = 'pytest_topics/testimpact'
+VERSION = 2 # 1 dropped the side effects of the tests
+
+
+def file_signature(path):
+    """[mtime_ns, size, sha256] of the file, None if it does not exist."""
+    try:
+        stat = os.stat(path)
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size, digest]
+
+
+def _same_stat(path, signature):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return signature is None
+    return signature is not None and [stat.st_mtime_ns, stat.st_size] == signature[:2]
+
+
+def has_changed(path, signature):
+    if signature is None:
+        return os.path.exists(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return True
+    if [stat.st_mtime_ns, stat.st_size] == signature[:2]:
+        return False
+    current = file_signature(path)
+    return current is None or current[2] != signature[2]
+
+
+def code_files(module, root):
+    """Source files of the module and of every module under root it uses, followed through their globals."""
+    root = str(root)
+    seen = set()
+    files = set()
+    todo = [module]
+    while todo:
+        module = todo.pop()
+        if module is None or module.__name__ in seen:
+            continue
+        seen.add(module.__name__)
+        filename = getattr(module, '__file__', None)
+        if not filename or not os.path.abspath(filename).startswith(root) or 'site-packages' in filename:
+            continue
+        files.add(os.path.abspath(filename))
+        for value in list(vars(module).values()):
+            if isinstance(value, types.ModuleType):
+                todo.append(value)
+            else:
+                name = getattr(value, '__module__', None)
+                if isinstance(name, str):
+                    todo.append(sys.modules.get(name))
+    return files
+
+
+class TestImpact:
+
+    def __init__(self, rootdir, cache=None, select=True):
+        self.root = os.path.abspath(rootdir)
+        self.cache = cache
+        self.select = select
+        self.previous = self._load()
+        self.collected = {} # collector node id -> files read while collecting it
+        self.children = {} # collector node id -> node ids of what it collected
+        self.read = {} # test node id -> files read while it ran
+        self.fixture_effects = {} # fixture name -> side effects of its setup, shared by every test using it
+        self.outcomes = {}
+        self.ran = []
+        self.deselected = 0
+        self.changed = set()
+
+    def _load(self):
+        data = self.cache.get(IMPACT_KEY, None) if self.cache is not None else None
+        return data if isinstance(data, dict) and data.get('version') == VERSION else dict(files={}, tests={})
+
+    def _keep(self, path):
+        if path.startswith('<'):
+            return True # a side effect, not a file
+        return path.startswith(self.root) and '__pycache__' not in path and not path.endswith('.pyc')
+
+    def _exists(self, nodeid):
+        """False for a test whose file is gone, or that a collector of this session did not find any more."""
+        parts = nodeid.split('::')
+        if not os.path.exists(os.path.join(self.root, parts[0])):
+            return False
+        for i in range(1, len(parts)):
+            children = self.children.get('::'.join(parts[:i]))
+            if children is not None and '::'.join(parts[:i + 1]) not in children:
+                return False
+        return True
+
+    # Recording
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_make_collect_report(self, collector):
+        with recording(self.collected.setdefault(collector.nodeid, set())):
+            report = yield
+        if report.passed:
+            self.children[collector.nodeid] = {node.nodeid for node in report.result}
+        return report
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        self.ran.append(item)
+        with recording(self.read.setdefault(item.nodeid, set())):
+            return (yield)
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        # A session fixture starting a server is set up once, the tests using it later must still count its effects
+        with recording() as seen:
+            result = yield
+        effects = {path for path in seen if path.startswith('<')}
+        if effects:
+            self.fixture_effects.setdefault(fixturedef.argname, set()).update(effects)
+        return result
+
+    def pytest_runtest_logreport(self, report):
+        if report.failed: # skipped and xfailed tests do not need another run
+            self.outcomes[report.nodeid] = 'failed'
+        else:
+            self.outcomes.setdefault(report.nodeid, 'passed')
+
+    # Selection
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, session, config, items):
+        if not self.select or not self.previous['tests']:
+            return
+        files = self.previous['files']
+        changed = {}
+        selected = []
+        deselected = []
+        for item in items:
+            entry = self.previous['tests'].get(item.nodeid)
+            if (entry is None or entry['outcome'] != 'passed'
+                    or any(path.startswith('<') for path in entry['inputs'])):
+                selected.append(item)
+                continue
+            for path in entry['inputs']:
+                if path not in changed:
+                    changed[path] = has_changed(path, files.get(path))
+                if changed[path]:
+                    selected.append(item)
+                    break
+            else:
+                deselected.append(item)
+        self.changed = {path for path, is_changed in changed.items() if is_changed}
+        if deselected:
+            items[:] = selected
+            config.hook.pytest_deselected(items=deselected)
+            self.deselected = len(deselected)
+
+    # Saving
+
+    def inputs_of(self, item, module_reads):
+        inputs = set(self.read.get(item.nodeid, ()))
+        for name in getattr(item, 'fixturenames', ()):
+            inputs |= self.fixture_effects.get(name, set())
+        shared = set(module_reads.get(str(item.path), ()))
+        for node in item.listchain():
+            shared |= self.collected.get(node.nodeid, set())
+        inputs |= {path for path in shared if not path.startswith('<')}
+        module = getattr(item, 'module', None)
+        if module is not None:
+            inputs |= code_files(module, self.root)
+        # conftest.py files apply to everything below their directory
+        directory = Path(item.path).parent
+        while str(directory).startswith(self.root):
+            conftest = directory.joinpath('conftest.py')
+            if conftest.exists():
+                inputs.add(str(conftest))
+            directory = directory.parent
+        return sorted(path for path in inputs if self._keep(path))
+
+    def save(self):
+        module_reads = {}
+        for item in self.ran:
+            module_reads.setdefault(str(item.path), set()).update(self.read.get(item.nodeid, ()))
+
+        tests = {nodeid: entry for nodeid, entry in self.previous['tests'].items() if self._exists(nodeid)}
+        for item in self.ran:
+            tests[item.nodeid] = dict(inputs=self.inputs_of(item, module_reads),
+                                      outcome=self.outcomes.get(item.nodeid, 'failed'))
+        needed = {path for entry in tests.values() for path in entry['inputs'] if not path.startswith('<')}
+        old_files = self.previous['files']
+        files = {path: old_files[path] if _same_stat(path, old_files.get(path)) else file_signature(path)
+                 for path in needed}
+
+        self.cache.set(IMPACT_KEY, dict(version=VERSION, files=files, tests=tests))
+
+    # Worker processes of envMatrix.py
+
+    def worker_state(self):
+        return dict(ran=[item.nodeid for item in self.ran],
+                    read={item.nodeid: sorted(self.read.get(item.nodeid, ())) for item in self.ran},
+                    fixture_effects={name: sorted(effects) for name, effects in self.fixture_effects.items()})
+
+    def merge_worker_state(self, state, items):
+        self.ran.extend(items[nodeid] for nodeid in state['ran'])
+        for nodeid, paths in state['read'].items():
+            self.read.setdefault(nodeid, set()).update(paths)
+        for name, effects in state['fixture_effects'].items():
+            self.fixture_effects.setdefault(name, set()).update(effects)
+
+    def pytest_sessionfinish(self, session):
+        if self.ran and self.cache is not None:
+            self.save()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.select:
+            changed = ", ".join(sorted(os.path.relpath(path, self.root) for path in self.changed)[:5])
+            terminalreporter.write_line(f"test impact: {self.deselected} tests deselected, their inputs did not change"
+                                        + (f"; changed: {changed}" if changed else ""))
@@ -0,0 +1,205 @@
+"""
+Timing of a test session: collection, every fixture setup and teardown, and every test call.
+
+Enabled by --timing-report PATH and / or --timing-slowest N (options added in conftest.py):
+
+- each record holds the wall clock and CPU time (seconds) and the peak memory growth (KiB) of one step.
+- --timing-report writes all records, plus the totals of every fixture, as JSON (.json) or CSV (.csv).
+- --timing-slowest N prints the N slowest steps and fixtures at the end of the run (nothing is printed without it).
+
+Memory is the growth of the process' maximum RSS by default, which is free to read but only moves when the process
+reaches a new high. --timing-memory uses tracemalloc instead: the peak of Python allocations in the step, precise but
+the whole run gets slower.
+"""
+import csv
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import pytest
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+FIELDS = ('kind', 'nodeid', 'name', 'scope', 'wall', 'cpu', 'mem_kb')
+
+
+class Timer:
+    """Wall clock, CPU time and peak memory growth between start() and stop()."""
+
+    __slots__ = ('trace_memory', 'wall', 'cpu', 'mem', 'peak')
+
+    # Timers measuring memory with tracemalloc, started and not stopped yet. Steps nest (a fixture setup inside the
+    # collection, ...) but tracemalloc has a single peak: before a timer resets it, the running ones take the peak so far.
+    _running = []
+
+    def __init__(self, trace_memory):
+        self.trace_memory = trace_memory
+        self.start()
+
+    def _memory(self):
+        if self.trace_memory:
+            return tracemalloc.get_traced_memory()[0]
+        if resource is not None:
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform != 'darwin' else 1 / 1024)
+        return 0
+
+    @classmethod
+    def _take_peak(cls):
+        peak = tracemalloc.get_traced_memory()[1]
+        for timer in cls._running:
+            timer.peak = max(timer.peak, peak)
+
+    def start(self):
+        if self.trace_memory:
+            self._take_peak()
+            tracemalloc.reset_peak()
+            self._running.append(self)
+        self.mem = self.peak = self._memory()
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+
+    def stop(self):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        if self.trace_memory:
+            self._take_peak()
+            if self in self._running:
+                self._running.remove(self)
+            mem = (self.peak - self.mem) / 1024
+        else:
+            mem = self._memory() - self.mem # ru_maxrss is in KiB on Linux
+        return wall, cpu, max(mem, 0)
+
+
+class TimingPlugin:
+
+    def __init__(self, report=None, slowest=0, trace_memory=False):
+        self.report = report
+        self.slowest = slowest
+        self.trace_memory = trace_memory
+        self.records = []
+        self._teardowns = {} # (fixturedef, node id) -> Timer of a running teardown
+
+    def _add(self, kind, nodeid, name, scope, timer):
+        wall, cpu, mem = timer.stop()
+        self.records.append(dict(kind=kind, nodeid=nodeid, name=name, scope=scope,
+                                 wall=round(wall, 6), cpu=round(cpu, 6), mem_kb=round(mem, 1)))
+
+    def pytest_configure(self, config):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def pytest_unconfigure(self, config):
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    # Collection
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_collection(self, session):
+        timer = Timer(self.trace_memory)
+        try:
+            return (yield)
+        finally:
+            self._add('collection', '', 'session', 'session', timer)
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_make_collect_report(self, collector):
+        timer = Timer(self.trace_memory)
+        try:
+            return (yield)
+        finally:
+            self._add('collect', collector.nodeid, type(collector).__name__, '', timer)
+
+    # Fixtures
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        timer = Timer(self.trace_memory)
+        try:
+            return (yield)
+        finally:
+            self._add('fixture_setup', request.node.nodeid, fixturedef.argname, fixturedef.scope, timer)
+            # Finalizers run last in first out: this one runs before the fixture's own teardown,
+            # pytest_fixture_post_finalizer after it.
+            key = (id(fixturedef), request.node.nodeid)
+            fixturedef.addfinalizer(lambda: self._teardowns.__setitem__(key, Timer(self.trace_memory)))
+
+    def pytest_fixture_post_finalizer(self, fixturedef, request):
+        timer = self._teardowns.pop((id(fixturedef), request.node.nodeid), None)
+        if timer is not None:
+            self._add('fixture_teardown', request.node.nodeid, fixturedef.argname, fixturedef.scope, timer)
+
+    # Tests
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_call(self, item):
+        timer = Timer(self.trace_memory)
+        try:
+            return (yield)
+        finally:
+            self._add('call', item.nodeid, item.name, 'function', timer)
+
+    # Reports
+
+    def fixture_totals(self):
+        """Time spent in every fixture, setup and teardown of all its instances together."""
+        totals = {}
+        for record in self.records:
+            if record['kind'] in ('fixture_setup', 'fixture_teardown'):
+                total = totals.setdefault(record['name'], dict(name=record['name'], scope=record['scope'],
+                                                                setups=0, wall=0.0, cpu=0.0))
+                total['setups'] += record['kind'] == 'fixture_setup'
+                total['wall'] += record['wall']
+                total['cpu'] += record['cpu']
+        for total in totals.values():
+            total['wall'] = round(total['wall'], 6)
+            total['cpu'] = round(total['cpu'], 6)
+        return sorted(totals.values(), key=lambda total: total['wall'], reverse=True)
+
+    def write_report(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                writer.writeheader()
+                writer.writerows(self.records)
+        else:
+            with open(path, 'w') as f:
+                json.dump(dict(memory='tracemalloc' if self.trace_memory else 'maxrss',
+                               records=self.records, fixtures=self.fixture_totals()), f, separators=(',', ':'))
+
+    # Worker processes of envMatrix.py
+
+    def worker_state(self):
+        return self.records
+
+    def merge_worker_state(self, state, items):
+        self.records.extend(state)
+
+    def pytest_sessionfinish(self, session):
+        if self.report:
+            self.write_report(self.report)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.slowest:
+            return
+        tr = terminalreporter
+        tr.write_sep("=", f"slowest {self.slowest} steps")
+        steps = sorted(self.records, key=lambda record: record['wall'], reverse=True)[:self.slowest]
+        for record in steps:
+            tr.write_line(f"{record['wall']:9.4f}s wall {record['cpu']:9.4f}s cpu {record['mem_kb']:9.1f}KiB  "
+                          f"{record['kind']:<16} {record['name']} {record['nodeid']}")
+        tr.write_sep("-", f"slowest {self.slowest} fixtures")
+        for total in self.fixture_totals()[:self.slowest]:
+            tr.write_line(f"{total['wall']:9.4f}s wall {total['cpu']:9.4f}s cpu {total['setups']:6d}x  "
+                          f"{total['name']} ({total['scope']})")
+        if self.report:
+            tr.write_line(f"timing report: {self.report}")
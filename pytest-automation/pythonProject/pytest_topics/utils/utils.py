@@ -1,4 +1,5 @@
 import csv
+from itertools import islice
 from pathlib import Path
 
 dataFile = "data.csv"
@@ -7,12 +8,141 @@ cfgFileDir = 'config'
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_FILE = BASE_DIR.joinpath(cfgFileDir).joinpath(dataFile)
 
-def get_data():
-    with open(DATA_FILE,'r+') as f:
+CHUNK_SIZE = 10000 # rows handed out per chunk by iter_chunks() and row_offsets()
+
+
+def convert(value):
+    """Convert a csv field to int or float where possible, otherwise keep it as str."""
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def get_header(data_file=DATA_FILE):
+    """Return the column names from the first row of the csv file."""
+    with open(data_file, newline='') as f:
+        header = next(csv.reader(f), None)
+    if not header:
+        raise ValueError(f"{data_file} has no header row")
+    return header
+
+
+def _records(f):
+    """
+    Yield (byte offset, raw bytes) of the csv records of a file opened in binary mode, without parsing the fields.
+    A quoted field may hold line breaks: a record only ends on a line break after an even number of quotes.
+    """
+    offset = f.tell()
+    record = b''
+    for line in f:
+        record = record + line if record else line
+        if record.count(b'"') % 2 == 0:
+            yield offset, record
+            offset += len(record)
+            record = b''
+    if record:
+        yield offset, record
+
+
+def _data_records(f):
+    """The records after the header, without the empty lines csv.reader skips too."""
+    records = _records(f)
+    next(records, None)
+    return (item for item in records if item[1].rstrip(b'\r\n'))
+
+
+def count_rows(data_file=DATA_FILE):
+    """Count the data rows (header excluded) without parsing them as csv."""
+    with open(data_file, 'rb') as f:
+        return sum(1 for _ in _data_records(f))
+
+
+def row_offsets(chunk_size=CHUNK_SIZE, data_file=DATA_FILE):
+    """
+    Return the byte offset of every chunk_size-th data row, read in one pass over the file.
+    iter_data(offset=o, stop=chunk_size) then reads a chunk without reading the rows before it.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive number")
+    with open(data_file, 'rb') as f:
+        return [offset for i, (offset, _) in enumerate(_data_records(f)) if i % chunk_size == 0]
+
+
+def iter_data(data_file=DATA_FILE, columns=None, start=0, stop=None, typed=True, offset=None):
+    """
+    Lazily yield the rows of the csv file one at a time, so only a single row is held in memory.
+
+    columns - header names to keep, in the order given. None keeps every column.
+    start, stop - row range to read, counted from the first row after the header.
+    typed - convert numeric fields to int / float.
+    offset - byte offset of a data row from row_offsets(), the reading starts there and start, stop count from it.
+    """
+    with open(data_file, newline='') as f:
         reader = csv.reader(f)
-        next(reader) # Skips the first row, as it has the header
-        data = [tuple(row) for row in reader]
+        header = next(reader) # The first row has the header
+        if offset is not None:
+            f.seek(offset)
+        if columns is None:
+            index = list(range(len(header)))
+        else:
+            missing = [c for c in columns if c not in header]
+            if missing:
+                raise ValueError(f"Unknown column(s) {missing}, available columns are {header}")
+            index = [header.index(c) for c in columns]
+
+        width = len(header)
+        for row in islice((row for row in reader if row), start, stop):
+            if len(row) != width:
+                raise ValueError(f"{data_file}, line {reader.line_num}: {len(row)} fields, the header has {width}")
+            if typed:
+                yield tuple(convert(row[i]) for i in index)
+            else:
+                yield tuple(row[i] for i in index)
+
+
+def iter_chunks(chunk_size=CHUNK_SIZE, **kwargs):
+    """Yield the rows from iter_data() as lists of at most chunk_size rows."""
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive number")
+    rows = iter_data(**kwargs)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def shard_range(shard, shards, data_file=DATA_FILE):
+    """Return the (start, stop) row range owned by shard number `shard` out of `shards`."""
+    if not 0 <= shard < shards:
+        raise ValueError(f"shard must be between 0 and {shards - 1}, got {shard}")
+    total = count_rows(data_file)
+    size, extra = divmod(total, shards)
+    start = shard * size + min(shard, extra)
+    stop = start + size + (1 if shard < extra else 0)
+    return start, stop
+
+
+def get_data(rows=None, seed=0):
+    """
+    Return every row of the data file as a typed tuple, as expected by parametrize.
+
+    The rows are read from the columnar cache (see datacache.py), the csv file is only parsed when it has changed.
+    With rows, that many synthetic rows with the same columns are returned instead (see dataGenerator.py).
+    Every row is copied into the list: for big files parametrize with range(len(load_data())) and read each row from
+    load_data() in the test, like test_dataProvider.py does.
+    """
+    if rows is not None:
+        from pytest_topics.utils.dataGenerator import load_synthetic # needs numpy
+        return list(load_synthetic(rows, seed).iter_rows())
 
-    return data
+    from pytest_topics.utils.datacache import load_data # datacache imports this module
 
-print(get_data())
\ No newline at end of file
+    try:
+        return list(load_data(DATA_FILE).iter_rows())
+    except OSError:
+        # The cache could not be written (read-only checkout), fall back to reading the csv file directly.
+        return list(iter_data())
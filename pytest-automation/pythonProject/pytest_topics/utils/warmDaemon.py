@@ -0,0 +1,325 @@
+"""
+A daemon keeping a warm interpreter for pytest runs: pytest, pytest-bdd, requests, every pytest_topics.utils
+module, the parsed feature files and the config snapshots are loaded once, and every run starts from there.
+
+    python -m pytest_topics.utils.warmDaemon serve -n 4 &     # start the daemon
+    python -m pytest_topics.utils.warmDaemon run pytest_topics -k config   # like `pytest pytest_topics -k config`
+    python -m pytest_topics.utils.warmDaemon stop
+
+Every run is a worker forked from the warm daemon, at most -n at the same time. The output of the run streams back
+to the client, and the client exits with the pytest exit code. Before forking, the daemon re-imports the modules whose
+source changed, along with the modules using them, so a worker never runs stale code. It also drops the config
+snapshots and parsed features and warms up again when a config/*.ini or .feature file changed. Test modules and
+conftest.py files are never preloaded: pytest imports them in the worker, fresh, on every run.
+
+The client falls back to a plain pytest run when no daemon is listening. Needs os.fork and unix sockets (no Windows),
+and the run cannot read from the terminal (no --pdb).
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import pkgutil
+import signal
+import socket
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+ROOT_DIR = BASE_DIR.parent # the directory holding pytest.ini
+PACKAGE = 'pytest_topics'
+PRELOAD = ('pytest', 'pytest_bdd', 'pytest_bdd.scenario', 'pytest_bdd.parser', 'requests')
+EXIT_MARKER = b'\x00warm-daemon-exit '
+ACCEPT_TIMEOUT = 1.0 # seconds between two looks at the finished workers
+REQUEST_TIMEOUT = 5.0 # seconds a client has to send its request, the daemon accepts nobody else meanwhile
+
+
+def socket_path():
+    # Unix socket paths are short (about 100 characters), so it lives in the temp directory, one per checkout.
+    checkout = hashlib.sha1(str(BASE_DIR).encode()).hexdigest()[:10]
+    return os.path.join(tempfile.gettempdir(), f"pytest-topics-{checkout}.sock")
+
+
+# Daemon
+
+def warm():
+    """Import what every run needs and fill the caches that live in memory."""
+    for name in PRELOAD:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass # optional dependency
+    utils = importlib.import_module(f"{PACKAGE}.utils")
+    for module in pkgutil.iter_modules(utils.__path__):
+        try:
+            importlib.import_module(f"{PACKAGE}.utils.{module.name}")
+        except ImportError:
+            pass
+    from pytest_topics.utils.configRegistry import get_config
+    from pytest_topics.utils.featureCache import load_features
+    load_features()
+    for env in ('qa', 'prod'):
+        get_config(env)
+
+
+def source_mtimes():
+    """{module name: mtime of its source} of the project modules loaded in this process."""
+    mtimes = {}
+    for name, module in list(sys.modules.items()):
+        filename = getattr(module, '__file__', None)
+        if (name == PACKAGE or name.startswith(PACKAGE + '.')) and filename and filename.endswith('.py'):
+            try:
+                mtimes[name] = os.stat(filename).st_mtime_ns
+            except OSError:
+                mtimes[name] = None
+    return mtimes
+
+
+def _uses(module, names):
+    for value in list(vars(module).values()):
+        name = value.__name__ if isinstance(value, types.ModuleType) else getattr(value, '__module__', None)
+        if name in names:
+            return True
+    return False
+
+
+def reload_changed(mtimes):
+    """Re-import the changed project modules and the modules using them. Returns the new mtimes and the names."""
+    current = source_mtimes()
+    changed = {name for name, mtime in mtimes.items() if current.get(name) != mtime}
+    if not changed:
+        return current, []
+    # A module holding objects of a reloaded module would keep the old ones, it is reloaded too.
+    dropped = set(changed)
+    grown = True
+    while grown:
+        grown = False
+        for name in list(current):
+            module = sys.modules.get(name)
+            # A package only holds its submodules, importing a submodule again updates that attribute itself.
+            if name not in dropped and module is not None and not hasattr(module, '__path__') and _uses(module, dropped):
+                dropped.add(name)
+                grown = True
+    for name in dropped:
+        sys.modules.pop(name, None)
+    for name in sorted(dropped):
+        try:
+            importlib.import_module(name)
+        except Exception as e: # the worker will import it again and report the error in its run
+            print(f"warm daemon: cannot import {name}: {e!r}", flush=True)
+    try:
+        warm()
+    except Exception as e:
+        print(f"warm daemon: cannot warm up: {e!r}", flush=True)
+    return source_mtimes(), sorted(dropped)
+
+
+def data_mtimes():
+    """{path: mtime} of the config .ini files and the .feature files warm() keeps parsed in memory."""
+    from pytest_topics.utils import configRegistry, featureCache
+    mtimes = {}
+    for path in [*configRegistry.CONFIG_DIR.glob('*.ini'), *featureCache.FEATURE_DIR.rglob('*.feature')]:
+        try:
+            mtimes[str(path)] = os.stat(path).st_mtime_ns
+        except OSError:
+            pass # deleted meanwhile
+    return mtimes
+
+
+def reload_data(mtimes):
+    """Warm up again from the files when a data file was added, changed or deleted. Returns the new mtimes and paths."""
+    current = data_mtimes()
+    changed = sorted(path for path in set(mtimes) | set(current) if mtimes.get(path) != current.get(path))
+    if not changed:
+        return current, []
+    from pytest_bdd import feature as bdd_feature
+    from pytest_topics.utils import configRegistry
+    configRegistry.clear()
+    bdd_feature.features.clear() # a deleted feature file must not stay parsed
+    try:
+        warm()
+    except Exception as e:
+        print(f"warm daemon: cannot warm up: {e!r}", flush=True)
+    return current, changed
+
+
+def _read_request(conn):
+    data = b''
+    while not data.endswith(b'\n'):
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+    return json.loads(data) if data else None
+
+
+def _run_worker(conn, request):
+    """In the forked worker: run pytest with the client's arguments, directory and environment, output to conn."""
+    os.chdir(request['cwd'])
+    os.environ.clear()
+    os.environ.update(request['env'])
+    sys.argv = ['pytest', *request['args']]
+    for fd in (1, 2):
+        os.dup2(conn.fileno(), fd)
+    code = 3
+    try:
+        import pytest
+        # Plugins like pytest_bdd are already imported, pytest cannot rewrite their asserts any more.
+        code = int(pytest.main(['-W', 'ignore::pytest.PytestAssertRewriteWarning', *request['args']]))
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        conn.sendall(EXIT_MARKER + str(code).encode() + b'\n')
+        conn.close()
+        os._exit(0)
+
+
+def serve(path=None, workers=None):
+    if not hasattr(os, 'fork') or not hasattr(socket, 'AF_UNIX'):
+        raise SystemExit("The warm daemon needs os.fork and unix sockets")
+    path = path or socket_path()
+    workers = workers or os.cpu_count() or 1
+    sys.path.insert(0, str(ROOT_DIR))
+    warm()
+    mtimes = source_mtimes()
+    data = data_mtimes()
+
+    if os.path.exists(path):
+        os.remove(path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(64)
+    listener.settimeout(ACCEPT_TIMEOUT)
+    running = set()
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *args: stopping.append(True))
+    print(f"warm daemon: listening on {path}, up to {workers} workers", flush=True)
+
+    try:
+        while not stopping:
+            while running:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+                if not pid:
+                    break
+                running.discard(pid)
+            if len(running) >= workers:
+                running.discard(os.wait()[0])
+                continue
+            try:
+                conn, _ = listener.accept()
+            except socket.timeout:
+                continue
+            except InterruptedError:
+                continue
+            conn.settimeout(REQUEST_TIMEOUT)
+            try:
+                request = _read_request(conn)
+            except (socket.timeout, ValueError) as e: # a silent client, or not one of ours
+                print(f"warm daemon: bad request: {e!r}", flush=True)
+                conn.close()
+                continue
+            conn.settimeout(None)
+            if not request or request.get('cmd') != 'run':
+                if request and request.get('cmd') == 'stop':
+                    stopping.append(True)
+                conn.sendall(json.dumps(dict(pid=os.getpid(), workers=workers, running=len(running))).encode() + b'\n')
+                conn.close()
+                continue
+
+            mtimes, reloaded = reload_changed(mtimes)
+            if reloaded:
+                print(f"warm daemon: reloaded {', '.join(reloaded)}", flush=True)
+            data, changed = reload_data(data)
+            if changed:
+                print(f"warm daemon: reloaded the data of {', '.join(changed)}", flush=True)
+            pid = os.fork()
+            if pid == 0:
+                listener.close()
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                _run_worker(conn, request)
+            conn.close()
+            running.add(pid)
+    finally:
+        listener.close()
+        if os.path.exists(path):
+            os.remove(path)
+        for pid in running:
+            os.waitpid(pid, 0)
+
+
+# Client
+
+def _connect(path):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(path)
+    return client
+
+
+def run(args, path=None, stream=None):
+    """Run pytest with args on the daemon, stream its output, return its exit code. Plain pytest without daemon."""
+    stream = stream or sys.stdout.buffer
+    try:
+        client = _connect(path or socket_path())
+    except OSError:
+        import pytest
+        return int(pytest.main(list(args)))
+
+    request = dict(cmd='run', args=list(args), cwd=os.getcwd(), env=dict(os.environ))
+    client.sendall(json.dumps(request).encode() + b'\n')
+    pending = b''
+    keep = len(EXIT_MARKER) - 1
+    code = None
+    with client:
+        while code is None:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            pending += chunk
+            index = pending.find(EXIT_MARKER)
+            if index >= 0:
+                stream.write(pending[:index])
+                pending = pending[index:]
+                end = pending.find(b'\n')
+                if end >= 0: # else the exit code is still on its way
+                    code = int(pending[len(EXIT_MARKER):end])
+                    pending = b''
+            elif len(pending) > keep: # hold back what could be the start of the marker
+                stream.write(pending[:-keep])
+                pending = pending[-keep:]
+            stream.flush()
+    if not pending.startswith(EXIT_MARKER):
+        stream.write(pending)
+    stream.flush()
+    return 1 if code is None else code # no exit code: the worker died
+
+
+def command(cmd, path=None):
+    with _connect(path or socket_path()) as client:
+        client.sendall(json.dumps(dict(cmd=cmd)).encode() + b'\n')
+        return json.loads(client.makefile().readline())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('action', choices=('serve', 'run', 'status', 'stop'))
+    parser.add_argument('-n', '--workers', type=int, default=None, help="runs at the same time (default: cpu count)")
+    parser.add_argument('--socket', default=None, help="unix socket path (default: one per checkout, in the temp dir)")
+    args, pytest_args = parser.parse_known_args(argv)
+    if args.action == 'serve':
+        serve(args.socket, args.workers)
+        return 0
+    if args.action == 'run':
+        return run(pytest_args, args.socket)
+    try:
+        print(command(args.action, args.socket))
+    except OSError:
+        print("no warm daemon is running")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())